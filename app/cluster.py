@@ -0,0 +1,43 @@
+"""Start a producer plus several gateway workers behind one port.
+
+Usage:
+    python -m app.cluster --host 0.0.0.0 --port 10000 --workers 4
+
+The producer runs as a child process; uvicorn's workers inherit
+`VOS_ROLE=gateway` and `VOS_BUS` and subscribe to it. Stopping the cluster
+stops the producer.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+import uvicorn
+
+from .services.bus import bus_path, bus_transport
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", 2)))
+    parser.add_argument("--bus", default=bus_path())
+    parser.add_argument("--transport", choices=("shm", "socket"), default=bus_transport())
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    os.environ["VOS_BUS_TRANSPORT"] = args.transport
+    command = [sys.executable, "-m", "app.producer", "--bus", args.bus, "--transport", args.transport]
+    if args.seed is not None:
+        command += ["--seed", str(args.seed)]
+    producer = subprocess.Popen(command)
+    os.environ["VOS_ROLE"] = "gateway"
+    os.environ["VOS_BUS"] = args.bus
+    try:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        producer.terminate()
+        producer.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+class WallClock:
+    """Real time. `advance` is a no-op; time moves on its own."""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def advance(self, seconds: float):
+        pass
+
+class SimClock:
+    """Simulated time that only moves when the simulation advances it.
+
+    Injected into a Simulator for reproducible runs: every timestamp the
+    simulation produces depends only on the start time and tick count.
+    """
+
+    def __init__(self, start: Optional[datetime] = None):
+        self.current = start or datetime(2025, 1, 1, 8, 0, 0)
+
+    def now(self) -> datetime:
+        return self.current
+
+    def advance(self, seconds: float):
+        self.current += timedelta(seconds=seconds)
@@ -0,0 +1,120 @@
+"""Internal simulation entities.
+
+`Asset` and `Event` in models.py are the API shapes: validated on the way
+in, serialised on the way out. The simulator's own state is kept in the
+slotted dataclasses below instead, which have a fixed attribute set, no
+per-instance __dict__ and plain attribute access in the hot loop. Status,
+type and phase fields hold the enum members themselves, which are
+interned singletons, so comparisons stay identity-cheap.
+
+Crossing back to the API is done in bulk: `to_api_assets` / `to_api_events`
+validate a whole list in one pydantic call, and `to_json` renders the same
+JSON the API models produce without going through them.
+"""
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from .models import Asset, AssetStatus, AssetType, Event, EventStatus, EventType, IncidentPhase
+
+@dataclass(slots=True)
+class Position:
+    lat: float
+    lng: float
+
+@dataclass(slots=True, eq=False)
+class AssetState:
+    asset_id: str
+    type: AssetType
+    location: Position
+    status: AssetStatus
+    fatigue_level: float = 0.0
+    last_ping: datetime = field(default_factory=datetime.now)
+    shift_start: datetime = field(default_factory=datetime.now)
+    time_worked_minutes: float = 0.0
+    current_node: Optional[str] = None
+    target_node: Optional[str] = None
+    path: List[str] = field(default_factory=list) # Nodes left to visit
+    target_event_id: Optional[str] = None
+    telemetry: bool = False # Position comes from GPS pings, not the simulator
+
+    def fields(self) -> Dict[str, Any]:
+        """Field values in API order, as python objects."""
+        return {
+            "asset_id": self.asset_id,
+            "type": self.type,
+            "location": {"lat": self.location.lat, "lng": self.location.lng},
+            "status": self.status,
+            "fatigue_level": self.fatigue_level,
+            "last_ping": self.last_ping,
+            "shift_start": self.shift_start,
+            "time_worked_minutes": self.time_worked_minutes,
+            "current_node": self.current_node,
+            "target_node": self.target_node,
+            "path": list(self.path),
+            "target_event_id": self.target_event_id,
+            "telemetry": self.telemetry,
+        }
+
+    def fingerprint(self) -> Tuple:
+        """Every mutable field; equal fingerprints encode to the same JSON."""
+        return (self.location.lat, self.location.lng, self.status, self.fatigue_level,
+                self.last_ping, self.shift_start, self.time_worked_minutes, self.current_node,
+                self.target_node, tuple(self.path), self.target_event_id, self.telemetry)
+
+@dataclass(slots=True, eq=False)
+class EventState:
+    event_id: str
+    type: EventType
+    severity: int
+    location: Position
+    status: EventStatus
+    created_at: datetime = field(default_factory=datetime.now)
+    node_id: Optional[str] = None # Graph node the event is snapped to
+    phase: IncidentPhase = IncidentPhase.PENDING
+    assigned_asset_id: Optional[str] = None
+    dispatched_at: Optional[datetime] = None # First unit assigned
+    arrived_at: Optional[datetime] = None # First unit on scene
+    resolved_at: Optional[datetime] = None
+
+    def fields(self) -> Dict[str, Any]:
+        return {
+            "event_id": self.event_id,
+            "type": self.type,
+            "severity": self.severity,
+            "location": {"lat": self.location.lat, "lng": self.location.lng},
+            "status": self.status,
+            "created_at": self.created_at,
+            "node_id": self.node_id,
+            "phase": self.phase,
+            "assigned_asset_id": self.assigned_asset_id,
+            "dispatched_at": self.dispatched_at,
+            "arrived_at": self.arrived_at,
+            "resolved_at": self.resolved_at,
+        }
+
+    def fingerprint(self) -> Tuple:
+        return (self.severity, self.location.lat, self.location.lng, self.status, self.created_at,
+                self.node_id, self.phase, self.assigned_asset_id, self.dispatched_at, self.arrived_at,
+                self.resolved_at)
+
+_ASSETS = TypeAdapter(List[Asset])
+_EVENTS = TypeAdapter(List[Event])
+
+def to_api_assets(assets: Iterable[AssetState]) -> List[Asset]:
+    return _ASSETS.validate_python([a.fields() for a in assets])
+
+def to_api_events(events: Iterable[EventState]) -> List[Event]:
+    return _EVENTS.validate_python([e.fields() for e in events])
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def to_json(entity) -> str:
+    """The entity as its API model would encode it (str enums encode as their value)."""
+    return json.dumps(entity.fields(), default=_json_default)
@@ -0,0 +1,134 @@
+"""Structured, non-blocking logging.
+
+Records are formatted as JSON lines and handed to a bounded queue; a
+background `QueueListener` thread does the actual write, so a slow stdout
+pipe never stalls the simulation tick. If the queue is full the record is
+dropped and counted instead of blocking.
+
+Per-event traces (`vos.events`, `vos.dispatch`, `vos.ws`) log at DEBUG and
+call sites guard them with `isEnabledFor`, so with the default INFO level
+they cost one integer comparison. When enabled they are additionally
+sampled and rate-limited.
+
+Environment:
+    VOS_LOG_LEVEL    root level for "vos" loggers (default INFO)
+    VOS_LOG_SAMPLE   fraction of per-event records kept (default 1.0)
+    VOS_LOG_RATE     max per-event records per second per logger (default 50)
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional, TextIO
+
+TRACE_LOGGERS = ("vos.events", "vos.dispatch", "vos.ws")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"vos.{name}")
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra={"fields": {...}}` is merged in."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return self.rate >= 1.0 or random.random() < self.rate
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket: at most `per_second` records, bursts up to `burst`."""
+
+    def __init__(self, per_second: float, burst: Optional[float] = None):
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst if burst is not None else per_second
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.per_second)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self.suppressed += 1
+        return False
+
+def configure_logging(level: Optional[str] = None, stream: TextIO = sys.stdout,
+                      sample: Optional[float] = None, rate: Optional[float] = None,
+                      queue_size: int = 10000) -> DroppingQueueHandler:
+    """Install the queue-backed JSON handler on the "vos" logger. Idempotent."""
+    global _listener
+    stop_logging()
+
+    level = (level or os.environ.get("VOS_LOG_LEVEL", "INFO")).upper()
+    sample = float(os.environ.get("VOS_LOG_SAMPLE", 1.0)) if sample is None else sample
+    rate = float(os.environ.get("VOS_LOG_RATE", 50)) if rate is None else rate
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(JsonFormatter())
+    queue_handler = DroppingQueueHandler(log_queue)
+
+    root = logging.getLogger("vos")
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    root.propagate = False
+
+    for name in TRACE_LOGGERS:
+        trace = logging.getLogger(name)
+        for old in list(trace.filters):
+            trace.removeFilter(old)
+        trace.addFilter(SamplingFilter(sample))
+        trace.addFilter(RateLimitFilter(rate))
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+    return queue_handler
+
+def stop_logging():
+    """Flush and stop the background writer, if running."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,186 @@
+"""Minimal in-process metrics with Prometheus text exposition.
+
+Hot-path cost is a dict-free attribute update: label children are bound
+once at import time (e.g. `TICK_PHASE.labels("move")`), a counter increment
+is one float add and a histogram observation is one bisect. Gauges that
+mirror existing state (queue depths, connection counts) are read through a
+callback at scrape time, so they cost nothing between scrapes.
+"""
+import bisect
+from abc import ABC, abstractmethod
+import math
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+
+    def labels(self, *values: str) -> "_Metric":
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self) -> "_Metric":
+        """An unlabelled series of the same metric, for one label combination."""
+
+    def _series(self) -> Iterator[Tuple[Tuple[str, ...], "_Metric"]]:
+        if self.labelnames:
+            yield from self._children.items()
+        else:
+            yield (), self
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, series in self._series():
+            lines.extend(series._samples(self.name, self.labelnames, values))
+        return lines
+
+    @abstractmethod
+    def _samples(self, name: str, labelnames: Sequence[str], values: Sequence[str]) -> List[str]:
+        """Exposition lines for this series."""
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def _samples(self, name, labelnames, values):
+        return [f"{name}_total{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+        self.callback = callback
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.documentation)
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, callback: Callable[[], float]):
+        self.callback = callback
+
+    def get(self) -> float:
+        return self.callback() if self.callback is not None else self.value
+
+    def _samples(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.get())}"]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1) # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _samples(self, name, labelnames, values):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, values, le)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, values)} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, values)} {self.count}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"duplicate metric {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+TICK_PHASE = REGISTRY.histogram("vos_tick_phase_seconds", "Time spent per simulation tick phase.", ("phase",))
+TICK_SECONDS = REGISTRY.histogram("vos_tick_seconds", "Wall time of a full simulation tick, excluding sleep.")
+EVENTS = REGISTRY.counter("vos_events", "Incidents created.", ("source",))
+DISPATCHES = REGISTRY.counter("vos_dispatches", "Units dispatched to incidents.")
+PREEMPTIONS = REGISTRY.counter("vos_preemptions", "En-route units diverted to a more urgent incident.")
+RELIEFS = REGISTRY.counter("vos_reliefs", "Crew handovers, by what triggered them.", ("reason",))
+REROUTES = REGISTRY.counter("vos_reroutes", "Units re-routed around closed or slowed roads.")
+PATH_SEARCHES = REGISTRY.counter("vos_path_searches", "Shortest-path searches run.")
+GPS_PINGS = REGISTRY.counter("vos_gps_pings", "GPS pings map-matched.")
+BROADCAST_BYTES = REGISTRY.counter("vos_broadcast_bytes", "Bytes sent to dashboard WebSockets.")
+CONNECTIONS = REGISTRY.gauge("vos_websocket_connections", "Open dashboard WebSocket connections.")
+QUEUE_DEPTH = REGISTRY.gauge("vos_queue_depth", "Items waiting in ingest queues.", ("queue",))
+ASSETS = REGISTRY.gauge("vos_assets", "Assets in the simulation.")
+ACTIVE_EVENTS = REGISTRY.gauge("vos_events_in_memory", "Incidents held in simulator state.")
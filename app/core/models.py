@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Tuple
 from datetime import datetime
+import time
 from enum import Enum
 
 class AssetType(str, Enum):
@@ -11,6 +12,7 @@ class AssetType(str, Enum):
 class AssetStatus(str, Enum):
     IDLE = "IDLE"
     DISPATCHED = "DISPATCHED"
+    BUSY = "BUSY" # On scene
     OFF_DUTY = "OFF_DUTY"
 
 class EventType(str, Enum):
@@ -24,6 +26,14 @@ class EventStatus(str, Enum):
     ACTIVE = "ACTIVE"
     RESOLVED = "RESOLVED"
 
+class IncidentPhase(str, Enum):
+    PENDING = "PENDING" # Waiting for a unit
+    DISPATCHED = "DISPATCHED"
+    EN_ROUTE = "EN_ROUTE"
+    ON_SCENE = "ON_SCENE"
+    CLEARING = "CLEARING"
+    RESOLVED = "RESOLVED"
+
 class Location(BaseModel):
     lat: float
     lng: float
@@ -34,12 +44,15 @@ class Asset(BaseModel):
     location: Location
     status: AssetStatus
     fatigue_level: float = 0.0
-    last_ping: datetime = datetime.now()
+    last_ping: datetime = Field(default_factory=datetime.now)
     # Audit Fields
-    shift_start: datetime = datetime.now()
+    shift_start: datetime = Field(default_factory=datetime.now)
     time_worked_minutes: float = 0.0
     current_node: Optional[str] = None # For Graph Movement
     target_node: Optional[str] = None
+    path: List[str] = Field(default_factory=list) # Nodes left to visit
+    target_event_id: Optional[str] = None
+    telemetry: bool = False # Position comes from GPS pings, not the simulator
 
 class Event(BaseModel):
     event_id: str
@@ -47,7 +60,39 @@ class Event(BaseModel):
     severity: int
     location: Location
     status: EventStatus
-    created_at: datetime = datetime.now()
+    created_at: datetime = Field(default_factory=datetime.now)
+    node_id: Optional[str] = None # Graph node the event is snapped to
+    phase: IncidentPhase = IncidentPhase.PENDING
+    assigned_asset_id: Optional[str] = None
+    dispatched_at: Optional[datetime] = None # First unit assigned
+    arrived_at: Optional[datetime] = None # First unit on scene
+    resolved_at: Optional[datetime] = None
+
+class IncidentIn(BaseModel):
+    """Incident as reported by an external source (CAD / 100-dial)."""
+    event_id: Optional[str] = None
+    type: EventType
+    severity: int = Field(5, ge=1, le=10)
+    location: Location
+    source: str = "100-DIAL"
+    raw_data: Optional[str] = None
+    reported_at: Optional[datetime] = None
+
+class GpsPing(BaseModel):
+    """Position fix reported by a unit's GPS."""
+    asset_id: str
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+    timestamp: float = Field(default_factory=time.time) # Epoch seconds
+    type: AssetType = AssetType.PCR
+
+class RoadEdge(BaseModel):
+    """A road between two adjacent graph nodes (either direction)."""
+    from_node: str
+    to_node: str
+
+class RoadScale(RoadEdge):
+    factor: float = Field(..., gt=0) # Travel cost multiplier; 2.0 = twice as slow
 
 class HexGrid(BaseModel):
     hex_id: str
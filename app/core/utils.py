@@ -24,3 +24,13 @@ def calculate_eta(distance_km: float, speed_kmh: float = 40.0) -> float:
     if speed_kmh <= 0:
         return float('inf')
     return (distance_km / speed_kmh) * 60
+
+M_PER_DEG_LAT = 111_320.0
+
+def equirectangular_m(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> float:
+    """Fast planar distance in metres; accurate to <0.1% over a few km."""
+    lat1, lon1 = coord1
+    lat2, lon2 = coord2
+    x = (lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = lat2 - lat1
+    return math.sqrt(x * x + y * y) * M_PER_DEG_LAT
@@ -1,10 +1,25 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Body, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 import asyncio
 import json
-from typing import List
+import logging
+import math
+import os
+from typing import Any, List, Optional
+from .core.log import configure_logging, get_logger, stop_logging
+from .core.metrics import ACTIVE_EVENTS, ASSETS, CONNECTIONS, QUEUE_DEPTH, REGISTRY
+from .core.models import GpsPing, RoadEdge, RoadScale
+from .services.broadcast import ConnectionManager, Subscription
+from .services import query
+from .services.bus import KIND_INCIDENTS, KIND_ROADS, KIND_TELEMETRY, BusClient, bus_path, bus_transport, ring_name
+from .services.ingest import IngestQueue
+from .services.routing import get_road_network
 from .services.simulator import Simulator
 
+configure_logging()
+ws_log = get_logger("ws")
+
 app = FastAPI(title="Damstrik V-OS Logic Engine")
 
 app.add_middleware(
@@ -15,35 +30,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global Simulator Instance
-simulator = Simulator()
-
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+# "standalone" runs the simulation in this process; "gateway" workers
+# serve clients from frames published by app.producer (see services/bus.py)
+ROLE = os.environ.get("VOS_ROLE", "standalone")
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+manager = ConnectionManager()
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+# Endpoints validate into these; the local simulator or the producer drains them
+ingest_queue = IngestQueue()
+telemetry_queue = IngestQueue(maxsize=50000, batch_size=5000, model=GpsPing)
+road_queue = IngestQueue(maxsize=1000, batch_size=100, model=RoadScale)
+# Standalone only, built on startup so importing the app does not build the city
+simulator: Optional[Simulator] = None
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+if ROLE == "gateway":
+    bus = BusClient(bus_path(), forward={KIND_INCIDENTS: ingest_queue, KIND_TELEMETRY: telemetry_queue,
+                                         KIND_ROADS: road_queue},
+                    ring_name=ring_name() if bus_transport() == "shm" else None)
+    ASSETS.set_function(lambda: len(bus.mirror.last_frame.assets) if bus.mirror.last_frame else 0)
+    ACTIVE_EVENTS.set_function(lambda: len(bus.mirror.last_frame.events) if bus.mirror.last_frame else 0)
+else:
+    bus = None
+    ASSETS.set_function(lambda: len(simulator.assets) if simulator is not None else 0)
+    ACTIVE_EVENTS.set_function(lambda: len(simulator.events) if simulator is not None else 0)
 
-manager = ConnectionManager()
+# Gauges read live state at scrape time
+CONNECTIONS.set_function(lambda: len(manager.active_connections))
+QUEUE_DEPTH.labels("incidents").set_function(ingest_queue.queue.qsize)
+QUEUE_DEPTH.labels("telemetry").set_function(telemetry_queue.queue.qsize)
 
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
+def _start_simulator() -> Simulator:
+    sim = Simulator()
+    # Drain the queues the endpoints were wired to at import
+    sim.ingest_queue = ingest_queue
+    sim.telemetry_queue = telemetry_queue
+    sim.road_queue = road_queue
+    return sim
+
 @app.on_event("startup")
 async def startup_event():
-    # Start the simulation loop in the background
-    asyncio.create_task(simulator.run_loop(manager))
+    # Start the simulation loop (or the bus subscription) in the background
+    global simulator
+    if bus is not None:
+        asyncio.create_task(bus.run(manager))
+    else:
+        simulator = _start_simulator()
+        asyncio.create_task(simulator.run_loop(manager))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if bus is not None:
+        bus.running = False
+    elif simulator is not None:
+        simulator.running = False
+    stop_logging()
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -51,12 +96,183 @@ async def websocket_endpoint(websocket: WebSocket):
     try:
         while True:
             data = await websocket.receive_text()
+            try:
+                message = json.loads(data)
+            except ValueError:
+                message = None
+            if isinstance(message, dict) and message.get("type") == "subscribe":
+                try:
+                    manager.subscribe(websocket, Subscription.from_message(message))
+                except (TypeError, ValueError) as exc:
+                    await websocket.send_text(json.dumps({"type": "error", "detail": str(exc)}))
+                else:
+                    await websocket.send_text(json.dumps({"type": "subscribed"}))
+                continue
             # Handle incoming commands from the dashboard (e.g., dispatch confirmation)
-            # For now, just echo or log
-            print(f"Received command: {data}")
+            # For now, just log
+            if ws_log.isEnabledFor(logging.DEBUG):
+                ws_log.debug("command received", extra={"fields": {"data": data[:500]}})
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
+def _ingest_status(result) -> int:
+    if result["accepted"] or not result["rejected"]:
+        return 202
+    if any(err["reason"] == "queue_full" for err in result["rejected"]):
+        return 429
+    return 422
+
+@app.post("/events:batch")
+async def ingest_events_batch(payloads: List[Any] = Body(...)):
+    """Bulk incident ingest. Valid incidents are queued for the next tick."""
+    result = ingest_queue.submit_batch(payloads)
+    return JSONResponse(result, status_code=_ingest_status(result))
+
+async def _ingest_socket(websocket: WebSocket, queue):
+    # Streaming ingest: each message is one item or a list of items
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                data = json.loads(await websocket.receive_text())
+            except ValueError:
+                await websocket.send_text(json.dumps({"accepted": 0, "rejected": [{"index": 0, "reason": "invalid", "detail": "malformed JSON"}]}))
+                continue
+            payloads = data if isinstance(data, list) else [data]
+            result = queue.submit_batch(payloads)
+            await websocket.send_text(json.dumps(result))
+    except WebSocketDisconnect:
+        pass
+
+@app.websocket("/ws/ingest")
+async def websocket_ingest(websocket: WebSocket):
+    await _ingest_socket(websocket, ingest_queue)
+
+@app.get("/ingest/stats")
+async def ingest_stats():
+    return ingest_queue.stats()
+
+@app.post("/telemetry:batch")
+async def ingest_telemetry_batch(payloads: List[Any] = Body(...)):
+    """Bulk GPS ping ingest. Pings are map-matched on the next tick."""
+    result = telemetry_queue.submit_batch(payloads)
+    return JSONResponse(result, status_code=_ingest_status(result))
+
+@app.websocket("/ws/telemetry")
+async def websocket_telemetry(websocket: WebSocket):
+    await _ingest_socket(websocket, telemetry_queue)
+
+@app.get("/telemetry/stats")
+async def telemetry_stats():
+    return telemetry_queue.stats()
+
+def _frame():
+    # Queries read the last broadcast frame: the live simulator's, or the bus mirror's on a gateway
+    if manager.last_frame is None:
+        raise HTTPException(status_code=503, detail="no frame yet")
+    return manager.last_frame
+
+@app.get("/assets/near")
+async def assets_near(lat: float = Query(..., ge=-90, le=90), lng: float = Query(..., ge=-180, le=180),
+                      radius_m: float = Query(1000.0, gt=0, le=50_000), status: Optional[str] = None,
+                      fields: Optional[str] = None, offset: int = Query(0, ge=0),
+                      limit: int = Query(query.DEFAULT_LIMIT, ge=1, le=query.MAX_LIMIT)):
+    """Assets within radius_m of a point, nearest first."""
+    return query.assets_near(_frame(), lat, lng, radius_m, status=status,
+                             fields=query.parse_fields(fields), offset=offset, limit=limit)
+
+@app.get("/events/within")
+async def events_within(polygon: str = Query(..., description="lat,lng;lat,lng;..."),
+                        status: Optional[str] = None, fields: Optional[str] = None,
+                        offset: int = Query(0, ge=0),
+                        limit: int = Query(query.DEFAULT_LIMIT, ge=1, le=query.MAX_LIMIT)):
+    """Events inside a polygon, by event id."""
+    try:
+        vertices = query.parse_polygon(polygon)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return query.events_within(_frame(), vertices, status=status,
+                               fields=query.parse_fields(fields), offset=offset, limit=limit)
+
+@app.get("/coverage/gaps")
+async def coverage_gaps(offset: int = Query(0, ge=0), limit: int = Query(query.DEFAULT_LIMIT, ge=1, le=query.MAX_LIMIT)):
+    """Road nodes no available unit can reach within the response target."""
+    coverage = _frame().coverage
+    if coverage is None:
+        raise HTTPException(status_code=503, detail="no coverage yet")
+    gaps = coverage["gaps"]
+    end = min(offset + limit, len(gaps))
+    return {
+        "target_s": coverage["target_s"],
+        "covered": len(coverage["covered"]),
+        "total": len(gaps),
+        "offset": offset,
+        "limit": limit,
+        "next_offset": end if end < len(gaps) else None,
+        "items": [{"node": node, "lat": lat, "lng": lng} for node, lat, lng in gaps[offset:end]],
+    }
+
+@app.get("/kpis")
+async def kpis(minutes: Optional[float] = Query(None, gt=0, description="Rolling window; all retained history if omitted"),
+               type: Optional[str] = None, cell: Optional[str] = None,
+               by: Optional[str] = Query(None, description="Group by type, cell or window")):
+    """Dispatch and arrival latency percentiles from the streaming sketches."""
+    sla = _frame().sla
+    if sla is None:
+        raise HTTPException(status_code=503, detail="no KPIs yet")
+    try:
+        return sla.query(minutes=minutes, event_type=type, cell=cell, by=by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _change_road(edge: RoadEdge, factor: float):
+    change = {"from_node": edge.from_node, "to_node": edge.to_node,
+              "closed": math.isinf(factor), "factor": None if math.isinf(factor) else factor}
+    if simulator is None:
+        # Applied on the producer's next tick (standalone: the first tick, if not
+        # started yet); who gets re-routed is not known here
+        if (edge.from_node, edge.to_node) not in get_road_network().edge_lengths:
+            raise HTTPException(status_code=404, detail=f"no road between {edge.from_node} and {edge.to_node}")
+        result = road_queue.submit_batch([RoadScale(from_node=edge.from_node, to_node=edge.to_node, factor=factor)])
+        if not result["accepted"]:
+            raise HTTPException(status_code=429, detail="too many pending road changes")
+        return JSONResponse({**change, "rerouted": None}, status_code=202)
+    try:
+        rerouted = simulator.set_road_factor(edge.from_node, edge.to_node, factor)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {**change, "rerouted": rerouted}
+
+@app.post("/roads/close")
+async def close_road(edge: RoadEdge):
+    """Close a road; units routed over it are re-routed."""
+    return _change_road(edge, math.inf)
+
+@app.post("/roads/reopen")
+async def reopen_road(edge: RoadEdge):
+    return _change_road(edge, 1.0)
+
+@app.post("/roads/scale")
+async def scale_road(change: RoadScale):
+    """Slow a road down (factor > 1) or speed it up (factor < 1)."""
+    return _change_road(change, change.factor)
+
+@app.get("/roads/conditions")
+async def road_conditions():
+    # A gateway reports what the producer published with its last frame
+    return simulator.conditions.describe() if simulator is not None else _frame().roads
+
+@app.get("/assets/{asset_id}")
+async def get_asset(asset_id: str, fields: Optional[str] = None):
+    asset = query.get_asset(_frame(), asset_id, query.parse_fields(fields))
+    if asset is None:
+        raise HTTPException(status_code=404, detail=f"unknown asset {asset_id}")
+    return asset
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 async def read_root():
     return FileResponse('app/static/index.html')
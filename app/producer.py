@@ -0,0 +1,57 @@
+"""Simulation producer for multi-worker deployments.
+
+Runs the single authoritative `Simulator` and publishes every tick to the
+local bus (see services/bus.py). Gateway workers started with
+`VOS_ROLE=gateway` subscribe to it; `python -m app.cluster` starts both.
+
+Usage:
+    python -m app.producer [--bus PATH] [--transport shm|socket] [--seed 7]
+"""
+import argparse
+import asyncio
+import signal
+import sys
+
+from .core.log import configure_logging, get_logger, stop_logging
+from .services.bus import KIND_INCIDENTS, KIND_ROADS, KIND_TELEMETRY, BusServer, bus_path, bus_transport, ring_name
+from .services.shmring import DEFAULT_SLOT_SIZE, FrameRing
+from .services.simulator import Simulator
+
+log = get_logger("producer")
+
+async def serve(path: str, seed=None, ring: FrameRing = None):
+    simulator = Simulator(seed=seed)
+    server = BusServer(path, handlers={
+        KIND_INCIDENTS: simulator.ingest_queue.submit_batch,
+        KIND_TELEMETRY: simulator.telemetry_queue.submit_batch,
+        KIND_ROADS: simulator.road_queue.submit_batch,
+    }, ring=ring)
+    await server.start()
+    try:
+        await simulator.run_loop(server)
+    finally:
+        await server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bus", default=bus_path(), help="Unix socket path gateways connect to")
+    parser.add_argument("--transport", choices=("shm", "socket"), default=bus_transport())
+    parser.add_argument("--ring", default=ring_name(), help="shared-memory ring name (shm transport)")
+    parser.add_argument("--slot-mb", type=int, default=DEFAULT_SLOT_SIZE // (1024 * 1024))
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    configure_logging()
+    # Exit through the finally block below so the ring is unlinked
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    ring = FrameRing.create(args.ring, slot_size=args.slot_mb * 1024 * 1024) if args.transport == "shm" else None
+    try:
+        asyncio.run(serve(args.bus, args.seed, ring))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if ring is not None:
+            ring.close()
+        stop_logging()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+import asyncio
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+import numpy as np
+from fastapi import WebSocket
+
+from ..core.metrics import BROADCAST_BYTES
+from ..core.entities import AssetState
+from .motion import KEYFRAME_SECONDS, Changes
+from .sla import SlaStats
+from .spatial import BBox, GridIndex
+from .wire import STATUS_NAMES, AssetRegistry, encode_positions
+
+LAYERS = frozenset({"assets", "events", "logs", "heatmap", "road_network", "coverage"})
+FORMATS = ("json", "binary")
+
+@dataclass
+class Subscription:
+    """What one dashboard wants to receive.
+
+    Sent by the client over /ws as
+    {"type": "subscribe", "bbox": [min_lat, min_lng, max_lat, max_lng],
+     "layers": ["assets", "events"], "max_hz": 1, "format": "json"}.
+    Omitted fields mean "everything" / "every tick" / JSON. With
+    "format": "binary" asset positions are sent as packed frames (see wire.py).
+
+    With "motion": true the client animates units itself from their
+    movement hints (see motion.py). It gets a full "keyframe" message every
+    "keyframe_s" seconds and, in between, a "delta" only when some unit or
+    event in view changed; other layers refresh with the keyframes.
+    """
+    bbox: Optional[BBox] = None
+    layers: FrozenSet[str] = LAYERS
+    max_hz: Optional[float] = None
+    format: str = "json"
+    motion: bool = False
+    keyframe_s: float = KEYFRAME_SECONDS
+    last_sent: float = field(default=0.0, compare=False)
+    meta_version: int = field(default=0, compare=False) # Last asset_meta version sent
+    last_keyframe: float = field(default=-math.inf, compare=False)
+    pending_assets: Set[str] = field(default_factory=set, compare=False) # Changed since last sent
+    pending_events: Set[str] = field(default_factory=set, compare=False)
+
+    @classmethod
+    def from_message(cls, message: Dict[str, Any]) -> "Subscription":
+        bbox = message.get("bbox")
+        if bbox is not None:
+            if len(bbox) != 4:
+                raise ValueError("bbox must be [min_lat, min_lng, max_lat, max_lng]")
+            bbox = tuple(float(x) for x in bbox)
+            if bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+                raise ValueError("bbox min must not exceed max")
+        layers = message.get("layers")
+        if layers is None:
+            layers = LAYERS
+        else:
+            unknown = set(layers) - LAYERS
+            if unknown:
+                raise ValueError(f"unknown layers: {sorted(unknown)}")
+            layers = frozenset(layers)
+        max_hz = message.get("max_hz")
+        if max_hz is not None:
+            max_hz = float(max_hz)
+            if max_hz <= 0:
+                raise ValueError("max_hz must be positive")
+        fmt = message.get("format", "json")
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of {FORMATS}")
+        motion = bool(message.get("motion", False))
+        if motion and fmt != "json":
+            raise ValueError("motion hints are only sent with the json format")
+        keyframe_s = float(message.get("keyframe_s", KEYFRAME_SECONDS))
+        if keyframe_s <= 0:
+            raise ValueError("keyframe_s must be positive")
+        return cls(bbox=bbox, layers=layers, max_hz=max_hz, format=fmt, motion=motion, keyframe_s=keyframe_s)
+
+    def due(self, now: float) -> bool:
+        return self.max_hz is None or now - self.last_sent >= 1.0 / self.max_hz
+
+    def keyframe_due(self, now: float) -> bool:
+        return now - self.last_keyframe >= self.keyframe_s
+
+class TickFrame:
+    """One tick's state, encoded once and sliced per subscriber.
+
+    Every asset and event is JSON-encoded a single time; a client's message
+    is spliced together from the entities inside its bounding box, so the
+    cost of serving a client depends on what it can see, not on city size.
+    """
+
+    def __init__(self, timestamp: str, assets: Dict[str, str], events: Dict[str, str],
+                 heatmap: Dict[str, List[float]], hotspots: List[List[float]],
+                 logs: List[Dict], road_network_json: str,
+                 asset_index: GridIndex, event_index: GridIndex,
+                 asset_list: Optional[List[AssetState]] = None, registry: Optional[AssetRegistry] = None,
+                 seq: int = 0, positions: Optional[np.ndarray] = None,
+                 position_ids: Optional[List[str]] = None, coverage: Optional[Dict[str, Any]] = None,
+                 sla: Optional[SlaStats] = None, sim_time: float = 0.0,
+                 motion: Optional[Dict[str, str]] = None, changes: Optional[Changes] = None,
+                 roads: Optional[List[Dict]] = None):
+        self.timestamp = timestamp
+        self.assets = assets
+        self.events = events
+        self.heatmap = heatmap
+        self.hotspots = hotspots
+        self.coverage = coverage
+        self.sla = sla # Response-time KPIs, queried by /kpis
+        self.sim_time = sim_time # Clock the motion hints' etas are on
+        self.motion = motion or {} # Encoded hint per moving asset
+        self.changes = changes # None: treat everything as changed
+        self.roads = roads or [] # Closed and rescaled roads, for /roads/conditions
+        self.asset_index = asset_index
+        self.event_index = event_index
+        self.logs = logs
+        self._logs = json.dumps(logs)
+        self._road_network = road_network_json
+        self._full: Optional[str] = None
+        self._keyframe: Optional[str] = None
+        self._binary_full: Optional[str] = None
+        self.seq = seq
+        self._asset_list = asset_list or []
+        self._registry = registry
+        # Frames decoded from the bus arrive with positions already packed
+        self._positions = positions
+        self._rows: Dict[str, int] = {a: row for row, a in enumerate(position_ids or ())}
+        self._positions_full: Optional[bytes] = None
+        self._statuses: Optional[Dict[str, str]] = None
+
+    def full(self) -> str:
+        if self._full is None:
+            self._full = self._render(self.assets.keys(), self.events.keys(), None, LAYERS)
+        return self._full
+
+    def render(self, subscription: Optional[Subscription]) -> str:
+        if subscription is None or (subscription.bbox is None and subscription.layers == LAYERS):
+            if subscription is not None and subscription.motion:
+                if self._keyframe is None:
+                    self._keyframe = self._render(self.assets.keys(), self.events.keys(), None, LAYERS, motion=True)
+                return self._keyframe
+            if subscription is not None and subscription.format == "binary":
+                # Units travel as packed positions instead
+                if self._binary_full is None:
+                    self._binary_full = self._render((), self.events.keys(), None, LAYERS - {"assets"})
+                return self._binary_full
+            return self.full()
+        bbox = subscription.bbox
+        layers = subscription.layers
+        if subscription.format == "binary":
+            layers = layers - {"assets"}
+        asset_ids = self.assets.keys()
+        event_ids = self.events.keys()
+        if bbox is not None:
+            asset_ids = self.asset_index.query_bbox(bbox) if "assets" in layers else ()
+            event_ids = self.event_index.query_bbox(bbox) if layers & {"events", "heatmap"} else ()
+        return self._render(asset_ids, event_ids, bbox, layers, motion=subscription.motion)
+
+    def render_delta(self, subscription: Subscription, asset_ids: Set[str], event_ids: Set[str]) -> Optional[str]:
+        """Changed and removed units and events in the subscriber's view; None if there are none."""
+        parts = []
+        if "assets" in subscription.layers:
+            changed, removed = _changed(asset_ids, self.assets, self.asset_index, subscription.bbox)
+            if changed or removed:
+                parts.append('"assets": [' + ", ".join(self.assets[a] for a in changed) + ']')
+                parts.append('"motion": ' + self._motion(changed))
+                parts.append('"removed_assets": ' + json.dumps(removed))
+        if "events" in subscription.layers:
+            changed, removed = _changed(event_ids, self.events, self.event_index, subscription.bbox)
+            if changed or removed:
+                parts.append('"events": [' + ", ".join(self.events[e] for e in changed) + ']')
+                parts.append('"removed_events": ' + json.dumps(removed))
+        if not parts:
+            return None
+        return "{" + ", ".join(self._motion_header("delta") + parts) + "}"
+
+    def _motion_header(self, kind: str) -> List[str]:
+        return [f'"type": "{kind}"', f'"seq": {self.seq}', f'"sim_time": {json.dumps(self.sim_time)}',
+                f'"timestamp": {json.dumps(self.timestamp)}']
+
+    def _motion(self, asset_ids) -> str:
+        hints = self.motion
+        return "{" + ", ".join(f"{json.dumps(a)}: {hints[a]}" for a in asset_ids if a in hints) + "}"
+
+    # --- Binary positions ---
+
+    @property
+    def road_network_json(self) -> str:
+        return self._road_network
+
+    @property
+    def registry(self) -> Optional[AssetRegistry]:
+        return self._registry
+
+    def packed(self) -> Tuple[np.ndarray, List[str]]:
+        """Position records and the asset id of each row."""
+        return self._packed(), list(self._rows)
+
+    def _packed(self) -> np.ndarray:
+        # Packed lazily: ticks without binary subscribers never pay for it
+        if self._positions is None:
+            self._positions = self._registry.update(self._asset_list)
+            self._rows = {a.asset_id: row for row, a in enumerate(self._asset_list)}
+        return self._positions
+
+    def asset_statuses(self) -> Dict[str, str]:
+        """Status of every asset, read from the packed positions."""
+        if self._statuses is None:
+            codes = self._packed()["status"].tolist()
+            self._statuses = {a: STATUS_NAMES[code] for a, code in zip(self._rows, codes)}
+        return self._statuses
+
+    def asset_meta(self, subscription: Subscription) -> Optional[str]:
+        """asset_meta message for changes the subscriber has not seen, or None."""
+        self._packed()
+        if subscription.meta_version == self._registry.version:
+            return None
+        meta = self._registry.meta_since(subscription.meta_version)
+        subscription.meta_version = meta["version"]
+        return json.dumps(meta)
+
+    def render_positions(self, subscription: Subscription) -> bytes:
+        positions = self._packed()
+        if subscription.bbox is None:
+            if self._positions_full is None:
+                self._positions_full = encode_positions(positions, self.seq, time.time())
+            return self._positions_full
+        rows = sorted(self._rows[a] for a in self.asset_index.query_bbox(subscription.bbox) if a in self._rows)
+        return encode_positions(positions[rows], self.seq, time.time())
+
+    def _render(self, asset_ids, event_ids, bbox: Optional[BBox], layers: FrozenSet[str], motion: bool = False) -> str:
+        parts = self._motion_header("keyframe") if motion else [f'"timestamp": {json.dumps(self.timestamp)}']
+        if "assets" in layers:
+            parts.append('"assets": [' + ", ".join(self.assets[a] for a in asset_ids if a in self.assets) + ']')
+            if motion:
+                parts.append('"motion": ' + self._motion(asset_ids))
+        if "events" in layers:
+            parts.append('"events": [' + ", ".join(self.events[e] for e in event_ids if e in self.events) + ']')
+        if "logs" in layers:
+            parts.append('"logs": ' + self._logs)
+        if "heatmap" in layers:
+            heatmap = [self.heatmap[e] for e in event_ids if e in self.heatmap]
+            heatmap.extend(h for h in self.hotspots if bbox is None or _inside(bbox, h[0], h[1]))
+            parts.append('"heatmap": ' + json.dumps(heatmap))
+        if "road_network" in layers:
+            parts.append('"road_network": ' + self._road_network)
+        if "coverage" in layers and self.coverage is not None:
+            coverage = self.coverage
+            if bbox is not None:
+                coverage = dict(coverage,
+                                covered=[c for c in coverage["covered"] if _inside(bbox, c[0], c[1])],
+                                gaps=[g for g in coverage["gaps"] if _inside(bbox, g[1], g[2])])
+            parts.append('"coverage": ' + json.dumps(coverage))
+        return "{" + ", ".join(parts) + "}"
+
+def _inside(bbox: BBox, lat: float, lng: float) -> bool:
+    return bbox[0] <= lat <= bbox[2] and bbox[1] <= lng <= bbox[3]
+
+def _changed(ids: Set[str], encoded: Dict[str, str], index: GridIndex,
+             bbox: Optional[BBox]) -> Tuple[List[str], List[str]]:
+    # Changed entities inside `bbox`, and those that no longer exist anywhere
+    changed, removed = [], []
+    for key in ids:
+        if key not in encoded:
+            removed.append(key)
+        elif bbox is None or (key in index and _inside(bbox, *index.boxes[key][:2])):
+            changed.append(key)
+    return changed, removed
+
+class ConnectionManager:
+    def __init__(self):
+        self.active_connections: List[WebSocket] = []
+        self.subscriptions: Dict[WebSocket, Subscription] = {}
+        self.last_frame: Optional[TickFrame] = None # Served to REST queries
+
+    async def connect(self, websocket: WebSocket):
+        await websocket.accept()
+        self.active_connections.append(websocket)
+
+    def disconnect(self, websocket: WebSocket):
+        self.active_connections.remove(websocket)
+        self.subscriptions.pop(websocket, None)
+
+    def subscribe(self, websocket: WebSocket, subscription: Subscription):
+        self.subscriptions[websocket] = subscription
+
+    async def broadcast(self, message: str):
+        for connection in self.active_connections:
+            await connection.send_text(message)
+
+    async def broadcast_frame(self, frame: TickFrame, now: Optional[float] = None):
+        self.last_frame = frame
+        # Clients without a subscription get the full state, as before
+        if now is None:
+            now = asyncio.get_running_loop().time()
+        for connection in list(self.active_connections):
+            subscription = self.subscriptions.get(connection)
+            if subscription is not None:
+                if subscription.motion:
+                    if frame.changes is None:
+                        subscription.last_keyframe = -math.inf
+                    else:
+                        subscription.pending_assets |= frame.changes.assets
+                        subscription.pending_events |= frame.changes.events
+                if not subscription.due(now):
+                    continue
+                if subscription.motion:
+                    await self._send_motion(connection, frame, subscription, now)
+                    continue
+                subscription.last_sent = now
+                if subscription.format == "binary":
+                    await self._send_binary(connection, frame, subscription)
+                    continue
+            message = frame.render(subscription)
+            BROADCAST_BYTES.inc(len(message))
+            await connection.send_text(message)
+
+    async def _send_motion(self, connection: WebSocket, frame: TickFrame, subscription: Subscription, now: float):
+        # A keyframe when due, otherwise only what changed; nothing at all in steady state
+        if subscription.keyframe_due(now):
+            message = frame.render(subscription)
+            subscription.last_keyframe = now
+        else:
+            message = frame.render_delta(subscription, subscription.pending_assets, subscription.pending_events)
+        subscription.pending_assets.clear()
+        subscription.pending_events.clear()
+        if message is None:
+            return
+        subscription.last_sent = now
+        BROADCAST_BYTES.inc(len(message))
+        await connection.send_text(message)
+
+    async def _send_binary(self, connection: WebSocket, frame: TickFrame, subscription: Subscription):
+        if "assets" in subscription.layers:
+            meta = frame.asset_meta(subscription)
+            if meta is not None:
+                BROADCAST_BYTES.inc(len(meta))
+                await connection.send_text(meta)
+            positions = frame.render_positions(subscription)
+            BROADCAST_BYTES.inc(len(positions))
+            await connection.send_bytes(positions)
+        if subscription.layers - {"assets"}:
+            message = frame.render(subscription)
+            BROADCAST_BYTES.inc(len(message))
+            await connection.send_text(message)
@@ -0,0 +1,391 @@
+"""Local pub/sub bus between the simulation producer and gateway workers.
+
+With several uvicorn workers only one process may run the simulation;
+otherwise every worker would advance its own city. The producer
+(`python -m app.producer`) owns the `Simulator` and publishes one encoded
+packet per tick over a Unix domain socket. Each gateway worker
+(`VOS_ROLE=gateway`) keeps a `FrameMirror` of the producer's state,
+rebuilds a `TickFrame` from every packet and serves its own WebSocket
+clients from it. Ingest and road changes submitted to any worker are
+validated there and forwarded upstream over the same socket.
+
+Wire format: each message is `<BI` (kind, length) followed by `length`
+bytes of payload: `<I` (JSON length), UTF-8 JSON of plain data, then raw
+bytes (a frame's packed positions). Nothing on the bus is unpickled, and
+forwarded ingest is validated again by the producer's queues. Packets are
+self-contained apart from the road network, which is only sent in
+keyframes, and the KPI sketches, sent in keyframes and when they change.
+So the producer may drop packets for a slow gateway instead of buffering
+without bound; the gateway catches up at the next keyframe.
+
+The socket lives in a directory only its owner can enter (created 0700)
+and is itself made 0600, so other local users cannot inject ingest or
+read frames.
+
+With `VOS_BUS_TRANSPORT=shm` (the default) packets are written once into a
+shared-memory ring (see shmring.py) instead of being copied into every
+gateway's socket; gateways poll it and skip to the newest packet. The
+socket then only carries ingest upstream and tells the producer a new
+gateway needs a keyframe.
+
+Environment:
+    VOS_BUS            Unix socket path (default $XDG_RUNTIME_DIR/vos/bus.sock,
+                       or vos-<uid>/bus.sock in the temp directory)
+    VOS_BUS_TRANSPORT  "shm" or "socket" for frames (default shm)
+    VOS_SHM            shared-memory ring name (default vos-frames)
+"""
+import asyncio
+import json
+import os
+import struct
+import tempfile
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.log import get_logger
+from .broadcast import TickFrame
+from .ingest import IngestQueue
+from .motion import Changes
+from .shmring import FrameRing
+from .sla import SlaStats
+from .spatial import GridIndex
+from .wire import POSITION_DTYPE, AssetRegistry
+
+KIND_FRAME = 1
+KIND_INCIDENTS = 2
+KIND_TELEMETRY = 3
+KIND_ROADS = 4
+
+MESSAGE_HEADER = struct.Struct("<BI")
+PAYLOAD_HEADER = struct.Struct("<I")
+DEFAULT_RING = "vos-frames"
+KEYFRAME_EVERY = 20 # Packets between road-network and KPI refreshes
+MAX_BUFFERED = 4 * 1024 * 1024 # Bytes queued for one gateway before packets are dropped
+FORWARD_INTERVAL = 0.05
+RING_POLL_INTERVAL = 0.02
+
+log = get_logger("bus")
+
+def default_bus_path() -> str:
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    base = os.path.join(runtime, "vos") if runtime else os.path.join(tempfile.gettempdir(), f"vos-{os.getuid()}")
+    return os.path.join(base, "bus.sock")
+
+def bus_path() -> str:
+    return os.environ.get("VOS_BUS") or default_bus_path()
+
+def bus_transport() -> str:
+    return os.environ.get("VOS_BUS_TRANSPORT", "shm")
+
+def ring_name() -> str:
+    return os.environ.get("VOS_SHM", DEFAULT_RING)
+
+def encode_payload(data: Any, blob: bytes = b"") -> bytes:
+    """Plain data as JSON, followed by optional raw bytes."""
+    text = json.dumps(data, separators=(",", ":")).encode()
+    return PAYLOAD_HEADER.pack(len(text)) + text + blob
+
+def decode_payload(data) -> Tuple[Any, bytes]:
+    """Inverse of `encode_payload`; accepts bytes or a memoryview and copies out of it."""
+    (length,) = PAYLOAD_HEADER.unpack_from(data, 0)
+    start = PAYLOAD_HEADER.size
+    if start + length > len(data):
+        raise ValueError("truncated bus payload")
+    return json.loads(bytes(data[start:start + length])), bytes(data[start + length:])
+
+def decode_packet(data) -> Dict[str, Any]:
+    """A frame packet as produced by `encode_frame`, positions as bytes."""
+    packet, packet["positions"] = decode_payload(data)
+    return packet
+
+def _points(index: GridIndex) -> Dict[str, tuple]:
+    return {key: box[:2] for key, box in index.boxes.items()}
+
+def encode_frame(frame: TickFrame, keyframe: bool = False, sla_version: Optional[int] = None) -> bytes:
+    """Serialise a producer-side frame into a bus packet.
+
+    The KPI sketches are left out unless this is a keyframe or they changed
+    since `sla_version` (the version last sent); mirrors keep their copy.
+    """
+    positions, position_ids = frame.packed()
+    registry = frame.registry
+    sla = frame.sla
+    packet = {
+        "seq": frame.seq,
+        "timestamp": frame.timestamp,
+        "assets": frame.assets,
+        "events": frame.events,
+        "asset_points": _points(frame.asset_index),
+        "event_points": _points(frame.event_index),
+        "heatmap": frame.heatmap,
+        "hotspots": frame.hotspots,
+        "coverage": frame.coverage,
+        "sla": sla.export() if sla is not None and (keyframe or sla.version != sla_version) else None,
+        "sim_time": frame.sim_time,
+        "motion": frame.motion,
+        "changes": None if frame.changes is None else (list(frame.changes.assets), list(frame.changes.events)),
+        "roads": frame.roads,
+        "logs": frame.logs,
+        "position_ids": position_ids,
+        # The whole static table is small next to the asset JSON and keeps
+        # every packet usable on its own
+        "static": [(i, s) for i, s in enumerate(registry.static) if s is not None],
+        "road_network": frame.road_network_json if keyframe else None,
+    }
+    return encode_payload(packet, positions.tobytes())
+
+def _sync_index(index: GridIndex, points: Dict[str, tuple]):
+    for key in [k for k in index.boxes if k not in points]:
+        index.remove(key)
+    for key, (lat, lng) in points.items():
+        index.insert_point(key, lat, lng)
+
+def _changes(data) -> Optional[Changes]:
+    return None if data is None else Changes(set(data[0]), set(data[1]))
+
+class FrameMirror:
+    """Gateway-side copy of the producer state, rebuilt from bus packets."""
+
+    def __init__(self):
+        self.registry = AssetRegistry()
+        self.asset_index = GridIndex()
+        self.event_index = GridIndex()
+        self.road_network_json: Optional[str] = None
+        self.last_frame: Optional[TickFrame] = None
+        self.skipped = 0
+        self.sla: Optional[SlaStats] = None
+        self._seq: Optional[int] = None
+
+    def _sla(self, data: Optional[Dict[str, Any]]) -> Optional[SlaStats]:
+        # Rebuilt only when the producer's stats have changed; packets without
+        # them mean no change (or one a skipped packet carried, until the next keyframe)
+        if data is None:
+            return self.sla
+        if self.sla is None or self.sla.version != data["version"]:
+            self.sla = SlaStats.from_export(data)
+        return self.sla
+
+    def apply(self, data: bytes) -> Optional[TickFrame]:
+        """Decode one packet; None until the first keyframe has arrived."""
+        return self.apply_packet(decode_packet(data))
+
+    def apply_packet(self, packet: Dict[str, Any]) -> Optional[TickFrame]:
+        if packet["road_network"] is not None:
+            self.road_network_json = packet["road_network"]
+        if self.road_network_json is None:
+            self.skipped += 1
+            return None
+        for idx, attrs in packet["static"]:
+            self.registry.set_static(idx, tuple(attrs))
+        _sync_index(self.asset_index, packet["asset_points"])
+        _sync_index(self.event_index, packet["event_points"])
+        # Changes only add up when no packet was missed; otherwise clients need a keyframe
+        contiguous = self._seq is not None and packet["seq"] == self._seq + 1
+        self._seq = packet["seq"]
+        self.last_frame = TickFrame(
+            timestamp=packet["timestamp"],
+            assets=packet["assets"],
+            events=packet["events"],
+            heatmap=packet["heatmap"],
+            hotspots=packet["hotspots"],
+            coverage=packet.get("coverage"),
+            sla=self._sla(packet.get("sla")),
+            sim_time=packet.get("sim_time", 0.0),
+            motion=packet.get("motion"),
+            changes=_changes(packet.get("changes")) if contiguous else None,
+            roads=packet.get("roads"),
+            logs=packet["logs"],
+            road_network_json=self.road_network_json,
+            asset_index=self.asset_index,
+            event_index=self.event_index,
+            registry=self.registry,
+            seq=packet["seq"],
+            positions=np.frombuffer(packet["positions"], dtype=POSITION_DTYPE),
+            position_ids=packet["position_ids"],
+        )
+        return self.last_frame
+
+def _write(writer: asyncio.StreamWriter, kind: int, payload: bytes):
+    writer.write(MESSAGE_HEADER.pack(kind, len(payload)))
+    writer.write(payload)
+
+async def _read(reader: asyncio.StreamReader):
+    kind, length = MESSAGE_HEADER.unpack(await reader.readexactly(MESSAGE_HEADER.size))
+    return kind, await reader.readexactly(length)
+
+class BusServer:
+    """Producer end: fans frames out to gateways and accepts forwarded ingest.
+
+    Quacks like `ConnectionManager.broadcast_frame`, so `Simulator.run_loop`
+    publishes to it unchanged. With a `ring`, frames go to shared memory
+    and the socket carries ingest only.
+    """
+
+    def __init__(self, path: str, handlers: Dict[int, Callable[[List[Any]], Any]],
+                 keyframe_every: int = KEYFRAME_EVERY, max_buffered: int = MAX_BUFFERED,
+                 ring: Optional[FrameRing] = None):
+        self.path = path
+        self.ring = ring
+        self.handlers = handlers
+        self.keyframe_every = keyframe_every
+        self.max_buffered = max_buffered
+        self.writers: List[asyncio.StreamWriter] = []
+        self._sessions: List[asyncio.Task] = []
+        self.published = 0
+        self.dropped = 0
+        self._keyframe = True
+        self._sla_version: Optional[int] = None # Of the KPI sketches last sent
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory, mode=0o700)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+        os.chmod(self.path, 0o600)
+        log.info("bus listening", extra={"fields": {"path": self.path}})
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in self.writers:
+            writer.close()
+        await asyncio.gather(*self._sessions, return_exceptions=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.writers.append(writer)
+        self._sessions.append(asyncio.current_task())
+        self._keyframe = True # The newcomer needs the road network
+        log.info("gateway connected", extra={"fields": {"gateways": len(self.writers)}})
+        try:
+            while True:
+                kind, payload = await _read(reader)
+                handler = self.handlers.get(kind)
+                if handler is None:
+                    log.warning("unknown bus message", extra={"fields": {"kind": kind}})
+                    continue
+                try:
+                    batch, _ = decode_payload(payload)
+                except (ValueError, struct.error) as exc:
+                    log.warning("malformed bus message", extra={"fields": {"kind": kind, "error": str(exc)}})
+                    continue
+                handler(batch)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.writers.remove(writer)
+            self._sessions.remove(asyncio.current_task())
+            writer.close()
+            log.info("gateway disconnected", extra={"fields": {"gateways": len(self.writers)}})
+
+    async def broadcast_frame(self, frame: TickFrame):
+        if not self.writers and self.ring is None:
+            return
+        keyframe = self._keyframe or self.published % self.keyframe_every == 0
+        payload = encode_frame(frame, keyframe=keyframe, sla_version=self._sla_version)
+        self._sla_version = frame.sla.version if frame.sla is not None else None
+        self._keyframe = False
+        self.published += 1
+        if self.ring is not None:
+            try:
+                self.ring.publish(payload)
+            except ValueError as exc:
+                self.dropped += 1
+                self._keyframe = self._keyframe or keyframe
+                log.warning("frame not published", extra={"fields": {"error": str(exc)}})
+            return
+        for writer in list(self.writers):
+            # A gateway that cannot keep up misses packets rather than
+            # growing the producer's memory
+            if writer.transport.get_write_buffer_size() > self.max_buffered:
+                self.dropped += 1
+                if keyframe:
+                    self._keyframe = True
+                continue
+            _write(writer, KIND_FRAME, payload)
+
+class BusClient:
+    """Gateway end: mirrors published frames and forwards local ingest."""
+
+    def __init__(self, path: str, forward: Optional[Dict[int, IngestQueue]] = None,
+                 retry_seconds: float = 1.0, ring_name: Optional[str] = None):
+        self.path = path
+        self.ring_name = ring_name
+        self.skipped = 0 # Ring packets superseded before this gateway read them
+        self.forward = forward or {}
+        self.retry_seconds = retry_seconds
+        self.mirror = FrameMirror()
+        self.running = True
+        self.connected = False
+
+    async def run(self, manager):
+        """Connect (retrying), then hand every frame to `manager` until stopped."""
+        poller = asyncio.create_task(self._poll_ring(manager)) if self.ring_name else None
+        try:
+            await self._run_socket(manager)
+        finally:
+            if poller is not None:
+                poller.cancel()
+
+    async def _run_socket(self, manager):
+        while self.running:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except (FileNotFoundError, ConnectionError):
+                await asyncio.sleep(self.retry_seconds)
+                continue
+            self.connected = True
+            log.info("connected to producer", extra={"fields": {"path": self.path}})
+            forwarder = asyncio.create_task(self._forward(writer))
+            try:
+                while self.running:
+                    kind, payload = await _read(reader)
+                    if kind != KIND_FRAME:
+                        continue
+                    frame = self.mirror.apply(payload)
+                    if frame is not None:
+                        await manager.broadcast_frame(frame)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                log.warning("lost producer, reconnecting")
+            finally:
+                self.connected = False
+                forwarder.cancel()
+                writer.close()
+
+    async def _poll_ring(self, manager):
+        ring = None
+        while ring is None:
+            try:
+                ring = FrameRing.attach(self.ring_name)
+            except FileNotFoundError:
+                await asyncio.sleep(self.retry_seconds)
+        last = ring.latest() - 1 # Start from the newest packet
+        try:
+            while self.running:
+                result = ring.read_latest(decode_packet, after=last)
+                if result is not None:
+                    seq, packet = result
+                    self.skipped += max(0, seq - last - 1)
+                    last = seq
+                    frame = self.mirror.apply_packet(packet)
+                    if frame is not None:
+                        await manager.broadcast_frame(frame)
+                await asyncio.sleep(RING_POLL_INTERVAL)
+        finally:
+            ring.close()
+
+    async def _forward(self, writer: asyncio.StreamWriter):
+        while True:
+            for kind, queue in self.forward.items():
+                batch = queue.drain()
+                if batch:
+                    # Validated again on the producer, like any other ingest
+                    _write(writer, kind, encode_payload([item.model_dump(mode="json") for item in batch]))
+            await writer.drain()
+            await asyncio.sleep(FORWARD_INTERVAL)
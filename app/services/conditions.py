@@ -0,0 +1,123 @@
+"""Live road conditions over the shared, immutable road graph.
+
+`RoadNetwork` is built once and shared by every simulator in the process,
+so closures and slowdowns live in a per-simulator `RoadConditions`
+instead. It keeps its own copy of the edge lengths with each edge's
+factor applied (a closed edge is infinitely long), which routing reads in
+place of `RoadNetwork.edge_lengths`; a change rewrites the two directed
+entries of one edge and nothing else.
+
+It also indexes which dispatched routes run over each edge, so a closure
+re-routes only the units whose remaining path uses that road.
+"""
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .routing import RoadNetwork
+
+Edge = Tuple[str, str]
+
+def _key(u: str, v: str) -> Edge:
+    # Roads are two-way: one key per undirected edge
+    return (u, v) if u <= v else (v, u)
+
+class RoadConditions:
+    """Per-edge weight factors and the routes that use each edge."""
+
+    def __init__(self, road_network: RoadNetwork):
+        self.road_network = road_network
+        self.lengths: Dict[Edge, float] = dict(road_network.edge_lengths)
+        self.factors: Dict[Edge, float] = {} # Undirected key -> factor; absent means 1
+        self.version = 0
+        self._described: List[Dict[str, Any]] = []
+        self._described_version = 0
+        self._routes: Dict[str, Set[Edge]] = {}
+        self._users: Dict[Edge, Set[str]] = {}
+
+    # --- Edge weights ---
+
+    def factor(self, u: str, v: str) -> float:
+        return self.factors.get(_key(u, v), 1.0)
+
+    def is_open(self, u: str, v: str) -> bool:
+        return self.factors.get(_key(u, v), 1.0) != math.inf
+
+    def set_factor(self, u: str, v: str, factor: float) -> Tuple[float, float]:
+        """Scale road u-v by `factor` (inf closes it); returns (old, new) length."""
+        base = self.road_network.edge_lengths.get((u, v))
+        if base is None:
+            raise ValueError(f"no road between {u} and {v}")
+        if not factor > 0:
+            raise ValueError("factor must be positive")
+        old = self.lengths[(u, v)]
+        key = _key(u, v)
+        if factor == 1.0:
+            self.factors.pop(key, None)
+        else:
+            self.factors[key] = factor
+        self.lengths[(u, v)] = self.lengths[(v, u)] = base * factor
+        self.version += 1
+        return old, base * factor
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Roads that differ from the base graph, as served by /roads/conditions (cached per version)."""
+        if self._described_version != self.version:
+            self._described = [{"from_node": u, "to_node": v, "closed": math.isinf(f),
+                                "factor": None if math.isinf(f) else f}
+                               for (u, v), f in sorted(self.factors.items())]
+            self._described_version = self.version
+        return self._described
+
+    @property
+    def heuristic_scale(self) -> float:
+        """Keeps A* admissible when some roads were made faster than their length."""
+        return min(1.0, min(self.factors.values(), default=1.0))
+
+    def open_neighbors(self, node: str) -> Sequence[str]:
+        neighbors = self.road_network.adj_list.get(node, ())
+        if not self.factors:
+            return neighbors
+        return [n for n in neighbors if self.is_open(node, n)]
+
+    # --- Routing ---
+
+    def route(self, start: str, target: str) -> List[str]:
+        return self.road_network.get_path(start, target, lengths=self.lengths,
+                                          heuristic_scale=self.heuristic_scale)
+
+    # --- Route index ---
+
+    def track(self, unit: str, nodes: Iterable[str]):
+        """Record the route `nodes` (from the unit's current node) for `unit`."""
+        self.untrack(unit)
+        nodes = list(nodes)
+        edges = {_key(a, b) for a, b in zip(nodes, nodes[1:])}
+        if edges:
+            self._routes[unit] = edges
+            for edge in edges:
+                self._users.setdefault(edge, set()).add(unit)
+
+    def untrack(self, unit: str):
+        for edge in self._routes.pop(unit, ()):
+            users = self._users[edge]
+            users.discard(unit)
+            if not users:
+                del self._users[edge]
+
+    def users(self, u: str, v: str) -> Set[str]:
+        """Units whose tracked route runs over road u-v."""
+        return set(self._users.get(_key(u, v), ()))
+
+def uses(nodes: List[str], u: str, v: str) -> bool:
+    """Whether the consecutive `nodes` traverse road u-v in either direction."""
+    return any((a == u and b == v) or (a == v and b == u) for a, b in zip(nodes, nodes[1:]))
+
+def reroute(conditions: RoadConditions, path: List[str]) -> Optional[List[str]]:
+    """`path` re-planned under current conditions, keeping the node being driven to.
+
+    A unit already on a closed stretch drives it out to `path[0]` and turns
+    from there. Returns None when no open route is left.
+    """
+    head, destination = path[0], path[-1]
+    tail = conditions.route(head, destination)
+    return [head] + tail[1:] if tail else None
@@ -0,0 +1,153 @@
+"""Response coverage: which road nodes an idle unit can reach in time.
+
+A multi-source Dijkstra from every available unit, bounded at
+`target_s`, gives each node its best ETA and the unit that covers it.
+Nodes nobody reaches within the target are coverage gaps.
+
+The forest is kept up to date incrementally. Each unit is anchored at
+the node it will reach next, with the seconds it needs to get there. A
+unit that gets closer to the same anchor only improves ETAs, so its seed
+is pushed and relaxed outwards. A unit that leaves (dispatched, off duty)
+or changes anchor withdraws: the nodes it owned are cleared and refilled
+from their covered neighbours and from other units anchored inside them.
+The work per update is proportional to the region that changed, not to
+the graph. Anchor improvements smaller than `tolerance_s` are ignored,
+so ETAs are never optimistic and overstate by at most that much.
+
+Edge lengths are read from `lengths` (live road conditions); when one
+changes, `edge_changed` withdraws only the units whose trees ran over it.
+"""
+import heapq
+import math
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+from .routing import RoadNetwork
+
+TARGET_SECONDS = 8 * 60.0
+TOLERANCE_SECONDS = 10.0
+
+Anchor = Tuple[str, float] # (node, seconds to reach it)
+
+class Coverage:
+    """Best ETA and covering unit per node, within `target_s`."""
+
+    def __init__(self, road_network: RoadNetwork, speed_mps: float,
+                 target_s: float = TARGET_SECONDS, tolerance_s: float = TOLERANCE_SECONDS,
+                 lengths: Optional[Mapping[Tuple[str, str], float]] = None):
+        self.road_network = road_network
+        self.lengths = road_network.edge_lengths if lengths is None else lengths
+        self.speed_mps = speed_mps
+        self.target_s = target_s
+        self.tolerance_s = tolerance_s
+        self.eta: Dict[str, float] = {} # Covered nodes only
+        self.owner: Dict[str, str] = {}
+        self.gaps: Set[str] = set(road_network.nodes)
+        self.anchors: Dict[str, Anchor] = {}
+        self.version = 0 # Bumped whenever an ETA changes
+        self.relaxed = 0 # Node settlements, for benchmarks
+        self._owned: Dict[str, Set[str]] = {}
+        self._anchored_at: Dict[str, Set[str]] = {}
+        self._entries: Dict[str, list] = {} # Covered nodes as layer rows
+        self._layer: Optional[Dict] = None
+        self._layer_version = -1
+
+    def update(self, anchors: Dict[str, Anchor]):
+        """Bring coverage in line with the available units' `anchors`."""
+        heap: List[Tuple[float, str, str]] = []
+        withdrawn = [u for u, (node, seconds) in self.anchors.items()
+                     if u not in anchors or anchors[u][0] != node or anchors[u][1] > seconds]
+        if withdrawn:
+            self._withdraw(withdrawn, heap)
+        for unit, (node, seconds) in anchors.items():
+            old = self.anchors.get(unit)
+            if old is not None and old[1] - seconds < self.tolerance_s:
+                continue # Unchanged, or not enough closer to matter
+            self.anchors[unit] = (node, seconds)
+            self._anchored_at.setdefault(node, set()).add(unit)
+            heapq.heappush(heap, (seconds, node, unit))
+        if heap:
+            self._relax(heap)
+
+    def _withdraw(self, units: List[str], heap: List[Tuple[float, str, str]]):
+        region: Set[str] = set()
+        for unit in units:
+            node, _ = self.anchors.pop(unit)
+            self._anchored_at[node].discard(unit)
+            region |= self._owned.pop(unit, set())
+        for node in region:
+            del self.eta[node]
+            del self.owner[node]
+            del self._entries[node]
+            self.gaps.add(node)
+        if region:
+            self.version += 1
+        lengths = self.lengths
+        for node in region:
+            # Refill from the covered edge of the region...
+            for neighbor in self.road_network.adj_list[node]:
+                eta = self.eta.get(neighbor)
+                if eta is not None:
+                    heapq.heappush(heap, (eta + lengths[(neighbor, node)] / self.speed_mps, node, self.owner[neighbor]))
+            # ...and from units anchored inside it
+            for unit in self._anchored_at.get(node, ()):
+                heapq.heappush(heap, (self.anchors[unit][1], node, unit))
+
+    def _relax(self, heap: List[Tuple[float, str, str]]):
+        adj = self.road_network.adj_list
+        lengths = self.lengths
+        nodes = self.road_network.nodes
+        eta = self.eta
+        settled = 0
+        while heap:
+            d, node, unit = heapq.heappop(heap)
+            if d > self.target_s or d >= eta.get(node, math.inf):
+                continue
+            previous = self.owner.get(node)
+            if previous is not None:
+                self._owned[previous].discard(node)
+            eta[node] = d
+            self.owner[node] = unit
+            self._owned.setdefault(unit, set()).add(node)
+            self._entries[node] = [nodes[node][0], nodes[node][1], round(d, 1), unit]
+            self.gaps.discard(node)
+            settled += 1
+            for neighbor in adj[node]:
+                nd = d + lengths[(node, neighbor)] / self.speed_mps
+                if nd <= self.target_s and nd < eta.get(neighbor, math.inf):
+                    heapq.heappush(heap, (nd, neighbor, unit))
+        if settled:
+            self.relaxed += settled
+            self.version += 1
+
+    def edge_changed(self, u: str, v: str, old_length: float):
+        """Re-settle after road u-v went from `old_length` to its current length."""
+        heap: List[Tuple[float, str, str]] = []
+        # Trees that reached one end through the road lose what hangs off it
+        crossing = {self.owner[b] for a, b in ((u, v), (v, u))
+                    if a in self.eta and b in self.eta and self.owner[a] == self.owner[b]
+                    and math.isclose(self.eta[b], self.eta[a] + old_length / self.speed_mps)}
+        if crossing:
+            anchors = {unit: self.anchors[unit] for unit in crossing}
+            self._withdraw(list(crossing), heap)
+            for unit, (node, seconds) in anchors.items():
+                self.anchors[unit] = (node, seconds)
+                self._anchored_at.setdefault(node, set()).add(unit)
+                heapq.heappush(heap, (seconds, node, unit))
+        # A shorter road can only improve what lies beyond it
+        new_length = self.lengths[(u, v)]
+        for a, b in ((u, v), (v, u)):
+            if a in self.eta:
+                heapq.heappush(heap, (self.eta[a] + new_length / self.speed_mps, b, self.owner[a]))
+        self._relax(heap)
+
+    def layer(self) -> Dict:
+        """JSON-ready coverage layer: covered nodes with their ETA, and the gaps."""
+        if self._layer_version != self.version:
+            nodes = self.road_network.nodes
+            self._layer = {
+                "target_s": self.target_s,
+                "covered": list(self._entries.values()), # [lat, lng, eta_s, unit]
+                "gaps": [[n, nodes[n][0], nodes[n][1]] for n in self.gaps],
+            }
+            self._layer_version = self.version
+        return self._layer
@@ -0,0 +1,70 @@
+"""Pending-incident queue ordered by response deadline.
+
+Each incident gets a deadline when it is reported: its type's response
+SLA, shortened for high severity (severity 10 halves it, severity 1
+stretches it by 40%). Popping the earliest deadline first serves urgent
+incidents ahead of older minor ones while still letting a minor call
+that has waited long enough overtake a fresh one, with a static heap key
+so every push and pop is O(log n).
+"""
+import heapq
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+from ..core.entities import EventState
+from ..core.models import EventType, IncidentPhase
+
+RESPONSE_SLA_SECONDS: Dict[EventType, float] = {
+    EventType.ASSAULT: 300.0,
+    EventType.MEDICAL: 300.0,
+    EventType.ACCIDENT: 480.0,
+    EventType.CIVIL_UNREST: 600.0,
+    EventType.THEFT: 900.0,
+}
+
+def deadline(event: EventState) -> float:
+    """Epoch seconds by which a unit should be on its way."""
+    severity = min(max(event.severity, 1), 10)
+    return event.created_at.timestamp() + RESPONSE_SLA_SECONDS[event.type] * (1.5 - severity / 10.0)
+
+class DispatchQueue:
+    """Min-heap of PENDING incidents by deadline.
+
+    Entries for incidents that are no longer pending (dispatched, purged)
+    are dropped lazily when they surface.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self.deadlines: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, event: EventState):
+        key = self.deadlines.get(event.event_id)
+        if key is None:
+            key = self.deadlines[event.event_id] = deadline(event)
+        heapq.heappush(self._heap, (key, next(self._seq), event.event_id))
+
+    def peek(self, events: Dict[str, EventState]) -> Optional[EventState]:
+        """Most urgent pending incident, or None."""
+        heap = self._heap
+        while heap:
+            event = events.get(heap[0][2])
+            if event is not None and event.phase == IncidentPhase.PENDING:
+                return event
+            self.deadlines.pop(heap[0][2], None)
+            heapq.heappop(heap)
+        return None
+
+    def pop(self):
+        heapq.heappop(self._heap)
+
+    def forget(self, event_id: str):
+        self.deadlines.pop(event_id, None)
+
+    def outranks(self, event: EventState, other: EventState) -> bool:
+        """True if `event` is due strictly before `other`."""
+        return self.deadlines.get(event.event_id, deadline(event)) < self.deadlines.get(other.event_id, deadline(other))
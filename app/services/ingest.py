@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from ..core.models import IncidentIn
+
+DEDUPE_WINDOW = 100_000 # Caller-supplied ids remembered for duplicate checks
+
+class IngestQueue:
+    """Bounded queue between the ingest endpoints and the simulation tick.
+
+    Producers validate and enqueue without blocking; when the queue is full
+    the overflow is rejected instead of stalling the event loop. The tick
+    drains it in batches of at most `batch_size`. Payloads are validated
+    against `model` (incidents by default, GPS pings for telemetry).
+    Items that carry an `event_id` already accepted among the last
+    `DEDUPE_WINDOW` ids are rejected as duplicates.
+    """
+
+    def __init__(self, maxsize: int = 10000, batch_size: int = 500, model: Type[BaseModel] = IncidentIn):
+        self.model = model
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.batch_size = batch_size
+        self.accepted = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.latency_ms_last = 0.0
+        self.latency_ms_max = 0.0
+        self.latency_ms_avg = 0.0 # Exponential moving average
+        self._seen_ids: "OrderedDict[str, None]" = OrderedDict()
+
+    def submit_batch(self, payloads: List[Any]) -> Dict[str, Any]:
+        """Validate `payloads` and enqueue the valid ones.
+
+        Returns a summary with the accepted count and, per rejected item,
+        its index in the batch and the reason.
+        """
+        received_at = time.monotonic()
+        errors = []
+        accepted = 0
+        for index, payload in enumerate(payloads):
+            try:
+                item = payload if isinstance(payload, self.model) else self.model(**payload)
+            except (ValidationError, TypeError) as exc:
+                errors.append({"index": index, "reason": "invalid", "detail": str(exc)})
+                continue
+            item_id = getattr(item, "event_id", None)
+            if item_id is not None and item_id in self._seen_ids:
+                errors.append({"index": index, "reason": "duplicate"})
+                continue
+            try:
+                self.queue.put_nowait((item, received_at))
+            except asyncio.QueueFull:
+                errors.append({"index": index, "reason": "queue_full"})
+                self.dropped += 1
+                continue
+            if item_id is not None:
+                self._seen_ids[item_id] = None
+                if len(self._seen_ids) > DEDUPE_WINDOW:
+                    self._seen_ids.popitem(last=False)
+            accepted += 1
+
+        self.accepted += accepted
+        self.rejected += len(errors)
+        return {"accepted": accepted, "rejected": errors, "queue_depth": self.queue.qsize()}
+
+    def drain(self) -> List[BaseModel]:
+        """Pop up to `batch_size` items without waiting."""
+        batch: List[Tuple[BaseModel, float]] = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        if batch:
+            now = time.monotonic()
+            for _, received_at in batch:
+                self._record_latency((now - received_at) * 1000)
+        return [item for item, _ in batch]
+
+    def _record_latency(self, latency_ms: float):
+        self.latency_ms_last = latency_ms
+        self.latency_ms_max = max(self.latency_ms_max, latency_ms)
+        self.latency_ms_avg += 0.05 * (latency_ms - self.latency_ms_avg)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "latency_ms": {
+                "last": round(self.latency_ms_last, 3),
+                "avg": round(self.latency_ms_avg, 3),
+                "max": round(self.latency_ms_max, 3),
+            },
+        }
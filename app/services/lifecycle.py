@@ -0,0 +1,55 @@
+"""Incident lifecycle: phases, legal transitions and service times.
+
+    PENDING -> DISPATCHED -> EN_ROUTE -> ON_SCENE -> CLEARING -> RESOLVED
+
+A unit already at the incident node skips EN_ROUTE; an incident whose unit
+is diverted to a more urgent call goes back to PENDING. Once the incident is
+RESOLVED its unit returns to patrol (IDLE). Time spent on scene and
+clearing (paperwork, handover) is drawn from a lognormal distribution
+whose median depends on the incident type and grows with severity.
+"""
+import math
+import random
+from typing import Dict, FrozenSet
+
+from ..core.entities import EventState
+from ..core.models import EventType, IncidentPhase
+
+TRANSITIONS: Dict[IncidentPhase, FrozenSet[IncidentPhase]] = {
+    IncidentPhase.PENDING: frozenset({IncidentPhase.DISPATCHED}),
+    IncidentPhase.DISPATCHED: frozenset({IncidentPhase.EN_ROUTE, IncidentPhase.ON_SCENE, IncidentPhase.PENDING}),
+    IncidentPhase.EN_ROUTE: frozenset({IncidentPhase.ON_SCENE, IncidentPhase.PENDING}),
+    IncidentPhase.ON_SCENE: frozenset({IncidentPhase.CLEARING}),
+    IncidentPhase.CLEARING: frozenset({IncidentPhase.RESOLVED}),
+    IncidentPhase.RESOLVED: frozenset(),
+}
+
+# Median minutes on scene at severity 1; severity 10 doubles it
+ON_SCENE_MINUTES: Dict[EventType, float] = {
+    EventType.THEFT: 20.0,
+    EventType.ASSAULT: 30.0,
+    EventType.ACCIDENT: 40.0,
+    EventType.CIVIL_UNREST: 60.0,
+    EventType.MEDICAL: 25.0,
+}
+CLEARING_MINUTES = 5.0
+SPREAD = 0.4 # Lognormal sigma
+
+RESOLVED_RETENTION_SECONDS = 60.0 # Resolved incidents stay visible this long
+
+def transition(event: EventState, phase: IncidentPhase):
+    if phase not in TRANSITIONS[event.phase]:
+        raise ValueError(f"{event.event_id}: illegal transition {event.phase.value} -> {phase.value}")
+    event.phase = phase
+
+def _severity_scale(severity: int) -> float:
+    return 1.0 + (min(max(severity, 1), 10) - 1) / 9.0
+
+def _draw(rng: random.Random, median_minutes: float) -> float:
+    return rng.lognormvariate(math.log(median_minutes * 60.0), SPREAD)
+
+def on_scene_seconds(rng: random.Random, event: EventState) -> float:
+    return _draw(rng, ON_SCENE_MINUTES[event.type] * _severity_scale(event.severity))
+
+def clearing_seconds(rng: random.Random, event: EventState) -> float:
+    return _draw(rng, CLEARING_MINUTES * _severity_scale(event.severity))
@@ -0,0 +1,178 @@
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.models import GpsPing
+from ..core.utils import M_PER_DEG_LAT, equirectangular_m
+from .routing import RoadNetwork
+
+@dataclass
+class Candidate:
+    edge_id: int
+    offset: float # Fraction along edge u -> v
+    lat: float
+    lng: float
+    distance_m: float # Perpendicular distance from the ping
+
+@dataclass
+class MatchedPosition:
+    asset_id: str
+    lat: float
+    lng: float
+    timestamp: float
+    edge: Optional[Tuple[str, str]] = None # None when no road was in range
+    offset: float = 0.0
+    node: Optional[str] = None # Nearest endpoint of the matched edge
+
+@dataclass
+class _TrackState:
+    candidates: List[Candidate]
+    scores: List[float] # Viterbi log-probabilities, max normalized to 0
+    lat: float
+    lng: float
+    timestamp: float
+
+class HMMMapMatcher:
+    """Online HMM map-matcher (Newson & Krumm) over RoadNetwork edges.
+
+    Hidden states are projections of a ping onto nearby edges. Emission
+    probability is Gaussian in the perpendicular distance (`sigma_m`);
+    transition probability is exponential in the difference between road
+    distance and straight-line distance of consecutive pings (`beta_m`).
+    Each unit keeps only the last Viterbi column, so every ping is an O(K^2)
+    update and the reported position is the current best state.
+
+    `match_batch` gathers candidates for all pings at once and projects them
+    onto their edges in one vectorized numpy pass.
+    """
+
+    def __init__(self, road_network: RoadNetwork, sigma_m: float = 15.0, beta_m: float = 40.0,
+                 search_radius_m: float = 60.0, max_candidates: int = 5,
+                 max_route_m: float = 3000.0, cache_size: int = 4096):
+        self.road_network = road_network
+        self.sigma_m = sigma_m
+        self.beta_m = beta_m
+        self.search_radius_m = search_radius_m
+        self.max_candidates = max_candidates
+        self.max_route_m = max_route_m
+        self.cache_size = cache_size
+        self.tracks: Dict[str, _TrackState] = {}
+        self._route_cache: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+
+    def forget(self, asset_id: str):
+        self.tracks.pop(asset_id, None)
+
+    def clear_cache(self):
+        self._route_cache.clear()
+
+    # --- Candidates ---
+
+    def candidates_batch(self, pings: Sequence[GpsPing]) -> List[List[Candidate]]:
+        """Nearby edge projections per ping, closest first."""
+        graph = self.road_network
+        ping_idx, edge_ids = [], []
+        for i, ping in enumerate(pings):
+            for edge_id in graph.candidate_edges(ping.lat, ping.lng, self.search_radius_m):
+                ping_idx.append(i)
+                edge_ids.append(edge_id)
+
+        result: List[List[Candidate]] = [[] for _ in pings]
+        if not edge_ids:
+            return result
+
+        ping_idx_arr = np.asarray(ping_idx)
+        geom = graph.edge_geometry[np.asarray(edge_ids)]
+        plat = np.fromiter((p.lat for p in pings), dtype=np.float64, count=len(pings))[ping_idx_arr]
+        plng = np.fromiter((p.lng for p in pings), dtype=np.float64, count=len(pings))[ping_idx_arr]
+
+        # Local planar frame in metres centred on each ping
+        kx = np.cos(np.radians(plat)) * M_PER_DEG_LAT
+        ax, ay = (geom[:, 1] - plng) * kx, (geom[:, 0] - plat) * M_PER_DEG_LAT
+        dx, dy = (geom[:, 3] - geom[:, 1]) * kx, (geom[:, 2] - geom[:, 0]) * M_PER_DEG_LAT
+        seg_len2 = dx * dx + dy * dy
+        t = np.where(seg_len2 > 0, -(ax * dx + ay * dy) / np.where(seg_len2 > 0, seg_len2, 1.0), 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        dist = np.hypot(ax + t * dx, ay + t * dy)
+        proj_lat = geom[:, 0] + t * (geom[:, 2] - geom[:, 0])
+        proj_lng = geom[:, 1] + t * (geom[:, 3] - geom[:, 1])
+
+        keep = np.nonzero(dist <= self.search_radius_m)[0]
+        for k in keep[np.argsort(dist[keep], kind="stable")]:
+            bucket = result[ping_idx[k]]
+            if len(bucket) < self.max_candidates:
+                bucket.append(Candidate(edge_ids[k], float(t[k]), float(proj_lat[k]),
+                                        float(proj_lng[k]), float(dist[k])))
+        return result
+
+    # --- Viterbi ---
+
+    def match_batch(self, pings: Sequence[GpsPing]) -> List[MatchedPosition]:
+        """Match a batch of pings from any number of units, oldest first per unit."""
+        order = sorted(range(len(pings)), key=lambda i: (pings[i].asset_id, pings[i].timestamp))
+        ordered = [pings[i] for i in order]
+        candidates = self.candidates_batch(ordered)
+        return [self._step(ping, cands) for ping, cands in zip(ordered, candidates)]
+
+    def _step(self, ping: GpsPing, candidates: List[Candidate]) -> MatchedPosition:
+        track = self.tracks.get(ping.asset_id)
+        if not candidates:
+            # Off-network: report the raw fix and keep the previous column
+            return MatchedPosition(ping.asset_id, ping.lat, ping.lng, ping.timestamp)
+
+        emissions = [-0.5 * (c.distance_m / self.sigma_m) ** 2 for c in candidates]
+        scores = None
+        if track is not None and ping.timestamp >= track.timestamp:
+            straight = equirectangular_m((track.lat, track.lng), (ping.lat, ping.lng))
+            scores = []
+            for cand, emission in zip(candidates, emissions):
+                best = -math.inf
+                for prev, prev_score in zip(track.candidates, track.scores):
+                    route = self._route_distance(prev, cand)
+                    if route == math.inf:
+                        continue
+                    best = max(best, prev_score - abs(route - straight) / self.beta_m)
+                scores.append(best + emission)
+            if max(scores) == -math.inf:
+                scores = None # HMM break: no feasible transition, restart the track
+        if scores is None:
+            scores = emissions
+
+        top = max(scores)
+        self.tracks[ping.asset_id] = _TrackState(
+            candidates, [s - top for s in scores], ping.lat, ping.lng, ping.timestamp)
+
+        best = candidates[scores.index(top)]
+        u, v = self.road_network.edges[best.edge_id]
+        return MatchedPosition(ping.asset_id, best.lat, best.lng, ping.timestamp,
+                               (u, v), best.offset, u if best.offset < 0.5 else v)
+
+    def _route_distance(self, a: Candidate, b: Candidate) -> float:
+        graph = self.road_network
+        ua, va = graph.edges[a.edge_id]
+        len_a = graph.edge_lengths[(ua, va)]
+        if a.edge_id == b.edge_id:
+            return abs(b.offset - a.offset) * len_a
+        ub, vb = graph.edges[b.edge_id]
+        len_b = graph.edge_lengths[(ub, vb)]
+        best = math.inf
+        for exit_node, exit_cost in ((ua, a.offset * len_a), (va, (1 - a.offset) * len_a)):
+            dist = self._distances_from(exit_node)
+            for entry_node, entry_cost in ((ub, b.offset * len_b), (vb, (1 - b.offset) * len_b)):
+                d = dist.get(entry_node)
+                if d is not None:
+                    best = min(best, exit_cost + d + entry_cost)
+        return best
+
+    def _distances_from(self, node: str) -> Dict[str, float]:
+        dist = self._route_cache.get(node)
+        if dist is None:
+            dist = self.road_network.distances_from(node, self.max_route_m)
+            self._route_cache[node] = dist
+            if len(self._route_cache) > self.cache_size:
+                self._route_cache.popitem(last=False)
+        else:
+            self._route_cache.move_to_end(node)
+        return dist
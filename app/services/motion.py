@@ -0,0 +1,82 @@
+"""Movement hints, so clients can animate units between frames.
+
+A moving unit's hint is the polyline it is about to drive (its position,
+then the next `MAX_HINT_NODES` nodes of its path) with the simulated time
+at which it reaches each point, and its nominal speed. A client that
+knows the simulated time can place the unit anywhere along that line
+itself (`position_at`), so the server only has to resend a unit when its
+hint stops being valid:
+
+* its status or telemetry flag changed;
+* it was given a new path (dispatch, re-route, patrol turn). Paths are
+  always replaced by a new list and only ever edited by popping reached
+  nodes, so list identity tells the two apart without comparing nodes;
+* it drove past the last hinted node.
+
+Hints are encoded once when they are issued and reused until then.
+"""
+import bisect
+import json
+from dataclasses import dataclass, field
+from typing import Callable, Collection, Dict, List, Optional, Set, Tuple
+
+from ..core.entities import AssetState
+
+MAX_HINT_NODES = 16
+KEYFRAME_SECONDS = 5.0 # Default full-state interval for motion subscribers
+
+Hint = Dict # {"points": [[lat, lng], ...], "etas": [sim_s, ...], "next_node", "eta", "speed_mps"}
+
+@dataclass
+class Changes:
+    """Entities a motion subscriber must be re-sent after one frame."""
+    assets: Set[str] = field(default_factory=set) # New hint, new state, or gone
+    events: Set[str] = field(default_factory=set)
+
+class MotionTracker:
+    """Current hint per asset, reissued only when it stops being valid."""
+
+    def __init__(self):
+        self.hints: Dict[str, str] = {} # Encoded, moving assets only
+        self._keys: Dict[str, Tuple] = {}
+
+    def update(self, assets: Collection[AssetState], hint: Callable[[AssetState], Optional[Hint]]) -> Set[str]:
+        """Refresh hints; returns the ids whose hint was reissued or dropped."""
+        changed = set()
+        keys = self._keys
+        seen = 0
+        for asset in assets:
+            seen += 1
+            key = keys.get(asset.asset_id)
+            if key is not None:
+                status, telemetry, path, issued = key
+                if (asset.status is status and asset.telemetry == telemetry and asset.path is path
+                        and len(path) > issued - MAX_HINT_NODES):
+                    continue
+            keys[asset.asset_id] = (asset.status, asset.telemetry, asset.path, len(asset.path))
+            encoded = hint(asset)
+            if encoded is None:
+                self.hints.pop(asset.asset_id, None)
+            else:
+                self.hints[asset.asset_id] = json.dumps(encoded)
+            changed.add(asset.asset_id)
+        if seen != len(keys):
+            present = {a.asset_id for a in assets}
+            for gone in [a for a in keys if a not in present]:
+                del keys[gone]
+                self.hints.pop(gone, None)
+                changed.add(gone)
+        return changed
+
+def position_at(hint: Hint, sim_time: float) -> Tuple[float, float]:
+    """(lat, lng) along the hinted polyline at `sim_time` (clamped to its ends)."""
+    points: List[List[float]] = hint["points"]
+    etas: List[float] = hint["etas"]
+    if sim_time <= etas[0]:
+        return points[0][0], points[0][1]
+    i = bisect.bisect_left(etas, sim_time)
+    if i >= len(etas):
+        return points[-1][0], points[-1][1]
+    (lat0, lng0), (lat1, lng1) = points[i - 1], points[i]
+    frac = (sim_time - etas[i - 1]) / (etas[i] - etas[i - 1])
+    return lat0 + (lat1 - lat0) * frac, lng0 + (lng1 - lng0) * frac
@@ -0,0 +1,138 @@
+"""Spatial queries for the REST API, answered from the latest tick frame.
+
+Candidates come from the frame's grid indexes, which the simulator (or a
+gateway's FrameMirror) updates incrementally every tick, so a query only
+visits the cells around it. Hits are ordered (by distance, or by id for
+polygons) and paged with `offset`/`limit`; only the returned page is
+decoded, and `fields` trims each record to the requested keys.
+"""
+import heapq
+import json
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..core.utils import M_PER_DEG_LAT
+from .broadcast import TickFrame
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+MIN_POLYGON_VERTICES = 3
+
+Polygon = List[Tuple[float, float]]
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """"asset_id,status" -> ["asset_id", "status"]; None keeps every field."""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    return names or None
+
+def parse_polygon(text: str) -> Polygon:
+    """"lat,lng;lat,lng;..." -> vertices; raises ValueError if malformed."""
+    vertices = []
+    for pair in text.split(";"):
+        if not pair.strip():
+            continue
+        parts = pair.split(",")
+        if len(parts) != 2:
+            raise ValueError(f"bad vertex {pair!r}, expected lat,lng")
+        lat, lng = float(parts[0]), float(parts[1])
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValueError(f"vertex {pair!r} out of range")
+        vertices.append((lat, lng))
+    if len(vertices) < MIN_POLYGON_VERTICES:
+        raise ValueError(f"polygon needs at least {MIN_POLYGON_VERTICES} vertices")
+    return vertices
+
+def point_in_polygon(lat: float, lng: float, polygon: Polygon) -> bool:
+    # Ray casting along the latitude line
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lng_i = polygon[i]
+        lat_j, lng_j = polygon[j]
+        if (lat_i > lat) != (lat_j > lat):
+            if lng < lng_i + (lat - lat_i) * (lng_j - lng_i) / (lat_j - lat_i):
+                inside = not inside
+        j = i
+    return inside
+
+def _project(record: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return record
+    return {name: record[name] for name in fields if name in record}
+
+def _page(keys: List[str], encoded: Dict[str, str], offset: int, limit: int,
+          fields: Optional[Sequence[str]], extra: Optional[Dict[str, Dict[str, Any]]] = None,
+          total: Optional[int] = None) -> Dict[str, Any]:
+    """One page of `keys`; `total` defaults to len(keys) when they were not truncated."""
+    total = len(keys) if total is None else total
+    items = []
+    for key in keys[offset:offset + limit]:
+        record = _project(json.loads(encoded[key]), fields)
+        if extra is not None:
+            record.update(extra[key])
+        items.append(record)
+    end = offset + len(items)
+    return {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": end if end < total else None,
+        "items": items,
+    }
+
+def assets_near(frame: TickFrame, lat: float, lng: float, radius_m: float,
+                status: Optional[str] = None, fields: Optional[Sequence[str]] = None,
+                offset: int = 0, limit: int = DEFAULT_LIMIT) -> Dict[str, Any]:
+    """Assets within `radius_m` of (lat, lng), nearest first."""
+    # Equirectangular distances with the query latitude's scale, as in equirectangular_m
+    kx = math.cos(math.radians(lat))
+    dlat = radius_m / M_PER_DEG_LAT
+    dlng = dlat / max(kx, 1e-6)
+    limit_deg = dlat * dlat
+    boxes = frame.asset_index.boxes
+    statuses = frame.asset_statuses() if status else None
+    hits = []
+    for key in frame.asset_index.query_bbox((lat - dlat, lng - dlng, lat + dlat, lng + dlng)):
+        if key not in frame.assets or (statuses is not None and statuses.get(key) != status):
+            continue
+        box = boxes[key]
+        x = (box[1] - lng) * kx
+        y = box[0] - lat
+        d2 = x * x + y * y
+        if d2 <= limit_deg:
+            hits.append((d2, key))
+    # Only the rows up to the end of the page need ordering
+    ranked = heapq.nsmallest(offset + limit, hits)
+    keys = [key for _, key in ranked]
+    distances = {key: {"distance_m": round(math.sqrt(d2) * M_PER_DEG_LAT, 1)} for d2, key in ranked[offset:]}
+    return _page(keys, frame.assets, offset, limit, fields, distances, total=len(hits))
+
+def events_within(frame: TickFrame, polygon: Polygon, status: Optional[str] = None,
+                  fields: Optional[Sequence[str]] = None,
+                  offset: int = 0, limit: int = DEFAULT_LIMIT) -> Dict[str, Any]:
+    """Events inside `polygon`, by event id. `status` matches status or phase."""
+    lats = [v[0] for v in polygon]
+    lngs = [v[1] for v in polygon]
+    boxes = frame.event_index.boxes
+    keys = []
+    for key in frame.event_index.query_bbox((min(lats), min(lngs), max(lats), max(lngs))):
+        if key not in frame.events:
+            continue
+        box = boxes[key]
+        if point_in_polygon(box[0], box[1], polygon):
+            keys.append(key)
+    if status:
+        # Events are few next to assets; decode hits only when filtering
+        keys = [key for key in keys if status in _event_states(frame.events[key])]
+    keys.sort()
+    return _page(keys, frame.events, offset, limit, fields)
+
+def _event_states(encoded: str) -> Tuple[Any, Any]:
+    record = json.loads(encoded)
+    return record.get("status"), record.get("phase")
+
+def get_asset(frame: TickFrame, asset_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    encoded = frame.assets.get(asset_id)
+    return None if encoded is None else _project(json.loads(encoded), fields)
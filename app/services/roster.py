@@ -0,0 +1,120 @@
+"""Shift roster: fatigue, hours worked, breaks and relief handovers.
+
+Fatigue and hours worked live in numpy arrays with one row per unit, so
+accruing them is a few vector operations per tick whatever the fleet size;
+the asset fields are written back from the arrays for frames and traces.
+A unit accrues fatigue at the rate of its duty: patrolling, on a call, or
+stood down (on a break or handing over), which recovers. Units crossing
+FATIGUE_LIMIT are found from the same vectors and kept in `fatigued`,
+which dispatch excludes.
+
+Shift ends and breaks are timers on the simulator's event queue; a unit
+busy on a call when one falls due finishes the call first. At the end of
+a shift (or as soon as a crew is over the fatigue limit) the unit stands
+down for a handover and comes back with a fresh crew.
+"""
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from ..core.entities import AssetState
+from ..core.models import AssetStatus
+
+# Duty states, used as indexes into FATIGUE_PER_HOUR
+PATROL = 0
+ON_CALL = 1
+STOOD_DOWN = 2
+
+FATIGUE_PER_HOUR = np.array([0.06, 0.12, -0.4])
+FATIGUE_LIMIT = 0.85 # Crews at or above this are not dispatched
+
+SHIFT_SECONDS = 8 * 3600.0
+BREAK_AFTER_SECONDS = 4 * 3600.0
+BREAK_SECONDS = 30 * 60.0
+HANDOVER_SECONDS = 15 * 60.0
+
+def duty_of(status: AssetStatus) -> int:
+    if status == AssetStatus.OFF_DUTY:
+        return STOOD_DOWN
+    if status == AssetStatus.IDLE:
+        return PATROL
+    return ON_CALL
+
+def patrol_fatigue(seconds: float) -> float:
+    """Fatigue of a crew that has patrolled for `seconds`."""
+    return min(1.0, float(FATIGUE_PER_HOUR[PATROL]) * seconds / 3600.0)
+
+class Roster:
+    """Per-unit fatigue and hours worked, updated for the whole fleet at once."""
+
+    def __init__(self):
+        self.members: Optional[Dict[str, AssetState]] = None # The dict rows were built from
+        self.assets: List[AssetState] = []
+        self.rows: Dict[str, int] = {}
+        self.fatigue = np.zeros(0)
+        self.worked = np.zeros(0) # Seconds on duty this shift
+        self.duty = np.zeros(0, dtype=np.intp)
+        self.over = np.zeros(0, dtype=bool)
+        self.fatigued: Set[str] = set()
+        self.synced_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self.assets)
+
+    def rebuild(self, assets: Dict[str, AssetState]) -> List[AssetState]:
+        """Re-index rows on `assets`; returns the units not seen before."""
+        self.write_back()
+        previous = {id(asset): row for row, asset in enumerate(self.assets)}
+        self.members = assets
+        self.assets = list(assets.values())
+        self.rows = {asset.asset_id: row for row, asset in enumerate(self.assets)}
+        self.fatigue = np.array([a.fatigue_level for a in self.assets], dtype=np.float64)
+        self.worked = np.array([a.time_worked_minutes * 60.0 for a in self.assets], dtype=np.float64)
+        self.duty = np.array([duty_of(a.status) for a in self.assets], dtype=np.intp)
+        # New rows start below the limit so the next accrue reports them
+        old_over = self.over
+        self.over = np.array([id(a) in previous and bool(old_over[previous[id(a)]]) for a in self.assets], dtype=bool)
+        self.fatigued = {a.asset_id for a, over in zip(self.assets, self.over) if over}
+        return [a for a in self.assets if id(a) not in previous]
+
+    def set_duty(self, asset_id: str, duty: int):
+        row = self.rows.get(asset_id)
+        if row is not None:
+            self.duty[row] = duty
+
+    def accrue(self, now: float) -> List[str]:
+        """Bring every unit up to `now`; returns units that just crossed FATIGUE_LIMIT."""
+        seconds = now - self.synced_at
+        self.synced_at = now
+        if seconds <= 0 or not self.assets:
+            return []
+        self.fatigue += FATIGUE_PER_HOUR[self.duty] * (seconds / 3600.0)
+        np.clip(self.fatigue, 0.0, 1.0, out=self.fatigue)
+        self.worked += (self.duty != STOOD_DOWN) * seconds
+        over = self.fatigue >= FATIGUE_LIMIT
+        changed = np.flatnonzero(over != self.over)
+        self.over = over
+        crossed = []
+        for row in changed.tolist():
+            asset_id = self.assets[row].asset_id
+            if over[row]:
+                self.fatigued.add(asset_id)
+                crossed.append(asset_id)
+            else:
+                self.fatigued.discard(asset_id)
+        return crossed
+
+    def relieve(self, asset_id: str):
+        """A fresh crew takes over the unit."""
+        row = self.rows.get(asset_id)
+        if row is None:
+            return
+        self.fatigue[row] = 0.0
+        self.worked[row] = 0.0
+        self.over[row] = False
+        self.fatigued.discard(asset_id)
+
+    def write_back(self):
+        for asset, fatigue, worked in zip(self.assets, self.fatigue.tolist(), self.worked.tolist()):
+            asset.fatigue_level = fatigue
+            asset.time_worked_minutes = worked / 60.0
@@ -1,6 +1,15 @@
+import heapq
+import json
 import math
-from typing import List, Tuple, Dict, Set
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
 from ..core.models import Location
+from ..core.utils import M_PER_DEG_LAT, equirectangular_m
+from .spatial import GridIndex
 
 # --- KORAMANGALA & MADIWALA DENSE GRAPH ---
 # Coordinates approximated for key intersections to ensure road adherence.
@@ -74,22 +83,91 @@ EDGES = [
 ]
 
 class RoadNetwork:
-    def __init__(self):
-        self.nodes = NODES
+    """Immutable road graph.
+
+    Built once and shared by every Simulator in the process (see
+    `get_road_network`). Nodes and adjacency are read-only views so that a
+    shared instance cannot be mutated by one consumer behind another's back.
+    """
+
+    def __init__(self, nodes: Optional[Mapping[str, Tuple[float, float]]] = None,
+                 edges: Optional[Iterable[Tuple[str, str]]] = None):
+        self.nodes = MappingProxyType(dict(NODES if nodes is None else nodes))
+        self.edges = tuple((u, v) for u, v in (EDGES if edges is None else edges)
+                           if u in self.nodes and v in self.nodes)
         self.adj_list = self._build_adj_list()
+        self._json = None
+        self._json_text = None
 
-    def _build_adj_list(self) -> Dict[str, List[str]]:
+    def _build_adj_list(self) -> Mapping[str, Tuple[str, ...]]:
         adj = {node: [] for node in self.nodes}
-        for u, v in EDGES:
-            if u in adj and v in adj:
-                adj[u].append(v)
-                adj[v].append(u)
-        return adj
+        for u, v in self.edges:
+            adj[u].append(v)
+            adj[v].append(u)
+        return MappingProxyType({node: tuple(neighbors) for node, neighbors in adj.items()})
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Plain-dict view for JSON encoding, built once per graph."""
+        if self._json is None:
+            self._json = {
+                "nodes": {name: list(coords) for name, coords in self.nodes.items()},
+                "edges": {name: list(neighbors) for name, neighbors in self.adj_list.items()},
+            }
+        return self._json
+
+    def to_json(self) -> str:
+        """`to_dict` encoded as a JSON string, built once per graph."""
+        if self._json_text is None:
+            self._json_text = json.dumps(self.to_dict())
+        return self._json_text
+
+    # --- Spatial indexes (derived lazily, the graph itself never changes) ---
+
+    @cached_property
+    def node_index(self) -> GridIndex:
+        index = GridIndex()
+        for name, (lat, lng) in self.nodes.items():
+            index.insert_point(name, lat, lng)
+        return index
+
+    @cached_property
+    def edge_index(self) -> GridIndex:
+        """Edge ids (positions in `edges`) by bounding box."""
+        index = GridIndex()
+        for edge_id, (u, v) in enumerate(self.edges):
+            (lat1, lng1), (lat2, lng2) = self.nodes[u], self.nodes[v]
+            index.insert(edge_id, (min(lat1, lat2), min(lng1, lng2), max(lat1, lat2), max(lng1, lng2)))
+        return index
+
+    @cached_property
+    def edge_geometry(self) -> np.ndarray:
+        """(E, 4) array of [lat_u, lng_u, lat_v, lng_v] per edge id."""
+        geometry = np.empty((len(self.edges), 4), dtype=np.float64)
+        for edge_id, (u, v) in enumerate(self.edges):
+            geometry[edge_id, :2] = self.nodes[u]
+            geometry[edge_id, 2:] = self.nodes[v]
+        return geometry
+
+    @cached_property
+    def edge_lengths(self) -> Mapping[Tuple[str, str], float]:
+        """Edge length in metres, keyed in both directions."""
+        lengths = {}
+        for u, v in self.edges:
+            length = equirectangular_m(self.nodes[u], self.nodes[v])
+            lengths[(u, v)] = lengths[(v, u)] = length
+        return MappingProxyType(lengths)
+
+    def candidate_edges(self, lat: float, lng: float, radius_m: float) -> List[int]:
+        """Ids of edges whose bounding box lies within `radius_m` of the point."""
+        return list(self.edge_index.query_radius(lat, lng, radius_m / M_PER_DEG_LAT))
 
     def get_nearest_node(self, location: Location) -> str:
         """Find the nearest graph node to a given coordinate."""
+        nearest = self.node_index.nearest(location.lat, location.lng)
+        if nearest is not None:
+            return nearest
+        # Far outside the indexed area: fall back to a full scan
         min_dist = float('inf')
-        nearest = None
         for name, coords in self.nodes.items():
             dist = math.sqrt((location.lat - coords[0])**2 + (location.lng - coords[1])**2)
             if dist < min_dist:
@@ -97,6 +175,63 @@ class RoadNetwork:
                 nearest = name
         return nearest
 
+    def distances_from(self, source: str, limit_m: float = float('inf'),
+                       lengths: Optional[Mapping[Tuple[str, str], float]] = None) -> Dict[str, float]:
+        """Dijkstra road distances in metres from `source`, up to `limit_m`.
+
+        `lengths` overrides `edge_lengths` (see services/conditions.py).
+        """
+        lengths = self.edge_lengths if lengths is None else lengths
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist.get(node, float('inf')):
+                continue
+            for neighbor in self.adj_list.get(node, ()):
+                nd = d + lengths[(node, neighbor)]
+                if nd <= limit_m and nd < dist.get(neighbor, float('inf')):
+                    dist[neighbor] = nd
+                    heapq.heappush(heap, (nd, neighbor))
+        return dist
+
+    def get_path(self, start_node: str, target_node: str,
+                 lengths: Optional[Mapping[Tuple[str, str], float]] = None,
+                 heuristic_scale: float = 1.0) -> List[str]:
+        """A* shortest path by road distance, start and target included.
+
+        `lengths` overrides `edge_lengths`; infinite lengths are never
+        taken. `heuristic_scale` must not exceed the smallest ratio of
+        `lengths` to the straight-line distance, to keep A* exact.
+        """
+        if start_node == target_node:
+            return [start_node]
+        if start_node not in self.nodes or target_node not in self.nodes:
+            return []
+
+        lengths = self.edge_lengths if lengths is None else lengths
+        target = self.nodes[target_node]
+        g_score = {start_node: 0.0}
+        came_from: Dict[str, str] = {}
+        heap = [(equirectangular_m(self.nodes[start_node], target) * heuristic_scale, 0.0, start_node)]
+        while heap:
+            _, g, node = heapq.heappop(heap)
+            if node == target_node:
+                path = [node]
+                while node in came_from:
+                    node = came_from[node]
+                    path.append(node)
+                return path[::-1]
+            if g > g_score[node]:
+                continue
+            for neighbor in self.adj_list[node]:
+                ng = g + lengths[(node, neighbor)]
+                if ng < g_score.get(neighbor, float('inf')):
+                    g_score[neighbor] = ng
+                    came_from[neighbor] = node
+                    heapq.heappush(heap, (ng + equirectangular_m(self.nodes[neighbor], target) * heuristic_scale, ng, neighbor))
+        return [] # No path found
+
     def get_next_step(self, current_node: str, target_node: str) -> str:
         """BFS to find the next node to move to towards target."""
         if current_node == target_node:
@@ -119,3 +254,13 @@ class RoadNetwork:
                     queue.append((neighbor, path + [neighbor]))
         
         return current_node # No path found
+
+
+@lru_cache(maxsize=None)
+def get_road_network() -> RoadNetwork:
+    """Process-wide shared RoadNetwork, built lazily on first use.
+
+    Call this before forking workers to have the children inherit the
+    already-built graph through copy-on-write pages.
+    """
+    return RoadNetwork()
@@ -0,0 +1,51 @@
+import heapq
+import itertools
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+class EventQueue:
+    """Priority queue of timestamped simulation events.
+
+    Entries are `(time, seq, kind, key, payload)`; `seq` keeps ties in
+    scheduling order so runs stay deterministic. At most one pending entry
+    exists per `(kind, key)`: scheduling again or cancelling just bumps a
+    token, and superseded entries are skipped when they reach the top of
+    the heap (lazy deletion), so every operation is O(log n).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str, Hashable, Any]] = []
+        self._seq = itertools.count()
+        self._live: Dict[Tuple[str, Hashable], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, kind_key: Tuple[str, Hashable]) -> bool:
+        return kind_key in self._live
+
+    def schedule(self, time: float, kind: str, key: Hashable, payload: Any = None):
+        """Schedule (or reschedule) `kind` for `key` at `time`."""
+        seq = next(self._seq)
+        self._live[(kind, key)] = seq
+        heapq.heappush(self._heap, (time, seq, kind, key, payload))
+
+    def cancel(self, kind: str, key: Hashable):
+        self._live.pop((kind, key), None)
+
+    def _prune(self):
+        heap = self._heap
+        while heap and self._live.get((heap[0][2], heap[0][3])) != heap[0][1]:
+            heapq.heappop(heap)
+
+    def peek_time(self) -> Optional[float]:
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> Optional[Tuple[float, str, Hashable, Any]]:
+        """Earliest live entry at or before `now`, removed; None if none is due."""
+        self._prune()
+        if not self._heap or self._heap[0][0] > now:
+            return None
+        time, _, kind, key, payload = heapq.heappop(self._heap)
+        del self._live[(kind, key)]
+        return time, kind, key, payload
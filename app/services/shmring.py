@@ -0,0 +1,121 @@
+"""Shared-memory ring of tick packets, one writer and any number of readers.
+
+The producer writes each encoded packet into the next of `slots`
+fixed-size slots and then publishes its sequence number in the header.
+Readers poll the header and always jump to the newest sequence number, so
+a slow reader skips frames instead of holding the writer back; nothing in
+the producer ever waits on a gateway.
+
+Layout: header `<4sIIQ` (magic, slots, slot size, latest seq), then
+`slots` slots of `<QIQ` (begin seq, length, end seq) plus data. The writer
+stamps `begin` before touching the data and `end` after it; a reader
+checks `end` before decoding and `begin` afterwards (a seqlock), so a slot
+overwritten mid-read is detected and retried.
+"""
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Optional, Tuple, TypeVar
+
+from ..core.log import get_logger
+
+MAGIC = b"VRNG"
+HEADER = struct.Struct("<4sIIQ")
+SLOT_HEADER = struct.Struct("<QIQ")
+DEFAULT_SLOTS = 4
+DEFAULT_SLOT_SIZE = 16 * 1024 * 1024
+READ_ATTEMPTS = 3
+
+T = TypeVar("T")
+
+log = get_logger("shmring")
+
+class FrameRing:
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        magic, self.slots, self.slot_size, _ = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{shm.name} is not a frame ring")
+        self.seq = self.latest()
+        self.torn = 0
+
+    @classmethod
+    def create(cls, name: str, slots: int = DEFAULT_SLOTS, slot_size: int = DEFAULT_SLOT_SIZE) -> "FrameRing":
+        size = HEADER.size + slots * (SLOT_HEADER.size + slot_size)
+        try:
+            # A producer that crashed leaves its segment behind
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, slots, slot_size, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameRing":
+        shm = shared_memory.SharedMemory(name=name)
+        # Readers must not unlink the producer's segment when they exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    def _slot_offset(self, seq: int) -> int:
+        return HEADER.size + (seq % self.slots) * (SLOT_HEADER.size + self.slot_size)
+
+    def latest(self) -> int:
+        return HEADER.unpack_from(self.shm.buf, 0)[3]
+
+    def publish(self, payload: bytes) -> int:
+        """Write `payload` as the next sequence number and return it."""
+        if len(payload) > self.slot_size:
+            raise ValueError(f"packet of {len(payload)} bytes exceeds slot size {self.slot_size}")
+        seq = self.seq + 1
+        offset = self._slot_offset(seq)
+        buf = self.shm.buf
+        SLOT_HEADER.pack_into(buf, offset, seq, 0, 0)
+        start = offset + SLOT_HEADER.size
+        buf[start:start + len(payload)] = payload
+        SLOT_HEADER.pack_into(buf, offset, seq, len(payload), seq)
+        HEADER.pack_into(buf, 0, MAGIC, self.slots, self.slot_size, seq)
+        self.seq = seq
+        return seq
+
+    def read_latest(self, decode: Callable[[memoryview], T], after: int = 0) -> Optional[Tuple[int, T]]:
+        """Decode the newest packet if it is newer than `after`.
+
+        `decode` gets a zero-copy view of the slot and must not keep it;
+        it should raise ValueError (or struct.error) for bytes it cannot
+        decode, as a slot torn by the writer may hold any bytes.
+        Returns (seq, decoded) or None when there is nothing new or the
+        slot kept being overwritten while it was read.
+        """
+        for _ in range(READ_ATTEMPTS):
+            seq = self.latest()
+            if seq <= after:
+                return None
+            offset = self._slot_offset(seq)
+            _, length, end = SLOT_HEADER.unpack_from(self.shm.buf, offset)
+            if end != seq:
+                self.torn += 1
+                continue
+            start = offset + SLOT_HEADER.size
+            view = self.shm.buf[start:start + length]
+            try:
+                decoded = decode(view)
+            except (ValueError, struct.error) as exc:
+                # Expected when the writer lapped us mid-read; checked below
+                log.debug("undecodable ring slot", extra={"fields": {"seq": seq, "error": str(exc)}})
+                decoded = None
+            finally:
+                view.release()
+            begin = SLOT_HEADER.unpack_from(self.shm.buf, offset)[0]
+            if begin == seq and decoded is not None:
+                return seq, decoded
+            self.torn += 1
+        return None
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
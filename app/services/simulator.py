@@ -1,138 +1,621 @@
 import asyncio
+import itertools
+import logging
 import random
-import json
 import math
-from datetime import datetime
-from typing import List, Dict
-from fastapi.encoders import jsonable_encoder
+import time
+from datetime import datetime, timedelta
+from typing import Collection, List, Dict, Optional, Tuple
 
-from ..core.models import Asset, AssetType, AssetStatus, Event, EventType, EventStatus, Location
-from ..core.utils import haversine_distance
-from .routing import RoadNetwork
+from ..core.clock import SimClock, WallClock
+from ..core.log import get_logger
+from ..core.metrics import DISPATCHES, EVENTS, GPS_PINGS, PATH_SEARCHES, PREEMPTIONS, RELIEFS, REROUTES, TICK_PHASE, TICK_SECONDS
+from ..core.entities import AssetState, EventState, Position
+from ..core.models import AssetType, AssetStatus, EventType, EventStatus, GpsPing, IncidentIn, IncidentPhase, Location, RoadScale
+from ..core.utils import M_PER_DEG_LAT, equirectangular_m
+from .broadcast import TickFrame
+from .conditions import RoadConditions, reroute, uses
+from .coverage import Coverage
+from .ingest import IngestQueue
+from . import lifecycle, roster
+from .dispatch import DispatchQueue, deadline
+from .mapmatch import HMMMapMatcher
+from .motion import MAX_HINT_NODES, Changes, MotionTracker
+from .routing import RoadNetwork, get_road_network
+from .schedule import EventQueue
+from .sla import SlaStats
+from .snapshot import SnapshotStore
+from .spatial import GridIndex, hex_cell
+from .wire import AssetRegistry
 
 # Bangalore (Koramangala/Madiwala) approximate bounds
 LAT_MIN, LAT_MAX = 12.9150, 12.9450
 LNG_MIN, LNG_MAX = 77.6050, 77.6350
 
+log = get_logger("simulator")
+event_log = get_logger("events")
+dispatch_log = get_logger("dispatch")
+
+# Tick phase histograms, bound once so the hot path skips label lookups
+PHASE_INGEST = TICK_PHASE.labels("ingest")
+PHASE_GENERATE = TICK_PHASE.labels("generate")
+PHASE_TIMERS = TICK_PHASE.labels("timers")
+PHASE_ASSIGN = TICK_PHASE.labels("assign") # Includes route
+PHASE_ROUTE = TICK_PHASE.labels("route")
+PHASE_MOVE = TICK_PHASE.labels("move")
+PHASE_SERIALIZE = TICK_PHASE.labels("serialize")
+PHASE_BROADCAST = TICK_PHASE.labels("broadcast")
+EVENTS_GENERATED = EVENTS.labels("generated")
+EVENTS_INGESTED = EVENTS.labels("ingest")
+
+def _lap(phase, start: float) -> float:
+    now = time.perf_counter()
+    phase.observe(now - start)
+    return now
+
+TICK_INTERVAL = 0.5 # Seconds of simulated time per tick
+SPEED = 0.00015 # Approx speed in degrees per tick
+EVENT_PROBABILITY = 0.05 # Chance of a generated incident per tick
+
+PREEMPT_GAIN_M = 1000.0 # Divert an en-route unit only if it is this much closer
+PREEMPT_RADIUS_M = 3000.0 # How far to look for a unit to divert
+ROUTE_ATTEMPTS = 4 # Nearest units tried per incident and tick when closures cut some off
+
+# Timer kinds, keyed by event id
+ON_SCENE_DONE = "on_scene_done"
+CLEARED = "cleared"
+PURGE = "purge"
+# Roster timer kinds, keyed by asset id
+SHIFT_END = "shift_end"
+BREAK = "break"
+ON_DUTY = "on_duty"
+
 class Simulator:
-    def __init__(self):
-        self.road_network = RoadNetwork()
-        self.assets: Dict[str, Asset] = self._init_assets()
-        self.events: Dict[str, Event] = {}
+    """Reference simulation engine.
+
+    All randomness goes through `self.rng` and all timestamps through
+    `self.clock`. Passing `seed` (or an explicit `rng`) together with a
+    `SimClock` makes a run fully reproducible, which the golden-trace
+    harness in `services/trace.py` relies on.
+    """
+
+    def __init__(self, road_network: Optional[RoadNetwork] = None, seed: Optional[int] = None,
+                 rng: Optional[random.Random] = None, clock=None,
+                 tick_seconds: float = TICK_INTERVAL, preempt_gain_m: Optional[float] = PREEMPT_GAIN_M):
+        self.road_network = road_network or get_road_network()
+        self.rng = rng or random.Random(seed)
+        self.clock = clock or (SimClock() if seed is not None else WallClock())
+        self.tick_seconds = tick_seconds
+        self.tick_count = 0
+        self.sim_time = 0.0 # Seconds of simulated time since start
+        self.timers = EventQueue()
+        self._timer_handlers = {
+            ON_SCENE_DONE: self._on_scene_done,
+            CLEARED: self._on_cleared,
+            PURGE: self._on_purge,
+            SHIFT_END: self._on_shift_end,
+            BREAK: self._on_break,
+            ON_DUTY: self._on_duty,
+        }
+        self._event_ids = itertools.count(1)
+        self.assets: Dict[str, AssetState] = self._init_assets()
+        self.events: Dict[str, EventState] = {}
         self.ingestion_log: List[Dict] = []
+        self.ingest_queue = IngestQueue()
+        self.telemetry_queue = IngestQueue(maxsize=50000, batch_size=5000, model=GpsPing)
+        self.road_queue = IngestQueue(maxsize=1000, batch_size=100, model=RoadScale) # Forwarded by gateways
+        self.map_matcher = HMMMapMatcher(self.road_network)
+        self.asset_index = GridIndex()
+        self.event_index = GridIndex()
+        self.available_index = GridIndex() # Units that can take a call
+        self.conditions = RoadConditions(self.road_network) # Closures and slowdowns
+        self.coverage = Coverage(self.road_network, SPEED * M_PER_DEG_LAT / tick_seconds,
+                                 lengths=self.conditions.lengths)
+        self.dispatch_queue = DispatchQueue()
+        self.sla = SlaStats() # Dispatch and arrival latency sketches
+        self.preempt_gain_m = preempt_gain_m # None disables preemption
+        self.roster = roster.Roster() # Built on the first tick, so `assets` may still be replaced
+        self._leave_due: Dict[str, tuple] = {} # Stand-downs waiting for the unit's call to end
+        self._off_duty: Dict[str, str] = {} # Why each stood-down unit is off
+        self.wire_registry = AssetRegistry()
+        self.snapshots = SnapshotStore() # Published at the end of each tick for lock-free readers
+        self.motion = MotionTracker() # Movement hints for client-side animation
+        self._ingest_ids = itertools.count(1)
         self.running = True
+        self._update_asset_index()
 
-    def _init_assets(self) -> Dict[str, Asset]:
+    def _init_assets(self) -> Dict[str, AssetState]:
         assets = {}
         node_names = list(self.road_network.nodes.keys())
         # Increased to 15 assets
         for i in range(15):
-            start_node = random.choice(node_names)
+            start_node = self.rng.choice(node_names)
             coords = self.road_network.nodes[start_node]
+            now = self.clock.now()
+            # Crews came on at staggered times so handovers spread over the shift
+            on_duty = roster.SHIFT_SECONDS * i / 15
             
-            assets[f"PCR-{i+1}"] = Asset(
+            assets[f"PCR-{i+1}"] = AssetState(
                 asset_id=f"PCR-{i+1}",
                 type=AssetType.PCR,
-                location=Location(lat=coords[0], lng=coords[1]),
-                status=AssetStatus.IDLE
+                location=Position(coords[0], coords[1]),
+                status=AssetStatus.IDLE,
+                last_ping=now,
+                shift_start=now - timedelta(seconds=on_duty),
+                time_worked_minutes=on_duty / 60.0,
+                fatigue_level=roster.patrol_fatigue(on_duty),
+                current_node=start_node
             )
-            assets[f"PCR-{i+1}"].current_node = start_node
-            assets[f"PCR-{i+1}"].target_node = None
-            assets[f"PCR-{i+1}"].path = [] # List of nodes to follow
         return assets
 
     def _generate_event(self):
-        if random.random() < 0.05: # Slightly reduced frequency
-            event_id = f"EVT-{int(datetime.now().timestamp())}-{random.randint(100,999)}"
-            evt_type = random.choice(list(EventType))
-            
-            # Snap event to a random node for reachable dispatch
-            node_names = list(self.road_network.nodes.keys())
-            event_node = random.choice(node_names)
-            coords = self.road_network.nodes[event_node]
-            
-            self.events[event_id] = Event(
-                event_id=event_id,
-                type=evt_type,
-                severity=random.randint(1, 10),
-                location=Location(lat=coords[0], lng=coords[1]),
-                status=EventStatus.ACTIVE
-            )
-            self.events[event_id].node_id = event_node # Store node ID for routing
-            
-            self.ingestion_log.append({
-                "id": event_id,
-                "timestamp": datetime.now().isoformat(),
-                "source": "100-DIAL",
-                "raw_data": f"Caller reported {evt_type} at {event_node}"
-            })
-            if len(self.ingestion_log) > 50:
-                self.ingestion_log.pop(0)
+        if self.rng.random() < EVENT_PROBABILITY: # Slightly reduced frequency
+            self._spawn_event()
+
+    def _spawn_event(self) -> EventState:
+        # Monotonic per simulator: unique however many events a second brings
+        event_id = f"EVT-{next(self._event_ids):06d}"
+        evt_type = self.rng.choice(list(EventType))
+
+        # Snap event to a random node for reachable dispatch
+        node_names = list(self.road_network.nodes.keys())
+        event_node = self.rng.choice(node_names)
+        coords = self.road_network.nodes[event_node]
+
+        event = self.events[event_id] = EventState(
+            event_id=event_id,
+            type=evt_type,
+            severity=self.rng.randint(1, 10),
+            location=Position(coords[0], coords[1]),
+            status=EventStatus.ACTIVE,
+            created_at=self.clock.now(),
+            node_id=event_node # For routing
+        )
+        self.event_index.insert_point(event_id, coords[0], coords[1])
+        self.dispatch_queue.push(event)
+        EVENTS_GENERATED.inc()
+
+        self.ingestion_log.append({
+            "id": event_id,
+            "timestamp": self.clock.now().isoformat(),
+            "source": "100-DIAL",
+            "raw_data": f"Caller reported {evt_type} at {event_node}"
+        })
+        if len(self.ingestion_log) > 50:
+            self.ingestion_log.pop(0)
+
+        if event_log.isEnabledFor(logging.DEBUG):
+            event_log.debug("event generated", extra={"fields": {
+                "event_id": event_id, "type": evt_type.value, "node": event_node}})
+        return event
+
+    def _ingest_events(self):
+        # Materialize externally reported incidents queued since the last tick
+        for incident in self.ingest_queue.drain():
+            try:
+                self.add_incident(incident)
+            except ValueError as e:
+                self.ingest_queue.rejected += 1
+                event_log.warning("incident rejected", extra={"fields": {"event_id": incident.event_id, "reason": str(e)}})
+
+    def add_incident(self, incident: IncidentIn) -> EventState:
+        """Materialize a reported incident; a caller-supplied id must not be live already."""
+        if incident.event_id is not None and incident.event_id in self.events:
+            raise ValueError(f"duplicate event id {incident.event_id}")
+        event_id = incident.event_id or f"EVT-IN-{next(self._ingest_ids)}"
+        event_node = self.road_network.get_nearest_node(incident.location)
+        coords = self.road_network.nodes[event_node]
+        reported_at = incident.reported_at
+        if reported_at is not None and reported_at.tzinfo is not None:
+            # Simulation clocks are naive local time
+            reported_at = reported_at.astimezone().replace(tzinfo=None)
 
-            print(f"Generated Event: {event_id} ({evt_type}) at {event_node}")
+        event = EventState(
+            event_id=event_id,
+            type=incident.type,
+            severity=incident.severity,
+            location=Position(coords[0], coords[1]),
+            status=EventStatus.ACTIVE,
+            created_at=reported_at or self.clock.now(),
+            node_id=event_node
+        )
+        self.events[event_id] = event
+        self.event_index.insert_point(event_id, coords[0], coords[1])
+        self.dispatch_queue.push(event)
+        EVENTS_INGESTED.inc()
+
+        self.ingestion_log.append({
+            "id": event_id,
+            "timestamp": self.clock.now().isoformat(),
+            "source": incident.source,
+            "raw_data": incident.raw_data or f"Caller reported {incident.type} at {event_node}"
+        })
+        if len(self.ingestion_log) > 50:
+            self.ingestion_log.pop(0)
+        return event
+
+    def _ingest_road_changes(self):
+        # Closures and slowdowns forwarded from gateway workers
+        for change in self.road_queue.drain():
+            try:
+                self.set_road_factor(change.from_node, change.to_node, change.factor)
+            except ValueError as e:
+                self.road_queue.rejected += 1
+                log.warning("road change rejected", extra={"fields": {
+                    "from": change.from_node, "to": change.to_node, "reason": str(e)}})
+
+    def _ingest_telemetry(self):
+        # Map-match queued GPS pings and apply them to their assets
+        pings = self.telemetry_queue.drain()
+        if not pings:
+            return
+        GPS_PINGS.inc(len(pings))
+        types = {ping.asset_id: ping.type for ping in pings}
+        for match in self.map_matcher.match_batch(pings):
+            asset = self.assets.get(match.asset_id)
+            if asset is None:
+                asset = AssetState(
+                    asset_id=match.asset_id,
+                    type=types[match.asset_id],
+                    location=Position(match.lat, match.lng),
+                    status=AssetStatus.IDLE,
+                    shift_start=self.clock.now(),
+                    current_node=match.node or self.road_network.get_nearest_node(Location(lat=match.lat, lng=match.lng))
+                )
+                self.assets[match.asset_id] = asset
+            asset.telemetry = True
+            asset.location.lat = match.lat
+            asset.location.lng = match.lng
+            asset.last_ping = datetime.fromtimestamp(match.timestamp)
+            if match.node is not None:
+                asset.current_node = match.node
 
     def _assign_tasks(self):
-        # Assign IDLE assets to ACTIVE unassigned events
-        active_events = [e for e in self.events.values() if e.status == EventStatus.ACTIVE]
-        idle_assets = [a for a in self.assets.values() if a.status == AssetStatus.IDLE]
-        
-        for event in active_events:
-            # Check if already assigned (simple check: is any asset targeting this event?)
-            is_assigned = any(a.target_event_id == event.event_id for a in self.assets.values() if hasattr(a, 'target_event_id'))
-            if is_assigned:
-                continue
-                
-            if not idle_assets:
+        # Most urgent pending incident first. Each decision is a heap pop plus
+        # a grid search around the incident, not a scan of events x units.
+        deferred = []
+        while True:
+            event = self.dispatch_queue.peek(self.events)
+            if event is None:
                 break
-                
-            # Find nearest asset
-            best_asset = None
-            min_dist = float('inf')
-            
-            for asset in idle_assets:
-                dist = haversine_distance(asset.location, event.location)
-                if dist < min_dist:
-                    min_dist = dist
-                    best_asset = asset
-            
-            if best_asset:
-                best_asset.status = AssetStatus.DISPATCHED
-                best_asset.target_event_id = event.event_id
-                best_asset.target_node = event.node_id
-                # Calculate path
-                best_asset.path = self._calculate_path(best_asset.current_node, event.node_id)
-                idle_assets.remove(best_asset)
-                print(f"Dispatched {best_asset.asset_id} to {event.event_id}")
+            unit = self._nearest_available(event)
+            diverted = self._preemption_candidate(event, unit)
+            if unit is None and diverted is None:
+                break
+            self.dispatch_queue.pop()
+            path = self._path_to(diverted, event) if diverted is not None else None
+            if path is None:
+                diverted = None
+                unit, path = self._reachable_unit(event, unit)
+            if path is None:
+                # Closed roads cut the scene off from the nearest unit; try again next tick
+                deferred.append(event)
+                continue
+            if diverted is not None:
+                self._preempt(diverted, event)
+                unit = diverted
+            self._dispatch_unit(unit, event, path)
+        for event in deferred:
+            self.dispatch_queue.push(event)
+
+    def _is_available(self, asset: AssetState) -> bool:
+        # A unit walled in by closed roads cannot reach anything until one reopens
+        return (asset.status == AssetStatus.IDLE and asset.asset_id not in self.roster.fatigued
+                and (not self.conditions.factors or bool(self.conditions.open_neighbors(asset.current_node))))
+
+    def _nearest_available(self, event: EventState, exclude: Collection[str] = ()) -> Optional[AssetState]:
+        if not len(self.available_index):
+            return None
+        accept = (lambda key: key not in exclude) if exclude else None
+        key = self.available_index.nearest(event.location.lat, event.location.lng, accept=accept)
+        return self.assets.get(key) if key is not None else None
+
+    def _reachable_unit(self, event: EventState,
+                        unit: Optional[AssetState]) -> Tuple[Optional[AssetState], Optional[List[str]]]:
+        """`unit` and its route to the scene, or the next-nearest unit that has one."""
+        tried = set()
+        while unit is not None and len(tried) < ROUTE_ATTEMPTS:
+            path = self._path_to(unit, event)
+            if path is not None:
+                return unit, path
+            tried.add(unit.asset_id)
+            unit = self._nearest_available(event, exclude=tried)
+        return None, None
+
+    def _preemption_candidate(self, event: EventState, unit: Optional[AssetState]) -> Optional[AssetState]:
+        """En-route unit on a less urgent call that is `preempt_gain_m` closer than `unit`."""
+        if self.preempt_gain_m is None:
+            return None
+        target = (event.location.lat, event.location.lng)
+        idle_m = equirectangular_m((unit.location.lat, unit.location.lng), target) if unit else PREEMPT_RADIUS_M
+        reach_m = min(idle_m, PREEMPT_RADIUS_M) - self.preempt_gain_m
+        if reach_m <= 0:
+            return None
+
+        def divertible(key) -> bool:
+            asset = self.assets.get(key)
+            if asset is None or asset.status != AssetStatus.DISPATCHED:
+                return False
+            current = self.events.get(asset.target_event_id)
+            return (current is not None and current.phase == IncidentPhase.EN_ROUTE
+                    and self.dispatch_queue.outranks(event, current))
+
+        rings = max(1, math.ceil(reach_m / M_PER_DEG_LAT / self.asset_index.cell_deg))
+        key = self.asset_index.nearest(target[0], target[1], max_rings=rings, accept=divertible)
+        if key is None:
+            return None
+        candidate = self.assets[key]
+        if equirectangular_m((candidate.location.lat, candidate.location.lng), target) > reach_m:
+            return None
+        return candidate
+
+    def _preempt(self, asset: AssetState, event: EventState):
+        # The diverted unit's incident goes back in the queue with its original deadline
+        previous = self.events[asset.target_event_id]
+        lifecycle.transition(previous, IncidentPhase.PENDING)
+        previous.assigned_asset_id = None
+        self.dispatch_queue.push(previous)
+        PREEMPTIONS.inc()
+        if dispatch_log.isEnabledFor(logging.DEBUG):
+            dispatch_log.debug("unit diverted", extra={"fields": {
+                "asset_id": asset.asset_id, "from_event_id": previous.event_id, "event_id": event.event_id}})
+
+    def _path_to(self, asset: AssetState, event: EventState) -> Optional[List[str]]:
+        """Nodes from `asset` to the scene ([] if already there), or None if no open route."""
+        if asset.current_node == event.node_id:
+            return []
+        return self._calculate_path(asset.current_node, event.node_id) or None
+
+    def _dispatch_unit(self, asset: AssetState, event: EventState, path: List[str]):
+        asset.status = AssetStatus.DISPATCHED
+        asset.target_event_id = event.event_id
+        asset.target_node = event.node_id
+        self.available_index.remove(asset.asset_id)
+        self.roster.set_duty(asset.asset_id, roster.ON_CALL)
+        lifecycle.transition(event, IncidentPhase.DISPATCHED)
+        event.assigned_asset_id = asset.asset_id
+        if event.dispatched_at is None:
+            # A diverted call keeps its first dispatch time
+            now = self.clock.now()
+            event.dispatched_at = now
+            self.sla.record_dispatch(event.type.value, self._sla_cell(event), now,
+                                     (now - event.created_at).total_seconds(),
+                                     late=now.timestamp() > deadline(event))
+        asset.path = path
+        self.conditions.track(asset.asset_id, [asset.current_node, *asset.path])
+        self._on_dispatched(asset)
+        if asset.path:
+            lifecycle.transition(event, IncidentPhase.EN_ROUTE)
+        else:
+            self._arrived(asset) # Already at the scene
+        DISPATCHES.inc()
+        if dispatch_log.isEnabledFor(logging.DEBUG):
+            dispatch_log.debug("unit dispatched", extra={"fields": {
+                "asset_id": asset.asset_id, "event_id": event.event_id,
+                "hops": len(asset.path)}})
+
+    def _on_dispatched(self, asset: AssetState):
+        """Hook for engines that schedule movement (see services/des.py)."""
+
+    def _arrived(self, asset: AssetState):
+        # End of the path: a dispatched unit is now on scene
+        if asset.status != AssetStatus.DISPATCHED or asset.path:
+            return
+        asset.status = AssetStatus.BUSY
+        event = self.events.get(asset.target_event_id)
+        if event is not None:
+            lifecycle.transition(event, IncidentPhase.ON_SCENE)
+            if event.arrived_at is None:
+                now = self.clock.now()
+                event.arrived_at = now
+                self.sla.record_arrival(event.type.value, self._sla_cell(event), now,
+                                        (now - event.created_at).total_seconds())
+            self.timers.schedule(self.sim_time + lifecycle.on_scene_seconds(self.rng, event),
+                                 ON_SCENE_DONE, event.event_id)
+
+    def _sla_cell(self, event: EventState) -> str:
+        return hex_cell(event.location.lat, event.location.lng)
+
+    # --- Lifecycle timers ---
+
+    def _run_timers(self):
+        # Pop only what is due: O(log n) per expiring timer, nothing per idle tick
+        while True:
+            entry = self.timers.pop_due(self.sim_time)
+            if entry is None:
+                return
+            _, kind, key, payload = entry
+            self._timer_handlers[kind](key, payload)
+
+    def _on_scene_done(self, event_id: str, payload):
+        event = self.events[event_id]
+        lifecycle.transition(event, IncidentPhase.CLEARING)
+        self.timers.schedule(self.sim_time + lifecycle.clearing_seconds(self.rng, event), CLEARED, event_id)
+
+    def _on_cleared(self, event_id: str, payload):
+        event = self.events[event_id]
+        lifecycle.transition(event, IncidentPhase.RESOLVED)
+        event.status = EventStatus.RESOLVED
+        event.resolved_at = self.clock.now()
+        asset = self.assets.get(event.assigned_asset_id)
+        if asset is not None and asset.target_event_id == event_id:
+            self._release(asset)
+        self.timers.schedule(self.sim_time + lifecycle.RESOLVED_RETENTION_SECONDS, PURGE, event_id)
+        if event_log.isEnabledFor(logging.DEBUG):
+            event_log.debug("event resolved", extra={"fields": {
+                "event_id": event_id, "asset_id": event.assigned_asset_id}})
+
+    def _on_purge(self, event_id: str, payload):
+        self.events.pop(event_id, None)
+        self.event_index.remove(event_id)
+        self.dispatch_queue.forget(event_id)
+
+    def _release(self, asset: AssetState, path: Optional[List[str]] = None):
+        # Return to patrol from wherever the incident was (or after `path`)
+        asset.status = AssetStatus.IDLE
+        asset.target_event_id = None
+        asset.target_node = None
+        asset.path = path or []
+        self.conditions.untrack(asset.asset_id)
+        self.roster.set_duty(asset.asset_id, roster.PATROL)
+        leave = self._leave_due.pop(asset.asset_id, None)
+        if leave is not None:
+            # Break or shift end fell due during the call
+            self._stand_down(asset.asset_id, *leave)
+            return
+        if self._is_available(asset):
+            self.available_index.insert_point(asset.asset_id, asset.location.lat, asset.location.lng)
+        self._on_released(asset)
+
+    def _on_released(self, asset: AssetState):
+        """Hook for engines that schedule movement (see services/des.py)."""
+
+    # --- Roster ---
+
+    def _sync_roster(self):
+        # Rows are rebuilt only when the fleet changes
+        if self.roster.members is not self.assets or len(self.roster) != len(self.assets):
+            for asset in self.roster.rebuild(self.assets):
+                self._schedule_shift(asset)
+
+    def _schedule_shift(self, asset: AssetState):
+        if asset.telemetry:
+            return # Live units keep their real-world roster
+        on_duty = max(0.0, (self.clock.now() - asset.shift_start).total_seconds())
+        self.timers.schedule(self.sim_time + max(0.0, roster.SHIFT_SECONDS - on_duty), SHIFT_END, asset.asset_id)
+        if on_duty < roster.BREAK_AFTER_SECONDS:
+            self.timers.schedule(self.sim_time + roster.BREAK_AFTER_SECONDS - on_duty, BREAK, asset.asset_id)
+
+    def _accrue(self):
+        self._sync_roster()
+        for asset_id in self.roster.accrue(self.sim_time):
+            # Too tired to take calls: out of the pool, and relief is called now
+            self.available_index.remove(asset_id)
+            if not self.assets[asset_id].telemetry:
+                self.timers.schedule(self.sim_time, SHIFT_END, asset_id, "fatigue")
+
+    def _on_shift_end(self, asset_id: str, payload):
+        self._stand_down(asset_id, SHIFT_END, roster.HANDOVER_SECONDS, payload or "shift_end")
+
+    def _on_break(self, asset_id: str, payload):
+        self._stand_down(asset_id, BREAK, roster.BREAK_SECONDS)
+
+    def _stand_down(self, asset_id: str, reason: str, seconds: float, relief: Optional[str] = None):
+        asset = self.assets.get(asset_id)
+        if asset is None:
+            return
+        if asset.status == AssetStatus.OFF_DUTY:
+            if reason == SHIFT_END and self._off_duty.get(asset_id) == BREAK:
+                # Relieved during the break
+                self._off_duty[asset_id] = SHIFT_END
+                self.timers.schedule(self.sim_time + seconds, ON_DUTY, asset_id)
+                RELIEFS.labels(relief).inc()
+            return
+        if asset.status != AssetStatus.IDLE:
+            pending = self._leave_due.get(asset_id)
+            if pending is None or pending[0] != SHIFT_END:
+                self._leave_due[asset_id] = (reason, seconds, relief)
+            return
+        if reason == SHIFT_END:
+            self.timers.cancel(BREAK, asset_id)
+            RELIEFS.labels(relief).inc()
+        asset.status = AssetStatus.OFF_DUTY
+        asset.path = []
+        self.available_index.remove(asset_id)
+        self.roster.set_duty(asset_id, roster.STOOD_DOWN)
+        self._off_duty[asset_id] = reason
+        self.timers.schedule(self.sim_time + seconds, ON_DUTY, asset_id)
+        self._on_stood_down(asset)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("unit stood down", extra={"fields": {"asset_id": asset_id, "reason": reason}})
+
+    def _on_duty(self, asset_id: str, payload):
+        reason = self._off_duty.pop(asset_id, None)
+        asset = self.assets.get(asset_id)
+        if asset is None:
+            return
+        if reason == SHIFT_END:
+            # Fresh crew
+            self.roster.relieve(asset_id)
+            asset.shift_start = self.clock.now()
+            self._schedule_shift(asset)
+        self._release(asset)
+
+    def _on_stood_down(self, asset: AssetState):
+        """Hook for engines that schedule movement (see services/des.py)."""
+
+    # --- Road conditions ---
+
+    def set_road_factor(self, u: str, v: str, factor: float) -> List[str]:
+        """Scale road u-v by `factor` (inf closes it, 1 restores it); returns the units re-routed.
+
+        Only units whose remaining route runs over the road are re-planned,
+        and only when it got slower; a road that reopens or speeds up is
+        picked up by routes planned from then on.
+        """
+        old, new = self.conditions.set_factor(u, v, factor)
+        if new == old:
+            return []
+        self.coverage.edge_changed(u, v, old)
+        log.info("road conditions changed", extra={"fields": {"from": u, "to": v, "factor": factor}})
+        if new < old:
+            return []
+        rerouted = []
+        for asset_id in sorted(self.conditions.users(u, v)):
+            asset = self.assets.get(asset_id)
+            if asset is None or not asset.path or not uses([asset.current_node, *asset.path], u, v):
+                continue # Already past it
+            path = reroute(self.conditions, asset.path)
+            if path is None:
+                log.warning("no open route left", extra={"fields": {"asset_id": asset_id, "to": asset.path[-1]}})
+                self._recall(asset)
+                continue
+            asset.path = path
+            self.conditions.track(asset_id, [asset.current_node, *path])
+            rerouted.append(asset_id)
+        REROUTES.inc(len(rerouted))
+        return rerouted
+
+    def _recall(self, asset: AssetState):
+        # Cut off from its incident: the call goes back in the queue with its
+        # original deadline, the unit drives out the road it is on and patrols
+        event = self.events.get(asset.target_event_id)
+        if event is not None:
+            lifecycle.transition(event, IncidentPhase.PENDING)
+            event.assigned_asset_id = None
+            self.dispatch_queue.push(event)
+        self._release(asset, asset.path[:1])
+
+    def close_road(self, u: str, v: str) -> List[str]:
+        return self.set_road_factor(u, v, math.inf)
+
+    def reopen_road(self, u: str, v: str) -> List[str]:
+        return self.set_road_factor(u, v, 1.0)
 
     def _calculate_path(self, start_node, end_node):
-        # Simple BFS for pathfinding
-        queue = [(start_node, [start_node])]
-        visited = set()
-        while queue:
-            node, path = queue.pop(0)
-            if node == end_node:
-                return path[1:] # Return path excluding start
-            if node not in visited:
-                visited.add(node)
-                for neighbor in self.road_network.adj_list.get(node, []):
-                    queue.append((neighbor, path + [neighbor]))
-        return []
+        PATH_SEARCHES.inc()
+        start = time.perf_counter()
+        # Nodes to visit after the start node
+        path = self.conditions.route(start_node, end_node)[1:]
+        _lap(PHASE_ROUTE, start)
+        return path
 
     def _move_assets(self):
-        SPEED = 0.00015 # Approx speed in degrees per tick
-        
         for asset in self.assets.values():
+            if asset.telemetry:
+                # Position comes from GPS pings; only consume reached path nodes
+                self._track_live_asset(asset)
             # Logic for IDLE patrolling
-            if asset.status == AssetStatus.IDLE:
+            elif asset.status == AssetStatus.IDLE:
                 if not asset.path:
                     # Pick random neighbor
-                    neighbors = self.road_network.adj_list.get(asset.current_node, [])
+                    neighbors = self.conditions.open_neighbors(asset.current_node)
                     if neighbors:
-                        next_node = random.choice(neighbors)
+                        next_node = self.rng.choice(neighbors)
                         asset.path = [next_node]
             
             # Logic for moving along path
-            if asset.path:
+            if asset.path and not asset.telemetry:
                 target_node = asset.path[0]
                 target_coords = self.road_network.nodes[target_node]
                 current_coords = (asset.location.lat, asset.location.lng)
@@ -146,12 +629,7 @@ class Simulator:
                     asset.location.lng = target_coords[1]
                     asset.current_node = target_node
                     asset.path.pop(0)
-                    
-                    # If arrived at event
-                    if asset.status == AssetStatus.DISPATCHED and not asset.path:
-                        asset.status = AssetStatus.BUSY
-                        # Auto-resolve event after some time (simulated by just clearing status later)
-                        # For now, just stay busy
+                    self._arrived(asset)
                 else:
                     # Move towards node
                     ratio = SPEED / dist_to_node
@@ -160,38 +638,143 @@ class Simulator:
                     asset.location.lat = new_lat
                     asset.location.lng = new_lng
 
-            # Fatigue
-            asset.time_worked_minutes += 1.0
-            if asset.status != AssetStatus.OFF_DUTY:
-                asset.fatigue_level = min(1.0, asset.fatigue_level + 0.0005)
+    def _track_live_asset(self, asset: AssetState):
+        # GPS-driven units: consume path nodes as the matched position reaches them
+        while asset.path and asset.current_node in asset.path:
+            asset.path.pop(0)
+        self._arrived(asset)
 
-    async def run_loop(self, manager):
-        print("Simulation Loop Started")
-        while self.running:
-            self._generate_event()
-            self._assign_tasks()
-            self._move_assets()
-            
-            # Heatmap Data
-            heatmap_data = []
-            for evt in self.events.values():
-                heatmap_data.append([evt.location.lat, evt.location.lng, evt.severity / 10.0])
-            
+    def _update_asset_index(self):
+        # Points that stay within their grid cell cost a single dict write
+        for asset in self.assets.values():
+            self.asset_index.insert_point(asset.asset_id, asset.location.lat, asset.location.lng)
+            if self._is_available(asset):
+                self.available_index.insert_point(asset.asset_id, asset.location.lat, asset.location.lng)
+            else:
+                self.available_index.remove(asset.asset_id)
+        if len(self.asset_index) > len(self.assets):
+            # Units dropped from `assets` (or a roster swapped in wholesale)
+            for key in [k for k in self.asset_index.boxes if k not in self.assets]:
+                self.asset_index.remove(key)
+                self.available_index.remove(key)
+
+    def _update_coverage(self):
+        # Available units, anchored at the node each will reach next
+        nodes = self.road_network.nodes
+        speed = self.coverage.speed_mps
+        anchors = {}
+        for asset_id, box in self.available_index.boxes.items():
+            asset = self.assets[asset_id]
+            node = asset.path[0] if asset.path else asset.current_node
+            if node is not None:
+                anchors[asset_id] = (node, equirectangular_m((box[0], box[1]), nodes[node]) / speed)
+        self.coverage.update(anchors)
+
+    def _leg_seconds(self, dist: float) -> float:
+        # Units cover SPEED per tick and snap to a node within SPEED of it
+        return (math.floor(dist / SPEED) + 1) * self.tick_seconds
+
+    def _motion_hint(self, asset: AssetState) -> Optional[Dict]:
+        """Where a moving unit will be and when, for clients to animate (see services/motion.py)."""
+        if asset.telemetry or not asset.path:
+            return None
+        nodes = self.road_network.nodes
+        lat, lng = asset.location.lat, asset.location.lng
+        t = self.sim_time
+        points, etas = [[lat, lng]], [t]
+        for node in asset.path[:MAX_HINT_NODES]:
+            to_lat, to_lng = nodes[node]
+            t += self._leg_seconds(math.hypot(to_lat - lat, to_lng - lng))
+            lat, lng = to_lat, to_lng
+            points.append([lat, lng])
+            etas.append(round(t, 3))
+        return {"points": points, "etas": etas, "next_node": asset.path[0], "eta": etas[1],
+                "speed_mps": round(self.coverage.speed_mps, 2)}
+
+    def _frame_changes(self, snapshot) -> Changes:
+        # What motion subscribers need re-sent: hints that stopped being valid,
+        # GPS-driven units that moved, and events whose state changed
+        changes = Changes(self.motion.update(self.assets.values(), self._motion_hint))
+        previous = self.snapshots.get(snapshot.version - 1)
+        if previous is None:
+            changes.assets.update(snapshot.assets)
+            changes.events.update(snapshot.events)
+            return changes
+        changes.assets.update(a.asset_id for a in self.assets.values()
+                              if a.telemetry and snapshot.assets[a.asset_id] is not previous.assets.get(a.asset_id))
+        changes.events.update(e for e, encoded in snapshot.events.items() if previous.events.get(e) is not encoded)
+        changes.events.update(e for e in previous.events if e not in snapshot.events)
+        return changes
+
+    def build_frame(self) -> TickFrame:
+        # Encode each entity once; subscribers get slices of this frame
+        heatmap = {
+            evt.event_id: [evt.location.lat, evt.location.lng, evt.severity / 10.0]
+            for evt in self.events.values()
+        }
+        hotspots = []
+        if "SONY_WORLD" in self.road_network.nodes:
             hotspot = self.road_network.nodes["SONY_WORLD"]
-            heatmap_data.append([hotspot[0], hotspot[1], 0.5])
-
-            state = {
-                "timestamp": datetime.now().isoformat(),
-                "assets": jsonable_encoder([a for a in self.assets.values()]),
-                "events": jsonable_encoder([e for e in self.events.values()]),
-                "logs": self.ingestion_log,
-                "heatmap": heatmap_data,
-                "road_network": {
-                    "nodes": self.road_network.nodes,
-                    "edges": self.road_network.adj_list
-                }
-            }
-            
-            await manager.broadcast(json.dumps(state))
-            await asyncio.sleep(0.5) # Faster ticks for smoother movement 
+            hotspots.append([hotspot[0], hotspot[1], 0.5])
+
+        self._update_coverage()
+        snapshot = self.snapshots.publish(self.clock.now().isoformat(), self.assets.values(),
+                                          self.events.values(), self.ingestion_log)
+        changes = self._frame_changes(snapshot)
+        return TickFrame(
+            timestamp=snapshot.timestamp,
+            assets=snapshot.assets,
+            events=snapshot.events,
+            heatmap=heatmap,
+            hotspots=hotspots,
+            logs=list(snapshot.logs),
+            road_network_json=self.road_network.to_json(),
+            asset_index=self.asset_index,
+            event_index=self.event_index,
+            asset_list=list(self.assets.values()),
+            registry=self.wire_registry,
+            seq=snapshot.version,
+            coverage=self.coverage.layer(),
+            sla=self.sla,
+            sim_time=self.sim_time,
+            motion=dict(self.motion.hints),
+            changes=changes,
+            roads=self.conditions.describe(),
+        )
+
+    def step(self):
+        """Advance the simulation by one tick, without publishing a frame."""
+        self.tick_count += 1
+        self.sim_time += self.tick_seconds
+        self.clock.advance(self.tick_seconds)
+        t = time.perf_counter()
+        self._ingest_road_changes()
+        self._ingest_events()
+        self._ingest_telemetry()
+        t = _lap(PHASE_INGEST, t)
+        self._generate_event()
+        t = _lap(PHASE_GENERATE, t)
+        self._accrue()
+        self._run_timers()
+        t = _lap(PHASE_TIMERS, t)
+        self._assign_tasks()
+        t = _lap(PHASE_ASSIGN, t)
+        self._move_assets()
+        self._update_asset_index()
+        self.roster.write_back()
+        _lap(PHASE_MOVE, t)
 
+    async def run_loop(self, manager):
+        log.info("simulation loop started", extra={"fields": {"assets": len(self.assets)}})
+        while self.running:
+            tick_start = time.perf_counter()
+            self.step()
+            t = time.perf_counter()
+            frame = self.build_frame()
+            t = _lap(PHASE_SERIALIZE, t)
+            await manager.broadcast_frame(frame)
+            _lap(PHASE_BROADCAST, t)
+            elapsed = time.perf_counter() - tick_start
+            TICK_SECONDS.observe(elapsed)
+            # Hold simulated time to wall time, which clients animating from motion hints rely on
+            await asyncio.sleep(max(0.0, self.tick_seconds - elapsed))
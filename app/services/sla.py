@@ -0,0 +1,259 @@
+"""Streaming response-time KPIs.
+
+Every incident contributes two latencies, measured from when it was
+reported: dispatch (a unit was assigned) and arrival (a unit got on
+scene). They go into `LatencySketch`es, log-bucketed histograms in the
+HDR / DDSketch family: bucket i counts values in (gamma^(i-1), gamma^i],
+so any quantile is read back within `RELATIVE_ACCURACY` of the true value
+from a few hundred counters, however many incidents were recorded. Two
+sketches merge by adding their counters, which is exact, so shards and
+scenario replications can be combined in any order.
+
+`SlaStats` keeps one pair of sketches per time window, event type and hex
+cell (see `spatial.hex_cell`), for the last `keep` windows. A KPI query
+merges the entries that match, so its cost depends on the retained
+windows and cells, never on how many incidents came before.
+"""
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .spatial import hex_center
+
+RELATIVE_ACCURACY = 0.01
+MIN_SECONDS = 0.001 # Anything faster counts as zero
+WINDOW_SECONDS = 15 * 60.0
+KEEP_WINDOWS = 96 # A day of 15 minute windows
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+GROUPS = ("type", "cell", "window")
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+class LatencySketch:
+    """Mergeable histogram of latencies in seconds with relative-error quantiles."""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        seconds = max(seconds, 0.0)
+        if seconds <= MIN_SECONDS:
+            self.zeros += 1
+        else:
+            i = math.ceil(math.log(seconds) / _LOG_GAMMA)
+            self.buckets[i] = self.buckets.get(i, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencySketch") -> "LatencySketch":
+        for i, n in other.buckets.items():
+            self.buckets[i] = self.buckets.get(i, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile `q` (0..1), or None if the sketch is empty."""
+        if not self.count:
+            return None
+        rank = max(0, math.ceil(q * self.count) - 1) # Nearest rank
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if rank < seen:
+                # Bucket midpoint in relative terms, clamped to what was seen
+                value = 2 * _GAMMA ** i / (_GAMMA + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        out = {"count": self.count, "mean": round(self.total / self.count, 1) if self.count else None}
+        for q in QUANTILES:
+            value = self.quantile(q)
+            out[f"p{round(q * 100)}"] = None if value is None else round(value, 1)
+        out["max"] = round(self.max, 1) if self.count else None
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"buckets": self.buckets, "zeros": self.zeros, "count": self.count,
+                "total": self.total, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencySketch":
+        sketch = cls()
+        sketch.buckets = {int(i): n for i, n in data["buckets"].items()}
+        sketch.zeros = data["zeros"]
+        sketch.count = data["count"]
+        sketch.total = data["total"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        return sketch
+
+@dataclass
+class Entry:
+    """Latencies of the incidents of one type, cell and window."""
+    dispatch: LatencySketch = field(default_factory=LatencySketch)
+    arrival: LatencySketch = field(default_factory=LatencySketch)
+    late: int = 0 # Dispatched after the incident's deadline
+
+    def merge(self, other: "Entry") -> "Entry":
+        self.dispatch.merge(other.dispatch)
+        self.arrival.merge(other.arrival)
+        self.late += other.late
+        return self
+
+Key = Tuple[str, str] # (event type, hex cell)
+
+class SlaStats:
+    """Rolling per-window, per-type, per-cell latency sketches."""
+
+    def __init__(self, window_s: float = WINDOW_SECONDS, keep: int = KEEP_WINDOWS):
+        self.window_s = window_s
+        self.keep = keep
+        self.windows: Dict[int, Dict[Key, Entry]] = {}
+        self.latest: Optional[int] = None
+        self.version = 0
+        self._export: Optional[Dict[str, Any]] = None
+        self._export_version = -1
+
+    def _entry(self, at: datetime, event_type: str, cell: str) -> Entry:
+        window = math.floor(at.timestamp() / self.window_s)
+        if self.latest is None or window > self.latest:
+            self.latest = window
+            for old in [w for w in self.windows if w <= window - self.keep]:
+                del self.windows[old]
+        entries = self.windows.setdefault(window, {})
+        entry = entries.get((event_type, cell))
+        if entry is None:
+            entry = entries[(event_type, cell)] = Entry()
+        self.version += 1
+        return entry
+
+    def record_dispatch(self, event_type: str, cell: str, at: datetime, seconds: float, late: bool = False):
+        entry = self._entry(at, event_type, cell)
+        entry.dispatch.add(seconds)
+        entry.late += late
+
+    def record_arrival(self, event_type: str, cell: str, at: datetime, seconds: float):
+        self._entry(at, event_type, cell).arrival.add(seconds)
+
+    def merge(self, other: "SlaStats") -> "SlaStats":
+        """Fold in another shard's or replication's stats (same window size)."""
+        if other.window_s != self.window_s:
+            raise ValueError("cannot merge stats with different window sizes")
+        for window, entries in other.windows.items():
+            mine = self.windows.setdefault(window, {})
+            for key, entry in entries.items():
+                mine.setdefault(key, Entry()).merge(entry)
+        if other.latest is not None and (self.latest is None or other.latest > self.latest):
+            self.latest = other.latest
+            for old in [w for w in self.windows if w <= self.latest - self.keep]:
+                del self.windows[old]
+        self.version += 1
+        return self
+
+    # --- Queries ---
+
+    def _matching(self, minutes: Optional[float], event_type: Optional[str],
+                  cell: Optional[str]) -> Iterable[Tuple[int, Key, Entry]]:
+        if self.latest is None:
+            return
+        first = -math.inf
+        if minutes is not None:
+            first = self.latest - max(1, math.ceil(minutes * 60 / self.window_s)) + 1
+        for window, entries in self.windows.items():
+            if window < first:
+                continue
+            for key, entry in entries.items():
+                if (event_type is None or key[0] == event_type) and (cell is None or key[1] == cell):
+                    yield window, key, entry
+
+    def query(self, minutes: Optional[float] = None, event_type: Optional[str] = None,
+              cell: Optional[str] = None, by: Optional[str] = None) -> Dict[str, Any]:
+        """KPIs over the last `minutes` (all retained windows if None), optionally grouped."""
+        if by is not None and by not in GROUPS:
+            raise ValueError(f"by must be one of {GROUPS}")
+        overall = Entry()
+        groups: Dict[Any, Entry] = {}
+        for window, key, entry in self._matching(minutes, event_type, cell):
+            overall.merge(entry)
+            if by is not None:
+                group = window if by == "window" else key[0] if by == "type" else key[1]
+                groups.setdefault(group, Entry()).merge(entry)
+        out = {"window_s": self.window_s, **_render(overall)}
+        if self.latest is not None:
+            out["until"] = datetime.fromtimestamp((self.latest + 1) * self.window_s).isoformat()
+        if by is not None:
+            out["groups"] = [_group(by, group, groups[group], self.window_s) for group in sorted(groups)]
+        return out
+
+    # --- Transport ---
+
+    def export(self) -> Dict[str, Any]:
+        """Plain-data copy for the bus or for merging elsewhere (cached per version)."""
+        if self._export_version != self.version:
+            self._export = {
+                "version": self.version,
+                "window_s": self.window_s,
+                "keep": self.keep,
+                "latest": self.latest,
+                "windows": {
+                    window: [[key[0], key[1], entry.dispatch.to_dict(), entry.arrival.to_dict(), entry.late]
+                             for key, entry in entries.items()]
+                    for window, entries in self.windows.items()
+                },
+            }
+            self._export_version = self.version
+        return self._export
+
+    @classmethod
+    def from_export(cls, data: Dict[str, Any]) -> "SlaStats":
+        stats = cls(window_s=data["window_s"], keep=data["keep"])
+        stats.latest = data["latest"]
+        stats.version = data["version"]
+        for window, rows in data["windows"].items():
+            stats.windows[int(window)] = {
+                (event_type, cell): Entry(LatencySketch.from_dict(d), LatencySketch.from_dict(a), late)
+                for event_type, cell, d, a, late in rows
+            }
+        return stats
+
+def _render(entry: Entry) -> Dict[str, Any]:
+    dispatched = entry.dispatch.count
+    return {
+        "dispatch": entry.dispatch.summary(),
+        "arrival": entry.arrival.summary(),
+        "late": entry.late,
+        "on_time": round(1 - entry.late / dispatched, 4) if dispatched else None,
+    }
+
+def _group(by: str, group: Any, entry: Entry, window_s: float) -> Dict[str, Any]:
+    if by == "cell":
+        lat, lng = hex_center(group)
+        head = {"cell": group, "center": {"lat": lat, "lng": lng}}
+    elif by == "window":
+        head = {"window": datetime.fromtimestamp(group * window_s).isoformat()}
+    else:
+        head = {"type": group}
+    return {**head, **_render(entry)}
+
+def merged(stats: List[SlaStats]) -> SlaStats:
+    """One `SlaStats` combining several shards or replications."""
+    out = SlaStats(window_s=stats[0].window_s, keep=max(s.keep for s in stats)) if stats else SlaStats()
+    for s in stats:
+        out.merge(s)
+    return out
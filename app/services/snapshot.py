@@ -0,0 +1,109 @@
+"""Versioned, immutable snapshots of the simulation state.
+
+At the end of every tick the simulator publishes a `Snapshot`: each asset
+and event JSON-encoded, plus the tick's log lines. A published snapshot is
+never mutated, so readers (the broadcaster, REST handlers, anything on
+another thread) take the latest reference without locking and always see
+one consistent tick.
+
+Snapshots share structure: an entity whose fields are unchanged since the
+previous snapshot reuses that snapshot's encoded string instead of being
+encoded again. Sharing is by identity, which makes `Snapshot.diff` a
+pointer comparison. The store keeps the last few versions for diffing and
+delta encoding; older ones are dropped.
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..core.entities import AssetState, EventState, to_json
+
+DEFAULT_KEEP = 8
+
+@dataclass(frozen=True)
+class Delta:
+    """What changed between two snapshots."""
+    since: int
+    version: int
+    assets: Dict[str, str] # Changed or added, encoded
+    events: Dict[str, str]
+    removed_assets: List[str]
+    removed_events: List[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.assets or self.events or self.removed_assets or self.removed_events)
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One tick's state. The dicts are shared with readers and never mutated."""
+    version: int
+    timestamp: str
+    assets: Dict[str, str]
+    events: Dict[str, str]
+    logs: Tuple[Dict, ...]
+
+    def diff(self, older: "Snapshot") -> Delta:
+        assets, removed_assets = _diff(older.assets, self.assets)
+        events, removed_events = _diff(older.events, self.events)
+        return Delta(older.version, self.version, assets, events, removed_assets, removed_events)
+
+def _diff(old: Dict[str, str], new: Dict[str, str]) -> Tuple[Dict[str, str], List[str]]:
+    changed = {key: encoded for key, encoded in new.items() if old.get(key) is not encoded}
+    return changed, [key for key in old if key not in new]
+
+class SnapshotStore:
+    """Publishes snapshots and keeps the most recent `keep` of them."""
+
+    def __init__(self, keep: int = DEFAULT_KEEP):
+        self.history: Deque[Snapshot] = deque(maxlen=keep)
+        self.version = 0
+        # Fingerprint of each entity when it was last encoded
+        self._asset_prints: Dict[str, Tuple] = {}
+        self._event_prints: Dict[str, Tuple] = {}
+        self.reused = 0
+        self.encoded = 0
+
+    @property
+    def latest(self) -> Optional[Snapshot]:
+        history = self.history
+        return history[-1] if history else None
+
+    def get(self, version: int) -> Optional[Snapshot]:
+        for snapshot in self.history:
+            if snapshot.version == version:
+                return snapshot
+        return None
+
+    def delta(self, since: int) -> Optional[Delta]:
+        """Changes from version `since` to the latest; None once `since` has been dropped."""
+        older = self.get(since)
+        latest = self.latest
+        return None if older is None or latest is None else latest.diff(older)
+
+    def publish(self, timestamp: str, assets: Iterable[AssetState], events: Iterable[EventState],
+                logs: Iterable[Dict] = ()) -> Snapshot:
+        latest = self.latest
+        self._asset_prints, encoded_assets = self._encode(
+            assets, "asset_id", self._asset_prints, latest.assets if latest else {})
+        self._event_prints, encoded_events = self._encode(
+            events, "event_id", self._event_prints, latest.events if latest else {})
+        self.version += 1
+        snapshot = Snapshot(self.version, timestamp, encoded_assets, encoded_events, tuple(logs))
+        self.history.append(snapshot) # Readers see the new version from here on
+        return snapshot
+
+    def _encode(self, entities: Iterable[Union[AssetState, EventState]], key_field: str,
+                prints: Dict[str, Tuple], previous: Dict[str, str]) -> Tuple[Dict[str, Tuple], Dict[str, str]]:
+        new_prints = {}
+        encoded = {}
+        for entity in entities:
+            key = getattr(entity, key_field)
+            current = entity.fingerprint()
+            new_prints[key] = current
+            if key in previous and prints.get(key) == current:
+                encoded[key] = previous[key]
+                self.reused += 1
+            else:
+                encoded[key] = to_json(entity)
+                self.encoded += 1
+        return new_prints, encoded
@@ -0,0 +1,158 @@
+import math
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+# (min_lat, min_lng, max_lat, max_lng)
+BBox = Tuple[float, float, float, float]
+
+def _ring_cells(ci: int, cj: int, ring: int) -> Iterator[Tuple[int, int]]:
+    # Perimeter of the square of half-side `ring` around (ci, cj)
+    if ring == 0:
+        yield (ci, cj)
+        return
+    for j in range(cj - ring, cj + ring + 1):
+        yield (ci - ring, j)
+        yield (ci + ring, j)
+    for i in range(ci - ring + 1, ci + ring):
+        yield (i, cj - ring)
+        yield (i, cj + ring)
+
+class GridIndex:
+    """Uniform lat/lng grid over points or bounding boxes.
+
+    Items are registered in every cell their box touches, so a query only
+    visits the cells overlapping the query box. Cell size should be close to
+    the typical query radius; with roughly uniform density every operation is
+    O(items per cell). Updates are incremental: moving a point within its
+    cell is a dict write.
+    """
+
+    def __init__(self, cell_deg: float = 0.002):
+        self.cell_deg = cell_deg
+        self.cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self.boxes: Dict[Hashable, BBox] = {}
+        self._item_cells: Dict[Hashable, Tuple[int, int, int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.boxes
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg))
+
+    def _cell_range(self, bbox: BBox) -> Tuple[int, int, int, int]:
+        i0, j0 = self._cell(bbox[0], bbox[1])
+        i1, j1 = self._cell(bbox[2], bbox[3])
+        return i0, j0, i1, j1
+
+    def _iter_cells(self, span: Tuple[int, int, int, int]) -> Iterator[Tuple[int, int]]:
+        i0, j0, i1, j1 = span
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                yield (i, j)
+
+    def insert(self, key: Hashable, bbox: BBox):
+        """Add or move `key` to cover `bbox`."""
+        span = self._cell_range(bbox)
+        old_span = self._item_cells.get(key)
+        self.boxes[key] = bbox
+        if old_span == span:
+            return
+        if old_span is not None:
+            self._unlink(key, old_span)
+        for cell in self._iter_cells(span):
+            self.cells.setdefault(cell, set()).add(key)
+        self._item_cells[key] = span
+
+    def insert_point(self, key: Hashable, lat: float, lng: float):
+        self.insert(key, (lat, lng, lat, lng))
+
+    def remove(self, key: Hashable):
+        span = self._item_cells.pop(key, None)
+        if span is None:
+            return
+        self._unlink(key, span)
+        del self.boxes[key]
+
+    def _unlink(self, key: Hashable, span: Tuple[int, int, int, int]):
+        for cell in self._iter_cells(span):
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.cells[cell]
+
+    def query_bbox(self, bbox: BBox) -> Set[Hashable]:
+        """Keys whose box intersects `bbox`."""
+        span = self._cell_range(bbox)
+        # Wide queries touch fewer occupied cells than cells in range
+        if (span[2] - span[0] + 1) * (span[3] - span[1] + 1) > len(self.cells):
+            cells: Iterable = (c for c in self.cells if span[0] <= c[0] <= span[2] and span[1] <= c[1] <= span[3])
+        else:
+            cells = self._iter_cells(span)
+        found: Set[Hashable] = set()
+        for cell in cells:
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        min_lat, min_lng, max_lat, max_lng = bbox
+        return {
+            key for key in found
+            if not (self.boxes[key][0] > max_lat or self.boxes[key][2] < min_lat
+                    or self.boxes[key][1] > max_lng or self.boxes[key][3] < min_lng)
+        }
+
+    def query_radius(self, lat: float, lng: float, radius_deg: float) -> Set[Hashable]:
+        """Candidate keys whose box is within the square of half-side `radius_deg`."""
+        return self.query_bbox((lat - radius_deg, lng - radius_deg, lat + radius_deg, lng + radius_deg))
+
+    def nearest(self, lat: float, lng: float, max_rings: int = 64,
+                accept: Optional[Callable[[Hashable], bool]] = None) -> Optional[Hashable]:
+        """Nearest point by expanding rings of cells; None if nothing within range.
+
+        With `accept`, keys it rejects are skipped.
+        """
+        ci, cj = self._cell(lat, lng)
+        best, best_dist = None, float('inf')
+        for ring in range(max_rings + 1):
+            for cell in _ring_cells(ci, cj, ring):
+                for key in self.cells.get(cell, ()):
+                    if accept is not None and not accept(key):
+                        continue
+                    box = self.boxes[key]
+                    dist = (box[0] - lat) ** 2 + (box[1] - lng) ** 2
+                    if dist < best_dist:
+                        best, best_dist = key, dist
+            # Anything in a further ring is at least `ring` cells away
+            if best is not None and math.sqrt(best_dist) <= ring * self.cell_deg:
+                return best
+        return best
+
+    def keys(self) -> List[Hashable]:
+        return list(self.boxes)
+
+# --- Hex cells ---
+
+HEX_SIZE_DEG = 0.005 # Centre-to-corner, about 550 m
+_SQRT3 = math.sqrt(3.0)
+
+def hex_cell(lat: float, lng: float, size_deg: float = HEX_SIZE_DEG) -> str:
+    """Id ("q:r", axial coordinates) of the pointy-top hexagon containing the point."""
+    x, y = lng / size_deg, lat / size_deg
+    q = _SQRT3 / 3 * x - y / 3
+    r = 2 * y / 3
+    # Round in cube coordinates, fixing up the component that moved most
+    s = -q - r
+    rq, rr, rs = round(q), round(r), round(s)
+    dq, dr, ds = abs(rq - q), abs(rr - r), abs(rs - s)
+    if dq > dr and dq > ds:
+        rq = -rr - rs
+    elif dr > ds:
+        rr = -rq - rs
+    return f"{rq}:{rr}"
+
+def hex_center(cell: str, size_deg: float = HEX_SIZE_DEG) -> Tuple[float, float]:
+    """(lat, lng) of the centre of hexagon `cell`."""
+    q, r = (int(part) for part in cell.split(":"))
+    return 1.5 * r * size_deg, _SQRT3 * (q + r / 2) * size_deg
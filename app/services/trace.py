@@ -0,0 +1,109 @@
+"""Golden-trace regression harness.
+
+A trace is the canonical simulation state after every tick of a seeded run.
+Comparing a candidate engine (vectorized movement, new routing, ...) against
+the reference implementation tick-for-tick pinpoints the first tick and
+field where behaviour changed. Recorded golden files keep only a digest per
+tick, so they stay small enough to commit.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .simulator import Simulator
+
+FLOAT_DIGITS = 9 # Rounding that absorbs harmless last-bit float differences
+
+@dataclass
+class Divergence:
+    tick: int
+    field: str
+    reference: Any
+    candidate: Any
+
+    def __str__(self) -> str:
+        return f"tick {self.tick}: {self.field}: reference={self.reference!r} candidate={self.candidate!r}"
+
+def _round(value: Any) -> Any:
+    return round(value, FLOAT_DIGITS) if isinstance(value, float) else value
+
+def snapshot(sim: Simulator) -> Dict[str, Any]:
+    """Canonical, JSON-safe view of the state that behaviour depends on."""
+    return {
+        "tick": sim.tick_count,
+        "time": sim.clock.now().isoformat(),
+        "assets": {
+            a.asset_id: {
+                "status": a.status.value,
+                "lat": _round(a.location.lat),
+                "lng": _round(a.location.lng),
+                "current_node": a.current_node,
+                "target_node": a.target_node,
+                "path": list(a.path),
+                "target_event_id": a.target_event_id,
+                "fatigue": _round(a.fatigue_level),
+                "worked": _round(a.time_worked_minutes),
+            }
+            for a in sorted(sim.assets.values(), key=lambda a: a.asset_id)
+        },
+        "events": {
+            e.event_id: {
+                "type": e.type.value,
+                "severity": e.severity,
+                "status": e.status.value,
+                "phase": e.phase.value,
+                "node": e.node_id,
+            }
+            for e in sorted(sim.events.values(), key=lambda e: e.event_id)
+        },
+    }
+
+def digest(state: Dict[str, Any]) -> str:
+    encoded = json.dumps(state, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+def run(sim: Simulator, ticks: int) -> Iterator[Dict[str, Any]]:
+    """Step `sim` `ticks` times, yielding the snapshot after each tick."""
+    for _ in range(ticks):
+        sim.step()
+        yield snapshot(sim)
+
+def first_difference(reference: Any, candidate: Any, path: str = "") -> Optional[tuple]:
+    if isinstance(reference, dict) and isinstance(candidate, dict):
+        for key in sorted(set(reference) | set(candidate), key=str):
+            sub = f"{path}.{key}" if path else str(key)
+            if key not in reference or key not in candidate:
+                return sub, reference.get(key), candidate.get(key)
+            found = first_difference(reference[key], candidate[key], sub)
+            if found:
+                return found
+        return None
+    return None if reference == candidate else (path, reference, candidate)
+
+def compare(reference: Simulator, candidate: Simulator, ticks: int) -> Optional[Divergence]:
+    """Run both engines in lockstep; None if they agree on every tick."""
+    for ref_state, cand_state in zip(run(reference, ticks), run(candidate, ticks)):
+        found = first_difference(ref_state, cand_state)
+        if found:
+            return Divergence(ref_state["tick"], *found)
+    return None
+
+def record_golden(factory: Callable[[], Simulator], ticks: int, **meta) -> Dict[str, Any]:
+    return {**meta, "ticks": ticks, "digests": [digest(state) for state in run(factory(), ticks)]}
+
+def check_golden(golden: Dict[str, Any], factory: Callable[[], Simulator]) -> Optional[int]:
+    """First tick whose digest differs from the golden record, or None."""
+    for expected, state in zip(golden["digests"], run(factory(), golden["ticks"])):
+        if digest(state) != expected:
+            return state["tick"]
+    return None
+
+def save(path: str, golden: Dict[str, Any]):
+    with open(path, "w") as fh:
+        json.dump(golden, fh, indent=1)
+        fh.write("\n")
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as fh:
+        return json.load(fh)
@@ -0,0 +1,117 @@
+"""Compact binary wire format for asset positions.
+
+Negotiated per connection with {"type": "subscribe", "format": "binary"}.
+A binary client then receives, each tick:
+
+* a JSON text message {"type": "asset_meta", ...} only when static
+  attributes (id, type, shift start, telemetry flag) were added or changed,
+  mapping each asset to its stable `index`;
+* a binary message: header `<2sBBIdI` (magic b"VP", version, kind, sequence
+  number, epoch seconds, record count) followed by `count` packed 14-byte
+  records `<IiiBB` (index, lat * 1e7, lng * 1e7, status code, fatigue * 255);
+* the remaining subscribed layers as JSON text, without "assets".
+"""
+import bisect
+import struct
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from ..core.entities import AssetState
+from ..core.models import AssetStatus
+
+MAGIC = b"VP"
+VERSION = 1
+KIND_POSITIONS = 1
+HEADER = struct.Struct("<2sBBIdI")
+COORD_SCALE = 1e7 # ~1 cm resolution in int32
+
+STATUS_NAMES: Tuple[str, ...] = tuple(status.value for status in AssetStatus)
+STATUS_CODES: Dict[str, int] = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+POSITION_DTYPE = np.dtype([
+    ("index", "<u4"),
+    ("lat", "<i4"),
+    ("lng", "<i4"),
+    ("status", "u1"),
+    ("fatigue", "u1"),
+])
+
+def _static_attributes(asset: AssetState) -> Tuple:
+    shift_start = asset.shift_start.isoformat() if isinstance(asset.shift_start, datetime) else asset.shift_start
+    return (asset.asset_id, asset.type.value, shift_start, asset.telemetry)
+
+class AssetRegistry:
+    """Stable asset indexes and versioned static attributes.
+
+    Each asset keeps the index it was first given. Whenever its static
+    attributes change, the registry version is bumped and the asset is
+    appended to a change log, so a connection can ask for everything that
+    changed since the version it last saw.
+    """
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.static: List[Tuple] = []
+        self.version = 0
+        self._log_versions: List[int] = []
+        self._log_indexes: List[int] = []
+
+    def update(self, assets: Iterable[AssetState]) -> np.ndarray:
+        """Register new assets, record static changes and pack positions."""
+        assets = list(assets)
+        for asset in assets:
+            idx = self.index.get(asset.asset_id)
+            if idx is None:
+                idx = len(self.static)
+            self.set_static(idx, _static_attributes(asset))
+
+        positions = np.empty(len(assets), dtype=POSITION_DTYPE)
+        positions["index"] = [self.index[a.asset_id] for a in assets]
+        positions["lat"] = np.rint(np.fromiter((a.location.lat for a in assets), np.float64, len(assets)) * COORD_SCALE)
+        positions["lng"] = np.rint(np.fromiter((a.location.lng for a in assets), np.float64, len(assets)) * COORD_SCALE)
+        positions["status"] = [STATUS_CODES[a.status.value] for a in assets]
+        positions["fatigue"] = np.rint(np.clip(
+            np.fromiter((a.fatigue_level for a in assets), np.float64, len(assets)), 0.0, 1.0) * 255)
+        return positions
+
+    def set_static(self, idx: int, attrs: Tuple):
+        """Record static attributes for index `idx` (also used by mirrors)."""
+        if idx < len(self.static) and self.static[idx] == attrs:
+            return
+        if idx >= len(self.static):
+            self.static.extend([None] * (idx + 1 - len(self.static)))
+        self.static[idx] = attrs
+        self.index[attrs[0]] = idx
+        self.version += 1
+        self._log_versions.append(self.version)
+        self._log_indexes.append(idx)
+
+    def changes_since(self, version: int) -> List[Tuple[int, Tuple]]:
+        """(index, attributes) changed after `version`, oldest first."""
+        start = bisect.bisect_right(self._log_versions, version)
+        return [(i, self.static[i]) for i in sorted(set(self._log_indexes[start:]))]
+
+    def meta_since(self, version: int) -> Dict[str, Any]:
+        """Static attributes changed after `version`, as an asset_meta message."""
+        return {
+            "type": "asset_meta",
+            "version": self.version,
+            "statuses": STATUS_NAMES,
+            "assets": [
+                {"index": i, "asset_id": s[0], "type": s[1], "shift_start": s[2], "telemetry": s[3]}
+                for i, s in self.changes_since(version)
+            ],
+        }
+
+def encode_positions(positions: np.ndarray, seq: int, timestamp: float) -> bytes:
+    return HEADER.pack(MAGIC, VERSION, KIND_POSITIONS, seq & 0xFFFFFFFF, timestamp, len(positions)) + positions.tobytes()
+
+def decode_positions(buf: bytes) -> Tuple[int, float, np.ndarray]:
+    """Inverse of `encode_positions`: (seq, timestamp, records)."""
+    magic, version, kind, seq, timestamp, count = HEADER.unpack_from(buf)
+    if magic != MAGIC or version != VERSION or kind != KIND_POSITIONS:
+        raise ValueError("not a position frame")
+    records = np.frombuffer(buf, dtype=POSITION_DTYPE, count=count, offset=HEADER.size)
+    return seq, timestamp, records
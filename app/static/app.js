@@ -227,6 +227,89 @@ const calculateFitScore = (officer, incident) => {
     };
 };
 
+// --- LIVE FEED ---
+// Subscribes to /ws with motion hints: the server sends a keyframe every few
+// seconds and a delta only when a unit gets a new route or state, and units
+// are animated here along their hinted polyline in between.
+
+const positionAt = (hint, simTime) => {
+    const { points, etas } = hint;
+    if (simTime <= etas[0]) return points[0];
+    for (let i = 1; i < etas.length; i++) {
+        if (simTime < etas[i]) {
+            const frac = (simTime - etas[i - 1]) / (etas[i] - etas[i - 1]);
+            return [
+                points[i - 1][0] + (points[i][0] - points[i - 1][0]) * frac,
+                points[i - 1][1] + (points[i][1] - points[i - 1][1]) * frac
+            ];
+        }
+    }
+    return points[points.length - 1];
+};
+
+class LiveFeed {
+    constructor(onState, { layers = ['assets', 'events'], keyframeS = 5 } = {}) {
+        this.onState = onState; // Called with (assets, events) on every message
+        this.subscription = { type: 'subscribe', motion: true, layers, keyframe_s: keyframeS };
+        this.assets = {};
+        this.events = {};
+        this.hints = {};
+        this.simTime = 0; // Simulated time of the last message...
+        this.receivedAt = 0; // ...and when it arrived, in performance.now() ms
+        this.closed = false;
+        this.connect();
+    }
+
+    connect() {
+        const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        this.socket = new WebSocket(`${scheme}://${window.location.host}/ws`);
+        this.socket.onopen = () => this.socket.send(JSON.stringify(this.subscription));
+        this.socket.onmessage = (msg) => this.apply(JSON.parse(msg.data));
+        this.socket.onclose = () => {
+            if (!this.closed) setTimeout(() => this.connect(), 2000);
+        };
+    }
+
+    close() {
+        this.closed = true;
+        this.socket.close();
+    }
+
+    apply(message) {
+        if (message.type !== 'keyframe' && message.type !== 'delta') return;
+        if (message.type === 'keyframe') {
+            this.assets = {};
+            this.events = {};
+            this.hints = {};
+        }
+        (message.assets || []).forEach(a => {
+            this.assets[a.asset_id] = a;
+            delete this.hints[a.asset_id]; // Stopped unless a new hint follows
+        });
+        (message.removed_assets || []).forEach(id => {
+            delete this.assets[id];
+            delete this.hints[id];
+        });
+        Object.assign(this.hints, message.motion || {});
+        (message.events || []).forEach(e => { this.events[e.event_id] = e; });
+        (message.removed_events || []).forEach(id => { delete this.events[id]; });
+        this.simTime = message.sim_time;
+        this.receivedAt = performance.now();
+        this.onState(Object.values(this.assets), Object.values(this.events));
+    }
+
+    // Extrapolated [lat, lng] per asset id at wall time `now`
+    positions(now = performance.now()) {
+        const simTime = this.simTime + (now - this.receivedAt) / 1000;
+        const out = {};
+        Object.values(this.assets).forEach(a => {
+            const hint = this.hints[a.asset_id];
+            out[a.asset_id] = hint ? positionAt(hint, simTime) : [a.location.lat, a.location.lng];
+        });
+        return out;
+    }
+}
+
 // --- VISUAL COMPONENTS ---
 
 const IngestionLogs = ({ logs }) => {
@@ -257,12 +340,28 @@ const IngestionLogs = ({ logs }) => {
 };
 
 // --- LEAFLET MAP COMPONENT ---
-const LeafletMap = ({ officers, incidents, zones, heatmapMode, patrolCarMode, onOfficerClick, onIncidentClick }) => {
+const LeafletMap = ({ officers, incidents, zones, heatmapMode, patrolCarMode, onOfficerClick, onIncidentClick, liveFeed }) => {
     const mapRef = useRef(null);
     const mapInstanceRef = useRef(null);
     const markersRef = useRef({});
     const circlesRef = useRef({});
 
+    // Animate live units between server messages; React only re-renders on state changes
+    useEffect(() => {
+        if (!liveFeed) return;
+        let frame;
+        const animate = () => {
+            const positions = liveFeed.positions();
+            Object.entries(positions).forEach(([id, latLng]) => {
+                const marker = markersRef.current[id];
+                if (marker) marker.setLatLng(latLng);
+            });
+            frame = requestAnimationFrame(animate);
+        };
+        frame = requestAnimationFrame(animate);
+        return () => cancelAnimationFrame(frame);
+    }, [liveFeed]);
+
     // Initialize Map
     useEffect(() => {
         if (!mapRef.current || mapInstanceRef.current) return;
@@ -621,6 +720,7 @@ function App() {
     const [scenarioIndex, setScenarioIndex] = useState(0); // 0: Call, 1: Predictive, 2: Officer Request
 
     const [activeTab, setActiveTab] = useState('ops');
+    const [liveFeed, setLiveFeed] = useState(null);
 
     // Clock
     useEffect(() => {
@@ -628,6 +728,31 @@ function App() {
         return () => clearInterval(timer);
     }, []);
 
+    // Live units from the simulator once the scripted demo is off
+    useEffect(() => {
+        if (demoMode) return;
+        const feed = new LiveFeed((assets) => {
+            setOfficers(assets.map(a => ({
+                id: a.asset_id,
+                name: a.asset_id,
+                badge: a.asset_id,
+                skill: ['Patrol'],
+                fatigue: Math.round(a.fatigue_level * 100),
+                status: a.status === 'IDLE' ? 'patrol' : 'busy',
+                lat: a.location.lat,
+                lng: a.location.lng,
+                vehicle: a.type,
+                history: `${Math.round(a.time_worked_minutes)} min on shift`,
+                specialization_desc: a.target_event_id ? `Responding to ${a.target_event_id}` : 'On patrol'
+            })));
+        });
+        setLiveFeed(feed);
+        return () => {
+            feed.close();
+            setLiveFeed(null);
+        };
+    }, [demoMode]);
+
     // Helper to add logs
     const addLog = useCallback((message, color = 'text-slate-400') => {
         setLogs(prev => [{ id: Date.now(), message, color, time: new Date().toLocaleTimeString() }, ...prev].slice(0, 50));
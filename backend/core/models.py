@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class AssetType(str, Enum):
     PCR = "PCR"
@@ -9,6 +9,10 @@ class AssetType(str, Enum):
     AMBULANCE = "AMBULANCE"
     FIRE_TRUCK = "FIRE_TRUCK"
 
+class MovementMode(str, Enum):
+    ROAD = "ROAD" # Follows the road graph
+    AIR = "AIR" # Flies straight to the target
+
 class AssetStatus(str, Enum):
     IDLE = "IDLE"
     BUSY = "BUSY"
@@ -36,14 +40,17 @@ class Asset(BaseModel):
     location: Location
     status: AssetStatus
     fatigue_level: float = 0.0
-    last_ping: datetime = datetime.now()
+    last_ping: datetime = Field(default_factory=datetime.now)
     # Audit Fields
-    shift_start: datetime = datetime.now()
+    shift_start: datetime = Field(default_factory=datetime.now)
     time_worked_minutes: float = 0.0
     current_node: Optional[str] = None # For Graph Movement
     target_node: Optional[str] = None
     current_path: Optional[list[str]] = [] # Path to follow (list of Nodes)
     current_segment_waypoints: Optional[list[Location]] = [] # Waypoints to next node
+    target_event_id: Optional[str] = None
+    mode: MovementMode = MovementMode.ROAD
+    battery: Optional[float] = None # Charge left (0-1), for units with limited endurance
 
 class Event(BaseModel):
     event_id: str
@@ -51,7 +58,9 @@ class Event(BaseModel):
     severity: int
     location: Location
     status: EventStatus
-    created_at: datetime = datetime.now()
+    created_at: datetime = Field(default_factory=datetime.now)
+    node_id: Optional[str] = None # Graph node the event is snapped to
+    assigned_asset_ids: list[str] = []
 
 class HexGrid(BaseModel):
     hex_id: str
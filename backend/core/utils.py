@@ -1,6 +1,8 @@
 import math
 from typing import Tuple
 
+import numpy as np
+
 def haversine_distance(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> float:
     """
     Calculate the great circle distance between two points 
@@ -19,6 +21,16 @@ def haversine_distance(coord1: Tuple[float, float], coord2: Tuple[float, float])
     d = R * c
     return d
 
+def haversine_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Great circle distances in km between every row of `a` and of `b`
+    (arrays of (lat, lng) in decimal degrees), as an (len(a), len(b)) matrix."""
+    lat1 = np.radians(a[:, 0])[:, None]
+    lat2 = np.radians(b[:, 0])[None, :]
+    dlat = lat2 - lat1
+    dlon = np.radians(b[:, 1])[None, :] - np.radians(a[:, 1])[:, None]
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * 6371 * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
 def calculate_eta(distance_km: float, speed_kmh: float = 40.0) -> float:
     """Calculate ETA in minutes based on distance and average speed."""
     if speed_kmh <= 0:
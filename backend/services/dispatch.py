@@ -0,0 +1,102 @@
+"""Capability-based dispatch for a mixed fleet.
+
+CAPABILITIES lists, per incident type, the unit types it needs and how
+many of each. Idle units are kept per type in a `FleetIndex`, so finding
+candidates for an ambulance slot never looks at drones or fire trucks.
+
+All open slots are solved in one batch: for each unit type, a single
+vectorized distance matrix between the slots that still need that type
+and its idle units, assigned greedily from the cheapest pair outwards.
+The work grows with slots x idle units of the same type, not with the
+size of the whole fleet. Costs default to great circle distance; the
+simulator prices pairs by per-mode ETA instead (see movement.py).
+"""
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.models import Asset, AssetType, Event, EventType
+from ..core.utils import haversine_matrix
+
+CAPABILITIES: Dict[EventType, Dict[AssetType, int]] = {
+    EventType.THEFT: {AssetType.PCR: 1},
+    EventType.ACCIDENT: {AssetType.PCR: 1, AssetType.AMBULANCE: 1},
+    EventType.FIRE: {AssetType.FIRE_TRUCK: 2, AssetType.AMBULANCE: 1},
+    EventType.RIOT: {AssetType.PCR: 2, AssetType.DRONE: 1},
+    EventType.MEDICAL: {AssetType.AMBULANCE: 1},
+}
+
+def missing(event: Event, assets: Dict[str, Asset]) -> Dict[AssetType, int]:
+    """Units of each type `event` still needs."""
+    need = dict(CAPABILITIES[event.type])
+    for asset_id in event.assigned_asset_ids:
+        asset = assets.get(asset_id)
+        if asset is not None and need.get(asset.type):
+            need[asset.type] -= 1
+    return {unit_type: count for unit_type, count in need.items() if count > 0}
+
+class FleetIndex:
+    """Idle units grouped by type."""
+
+    def __init__(self):
+        self.idle: Dict[AssetType, Dict[str, Asset]] = {unit_type: {} for unit_type in AssetType}
+
+    def add(self, asset: Asset):
+        self.idle[asset.type][asset.asset_id] = asset
+
+    def discard(self, asset: Asset):
+        self.idle[asset.type].pop(asset.asset_id, None)
+
+    def count(self, unit_type: AssetType) -> int:
+        return len(self.idle[unit_type])
+
+CostFn = Callable[[List[Event], List[Asset]], np.ndarray]
+
+def distance_matrix(events: List[Event], units: List[Asset]) -> np.ndarray:
+    slot_xy = np.array([(e.location.lat, e.location.lng) for e in events])
+    unit_xy = np.array([(a.location.lat, a.location.lng) for a in units])
+    return haversine_matrix(slot_xy, unit_xy)
+
+def solve(events: Iterable[Event], assets: Dict[str, Asset], fleet: FleetIndex,
+          cost_fn: Optional[CostFn] = None) -> List[Tuple[Event, Asset]]:
+    """Pair open slots of `events` with idle units; returns (event, unit) pairs.
+
+    `cost_fn(events, units)` prices every slot/unit pair; infinite cost
+    means the unit cannot serve the slot.
+    """
+    cost_fn = cost_fn or distance_matrix
+    slots: Dict[AssetType, List[Event]] = {}
+    for event in events:
+        for unit_type, count in missing(event, assets).items():
+            slots.setdefault(unit_type, []).extend([event] * count)
+
+    pairs = []
+    for unit_type, wanting in slots.items():
+        units = list(fleet.idle[unit_type].values())
+        if not units:
+            continue
+        cost = cost_fn(wanting, units)
+        # A slot never ends up further down its list than the number of
+        # slots, so only that many nearest units per slot need sorting
+        if len(units) > len(wanting):
+            nearest = np.argpartition(cost, len(wanting) - 1, axis=1)[:, :len(wanting)]
+        else:
+            nearest = np.broadcast_to(np.arange(len(units)), cost.shape)
+        ranked = np.take_along_axis(cost, nearest, axis=1)
+        rows, ranks = np.unravel_index(np.argsort(ranked, axis=None, kind="stable"), ranked.shape)
+        cols = nearest[rows, ranks]
+        slot_taken = np.zeros(len(wanting), dtype=bool)
+        unit_taken = np.zeros(len(units), dtype=bool)
+        remaining = min(len(wanting), len(units))
+        for row, col, value in zip(rows.tolist(), cols.tolist(), ranked[rows, ranks].tolist()):
+            if value == math.inf:
+                break # Only unreachable pairs are left
+            if slot_taken[row] or unit_taken[col]:
+                continue
+            slot_taken[row] = unit_taken[col] = True
+            pairs.append((wanting[row], units[col]))
+            remaining -= 1
+            if not remaining:
+                break
+    return pairs
@@ -0,0 +1,174 @@
+"""Movement modes: road-bound vehicles and free-flying drones.
+
+Each asset has a movement mode: ROAD follows the graph and its curved-road
+waypoints, AIR flies straight to the target. Its type's profile gives the
+default mode, the speed in degrees per step and, for drones, battery
+endurance. All units of a mode are advanced by one vectorized kernel.
+
+Dispatch ETAs are computed per mode in bulk: one shortest-path tree from
+the incident node prices every road unit at once, and air units are a
+straight-line distance matrix, limited by what their battery can still
+fly.
+"""
+import heapq
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.models import Asset, AssetType, Event, Location, MovementMode
+from .routing import RoadNetwork
+
+@dataclass(frozen=True)
+class Profile:
+    mode: MovementMode
+    speed: float # Degrees per step
+    endurance_steps: Optional[float] = None # Steps of flight on a full battery
+    recharge_steps: Optional[float] = None # Steps on the ground to recharge fully
+
+PROFILES: Dict[AssetType, Profile] = {
+    AssetType.PCR: Profile(MovementMode.ROAD, 0.0002),
+    AssetType.AMBULANCE: Profile(MovementMode.ROAD, 0.0002),
+    AssetType.FIRE_TRUCK: Profile(MovementMode.ROAD, 0.00015),
+    AssetType.DRONE: Profile(MovementMode.AIR, 0.0004, endurance_steps=1200, recharge_steps=2400),
+}
+BATTERY_RESERVE = 0.2 # Charge a drone keeps back when taking a call
+
+def step_towards(pos: np.ndarray, target: np.ndarray, speed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Move each row of `pos` up to `speed` towards `target`; returns (positions, arrived)."""
+    delta = target - pos
+    dist = np.hypot(delta[:, 0], delta[:, 1])
+    arrived = dist <= speed
+    scale = np.where(arrived, 1.0, speed / np.where(arrived, 1.0, dist))
+    return pos + delta * scale[:, None], arrived
+
+class Movement:
+    """Steps units by mode and prices dispatch ETAs."""
+
+    def __init__(self, road_network: RoadNetwork):
+        self.road_network = road_network
+        self.node_names = list(road_network.nodes)
+        self.node_index = {name: i for i, name in enumerate(self.node_names)}
+        self._trees: Dict[str, np.ndarray] = {}
+
+    # --- Stepping ---
+
+    def step(self, assets: List[Asset]):
+        road = [a for a in assets if a.mode == MovementMode.ROAD]
+        air = [a for a in assets if a.mode == MovementMode.AIR]
+        if road:
+            self._step_road(road)
+        if air:
+            self._step_air(air)
+
+    def _load_segment(self, asset: Asset):
+        # Curved-road waypoints, then the next node itself
+        next_node = asset.current_path[0]
+        waypoints = self.road_network.get_edge_waypoints(asset.current_node, next_node)
+        node_coords = self.road_network.nodes[next_node]
+        asset.current_segment_waypoints = [Location(lat=wp[0], lng=wp[1]) for wp in waypoints]
+        asset.current_segment_waypoints.append(Location(lat=node_coords[0], lng=node_coords[1]))
+
+    def _step_road(self, units: List[Asset]):
+        moving = []
+        for asset in units:
+            if asset.current_path and not asset.current_segment_waypoints:
+                self._load_segment(asset)
+            if asset.current_path and asset.current_segment_waypoints:
+                moving.append(asset)
+        if not moving:
+            return
+        pos = np.array([(a.location.lat, a.location.lng) for a in moving])
+        target = np.array([(a.current_segment_waypoints[0].lat, a.current_segment_waypoints[0].lng) for a in moving])
+        speed = np.array([PROFILES[a.type].speed for a in moving])
+        pos, arrived = step_towards(pos, target, speed)
+        for asset, (lat, lng), done in zip(moving, pos.tolist(), arrived.tolist()):
+            asset.location.lat = lat
+            asset.location.lng = lng
+            if done:
+                asset.current_segment_waypoints.pop(0)
+                # Emptied the waypoints: reached the next node
+                if not asset.current_segment_waypoints:
+                    asset.current_node = asset.current_path.pop(0)
+
+    def _step_air(self, units: List[Asset]):
+        nodes = self.road_network.nodes
+        pos = np.array([(a.location.lat, a.location.lng) for a in units])
+        flying = np.array([a.target_node is not None and a.current_node != a.target_node for a in units])
+        target = np.array([nodes[a.target_node] if fly else (a.location.lat, a.location.lng)
+                           for a, fly in zip(units, flying.tolist())])
+        profiles = [PROFILES[a.type] for a in units]
+        speed = np.array([p.speed for p in profiles])
+        drain = np.array([1.0 / p.endurance_steps if p.endurance_steps else 0.0 for p in profiles])
+        charge = np.array([1.0 / p.recharge_steps if p.recharge_steps else 0.0 for p in profiles])
+        battery = np.array([a.battery if a.battery is not None else 1.0 for a in units])
+
+        pos, arrived = step_towards(pos, target, np.where(flying, speed, 0.0))
+        battery = np.clip(np.where(flying, battery - drain, battery + charge), 0.0, 1.0)
+        for asset, (lat, lng), level, fly, done in zip(units, pos.tolist(), battery.tolist(),
+                                                        flying.tolist(), arrived.tolist()):
+            asset.location.lat = lat
+            asset.location.lng = lng
+            asset.battery = level
+            if fly and done:
+                asset.current_node = asset.target_node
+
+    # --- ETAs ---
+
+    def _tree(self, source: str) -> np.ndarray:
+        """Road distance in degrees from `source` to every node (Dijkstra, cached)."""
+        tree = self._trees.get(source)
+        if tree is not None:
+            return tree
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist.get(node, math.inf):
+                continue
+            for neighbor in self.road_network.adj_list.get(node, ()):
+                nd = d + self._edge_length(node, neighbor)
+                if nd < dist.get(neighbor, math.inf):
+                    dist[neighbor] = nd
+                    heapq.heappush(heap, (nd, neighbor))
+        tree = np.array([dist.get(name, math.inf) for name in self.node_names])
+        self._trees[source] = tree
+        return tree
+
+    def _edge_length(self, u: str, v: str) -> float:
+        points = [self.road_network.nodes[u], *self.road_network.get_edge_waypoints(u, v), self.road_network.nodes[v]]
+        return sum(math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(points, points[1:]))
+
+    def eta_matrix(self, events: List[Event], units: List[Asset]) -> np.ndarray:
+        """Steps for each unit (columns) to reach each event (rows); inf when it cannot."""
+        profiles = [PROFILES[a.type] for a in units]
+        pos = np.array([(a.location.lat, a.location.lng) for a in units])
+        dist = np.full((len(events), len(units)), math.inf)
+
+        road = np.array([a.mode == MovementMode.ROAD for a in units])
+        if road.any():
+            cols = np.flatnonzero(road)
+            nodes = self.road_network.nodes
+            at = np.array([self.node_index[units[j].current_node] for j in cols])
+            node_xy = np.array([nodes[units[j].current_node] for j in cols])
+            # A unit between nodes is priced from its last node plus the gap to it
+            gap = np.hypot(*(pos[cols] - node_xy).T)
+            for i, event in enumerate(events):
+                dist[i, cols] = self._tree(event.node_id)[at] + gap
+
+        air = ~road
+        if air.any():
+            cols = np.flatnonzero(air)
+            event_xy = np.array([(e.location.lat, e.location.lng) for e in events])
+            delta = event_xy[:, None, :] - pos[cols][None, :, :]
+            straight = np.hypot(delta[..., 0], delta[..., 1])
+            # Battery-limited units only take calls within what they can still fly
+            reach = np.array([
+                math.inf if units[j].battery is None or not profiles[j].endurance_steps
+                else max(0.0, units[j].battery - BATTERY_RESERVE) * profiles[j].endurance_steps * profiles[j].speed
+                for j in cols
+            ])
+            dist[:, cols] = np.where(straight <= reach[None, :], straight, math.inf)
+
+        return dist / np.array([p.speed for p in profiles])[None, :]
@@ -1,5 +1,7 @@
 import math
-from typing import List, Tuple, Dict, Set
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 from ..core.models import Location
 
 # --- BANGALORE (KORAMANGALA/MADIWALA) SECTOR GRAPH ---
@@ -69,18 +71,33 @@ WAYPOINTS = {
 }
 
 class RoadNetwork:
-    def __init__(self):
-        self.nodes = NODES
+    """Immutable road graph, shared process-wide through `get_road_network`."""
+
+    def __init__(self, nodes: Optional[Mapping[str, Tuple[float, float]]] = None,
+                 edges: Optional[Iterable[Tuple[str, str]]] = None,
+                 waypoints: Optional[Mapping[Tuple[str, str], List[Tuple[float, float]]]] = None):
+        self.nodes = MappingProxyType(dict(NODES if nodes is None else nodes))
+        self.edges = tuple(EDGES if edges is None else edges)
         self.adj_list = self._build_adj_list()
-        self.waypoints = WAYPOINTS
+        self.waypoints = MappingProxyType(dict(WAYPOINTS if waypoints is None else waypoints))
+        self._json = None
 
-    def _build_adj_list(self) -> Dict[str, List[str]]:
+    def _build_adj_list(self) -> Mapping[str, Tuple[str, ...]]:
         adj = {node: [] for node in self.nodes}
-        for u, v in EDGES:
+        for u, v in self.edges:
             if u in adj and v in adj:
                 adj[u].append(v)
                 adj[v].append(u)
-        return adj
+        return MappingProxyType({node: tuple(neighbors) for node, neighbors in adj.items()})
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Plain-dict view for JSON encoding, built once per graph."""
+        if self._json is None:
+            self._json = {
+                "nodes": {name: list(coords) for name, coords in self.nodes.items()},
+                "edges": {name: list(neighbors) for name, neighbors in self.adj_list.items()},
+            }
+        return self._json
 
     def get_edge_waypoints(self, u: str, v: str) -> List[Tuple[float, float]]:
         """Get list of intermediate waypoints between u and v."""
@@ -162,3 +179,9 @@ class RoadNetwork:
         if len(path) > 1:
             return path[1]
         return current_node
+
+
+@lru_cache(maxsize=None)
+def get_road_network() -> RoadNetwork:
+    """Process-wide shared RoadNetwork, built lazily on first use."""
+    return RoadNetwork()
@@ -1,42 +1,60 @@
 import asyncio
 import random
 import json
-import math
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 from fastapi.encoders import jsonable_encoder
 
-from ..core.models import Asset, AssetType, AssetStatus, Event, EventType, EventStatus, Location
-from ..core.utils import haversine_distance
-from .routing import RoadNetwork
+from ..core.models import Asset, AssetType, AssetStatus, Event, EventType, EventStatus, Location, MovementMode
+from .dispatch import FleetIndex, missing, solve
+from .movement import PROFILES, Movement
+from .routing import RoadNetwork, get_road_network
 
 # Bangalore (Koramangala/Madiwala) Sector Bounds
 LAT_MIN, LAT_MAX = 12.9100, 12.9600
 LNG_MIN, LNG_MAX = 77.6000, 77.6500
 
+# Units per type; road vehicles first
+FLEET = {
+    AssetType.PCR: 6,
+    AssetType.AMBULANCE: 3,
+    AssetType.FIRE_TRUCK: 2,
+    AssetType.DRONE: 4,
+}
+
 class Simulator:
-    def __init__(self):
-        self.road_network = RoadNetwork()
+    def __init__(self, road_network: Optional[RoadNetwork] = None):
+        self.road_network = road_network or get_road_network()
+        self.movement = Movement(self.road_network)
         self.assets: Dict[str, Asset] = self._init_assets()
+        self.fleet = FleetIndex()
+        for asset in self.assets.values():
+            self.fleet.add(asset)
         self.events: Dict[str, Event] = {}
+        self.open_events: Dict[str, Event] = {} # Incidents still short of units
         self.ingestion_log: List[Dict] = []
         self.running = True
 
     def _init_assets(self) -> Dict[str, Asset]:
         assets = {}
         node_names = list(self.road_network.nodes.keys())
-        for i in range(4):
-            start_node = random.choice(node_names)
-            coords = self.road_network.nodes[start_node]
-            
-            assets[f"DRONE-{i+1}"] = Asset(
-                asset_id=f"DRONE-{i+1}",
-                type=AssetType.DRONE,
-                location=Location(lat=coords[0], lng=coords[1]),
-                status=AssetStatus.IDLE
-            )
-            assets[f"DRONE-{i+1}"].current_node = start_node
-            assets[f"DRONE-{i+1}"].target_node = None
+        for asset_type, count in FLEET.items():
+            for i in range(count):
+                start_node = random.choice(node_names)
+                coords = self.road_network.nodes[start_node]
+                asset_id = f"{asset_type.value}-{i+1}"
+                profile = PROFILES[asset_type]
+
+                assets[asset_id] = Asset(
+                    asset_id=asset_id,
+                    type=asset_type,
+                    location=Location(lat=coords[0], lng=coords[1]),
+                    status=AssetStatus.IDLE,
+                    mode=profile.mode,
+                    battery=1.0 if profile.endurance_steps else None
+                )
+                assets[asset_id].current_node = start_node
+                assets[asset_id].target_node = None
         return assets
 
     def _generate_event(self):
@@ -47,36 +65,7 @@ class Simulator:
             # Pick a random node from the road network for the event location
             node_names = list(self.road_network.nodes.keys())
             event_node = random.choice(node_names)
-            coords = self.road_network.nodes[event_node]
-            
-            self.events[event_id] = Event(
-                event_id=event_id,
-                type=evt_type,
-                severity=random.randint(1, 10),
-                location=Location(lat=coords[0], lng=coords[1]),
-                status=EventStatus.ACTIVE
-            )
-            
-            # Dispatch logic: Find nearest idle asset
-            nearest_asset = None
-            min_dist = float('inf')
-            
-            for asset in self.assets.values():
-                if asset.status == AssetStatus.IDLE:
-                    dist = haversine_distance((asset.location.lat, asset.location.lng), coords)
-                    if dist < min_dist:
-                        min_dist = dist
-                        nearest_asset = asset
-            
-            if nearest_asset:
-                nearest_asset.status = AssetStatus.BUSY
-                nearest_asset.target_node = event_node
-                # Calculate path immediately
-                nearest_asset.current_path = self.road_network.get_path(nearest_asset.current_node, event_node)
-                # Remove start node from path as we are already there (or close enough)
-                if nearest_asset.current_path and nearest_asset.current_path[0] == nearest_asset.current_node:
-                    nearest_asset.current_path.pop(0)
-                print(f"Dispatched {nearest_asset.asset_id} to {event_id} at {event_node}")
+            self.add_event(event_id, evt_type, event_node, random.randint(1, 10))
 
             self.ingestion_log.append({
                 "id": event_id,
@@ -89,71 +78,78 @@ class Simulator:
 
             print(f"Generated Event: {event_id} ({evt_type}) at {event_node}")
 
+    def add_event(self, event_id: str, evt_type: EventType, event_node: str, severity: int = 5) -> Event:
+        coords = self.road_network.nodes[event_node]
+        event = self.events[event_id] = Event(
+            event_id=event_id,
+            type=evt_type,
+            severity=severity,
+            location=Location(lat=coords[0], lng=coords[1]),
+            status=EventStatus.PENDING,
+            node_id=event_node
+        )
+        self.open_events[event_id] = event
+        self._dispatch()
+        return event
+
+    def _dispatch(self):
+        # One batched solve over every incident still short of units
+        if not self.open_events:
+            return
+        for event, asset in solve(self.open_events.values(), self.assets, self.fleet, self.movement.eta_matrix):
+            self._send(asset, event)
+        for event in list(self.open_events.values()):
+            if event.assigned_asset_ids:
+                event.status = EventStatus.ACTIVE
+            if not missing(event, self.assets):
+                del self.open_events[event.event_id]
+
+    def _send(self, asset: Asset, event: Event):
+        asset.status = AssetStatus.BUSY
+        asset.target_node = event.node_id
+        asset.target_event_id = event.event_id
+        self.fleet.discard(asset)
+        event.assigned_asset_ids.append(asset.asset_id)
+        if asset.mode == MovementMode.AIR:
+            # Flies straight there; no path search
+            asset.current_path = []
+            asset.current_segment_waypoints = []
+            print(f"Dispatched {asset.asset_id} to {event.event_id} at {event.node_id}")
+            return
+        # Calculate path immediately
+        asset.current_path = self.road_network.get_path(asset.current_node, event.node_id)
+        # Remove start node from path as we are already there (or close enough)
+        if asset.current_path and asset.current_path[0] == asset.current_node:
+            asset.current_path.pop(0)
+        print(f"Dispatched {asset.asset_id} to {event.event_id} at {event.node_id}")
+
+    def release(self, asset: Asset):
+        """Return a unit to the idle pool."""
+        asset.status = AssetStatus.IDLE
+        asset.target_event_id = None
+        self.fleet.add(asset)
+        self._dispatch()
+
     def _move_assets(self):
-        for asset_id, asset in self.assets.items():
-            # If idle and no target, wander randomly
-            if asset.status == AssetStatus.IDLE:
+        for asset in self.assets.values():
+            # If idle and no target, wander randomly (drones hold position and recharge)
+            if asset.status == AssetStatus.IDLE and asset.mode == MovementMode.ROAD:
                 if not asset.target_node or asset.current_node == asset.target_node:
                     neighbors = self.road_network.adj_list.get(asset.current_node, [])
                     if neighbors:
                         asset.target_node = random.choice(neighbors)
                         asset.current_path = [asset.target_node] # Direct neighbor, path is just the node
 
-            # Move along path
-            if asset.current_path:
-                # Check if we have waypoints to traverse first
-                if not asset.current_segment_waypoints:
-                    # We are at a node, looking at the next node in path
-                    next_node = asset.current_path[0]
-                    # Load waypoints between current_node and next_node
-                    waypoints = self.road_network.get_edge_waypoints(asset.current_node, next_node)
-                    if waypoints:
-                        # Convert tuples to Location objects or just use tuples
-                        # Let's use simple dicts or objects for consistency, but tuples are fine for internal logic
-                        # We need to append the final destination (next_node) to the waypoints list
-                        # so we visit waypoints -> next_node
-                        asset.current_segment_waypoints = [Location(lat=wp[0], lng=wp[1]) for wp in waypoints]
-                    
-                    # Always append the actual node as the final "waypoint" of this segment
-                    node_coords = self.road_network.nodes[next_node]
-                    if not asset.current_segment_waypoints:
-                         asset.current_segment_waypoints = []
-                    asset.current_segment_waypoints.append(Location(lat=node_coords[0], lng=node_coords[1]))
-
-                # Now move towards the first target in current_segment_waypoints
-                if asset.current_segment_waypoints:
-                    target = asset.current_segment_waypoints[0]
-                    target_coords = (target.lat, target.lng)
-                    current_coords = (asset.location.lat, asset.location.lng)
-                    
-                    # Constant speed movement (degrees per step)
-                    speed = 0.0002 
-                    
-                    # Calculate direction vector
-                    dx = target_coords[0] - current_coords[0]
-                    dy = target_coords[1] - current_coords[1]
-                    distance = math.sqrt(dx**2 + dy**2)
-                    
-                    if distance > 0:
-                        # Normalize and scale by speed
-                        move_x = (dx / distance) * speed
-                        move_y = (dy / distance) * speed
-                        
-                        # Check if we overshoot
-                        if distance <= speed:
-                            # Reached the waypoint/node
-                            asset.location.lat = target_coords[0]
-                            asset.location.lng = target_coords[1]
-                            asset.current_segment_waypoints.pop(0)
-                            
-                            # If we emptied the waypoints, it means we reached the next_node
-                            if not asset.current_segment_waypoints:
-                                asset.current_node = asset.current_path[0]
-                                asset.current_path.pop(0)
-                        else:
-                            asset.location.lat += move_x
-                            asset.location.lng += move_y
-            
+        # Move along paths / flight lines, one vectorized step per mode
+        self.movement.step(list(self.assets.values()))
+
+        # Units that reached their incident go back to the pool
+        arrived = [a for a in self.assets.values()
+                   if a.status == AssetStatus.BUSY and not a.current_path and a.current_node == a.target_node]
+        for asset in arrived:
+            self.release(asset)
+
+        for asset in self.assets.values():
             asset.time_worked_minutes += 1.0
             if asset.status != AssetStatus.OFF_DUTY:
                 asset.fatigue_level = max(0.0, asset.fatigue_level - 0.001)
@@ -177,10 +173,7 @@ class Simulator:
                 "events": jsonable_encoder([e for e in self.events.values()]),
                 "logs": self.ingestion_log,
                 "heatmap": heatmap_data,
-                "road_network": {
-                    "nodes": self.road_network.nodes,
-                    "edges": self.road_network.adj_list
-                }
+                "road_network": self.road_network.to_dict()
             }
             
             await manager.broadcast(json.dumps(state))
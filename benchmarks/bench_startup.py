@@ -0,0 +1,48 @@
+"""Startup cost of the road graph and the Simulator.
+
+Usage:
+    python -m benchmarks.bench_startup [--nodes 100000] [--repeat 5]
+"""
+import argparse
+import time
+
+from app.services import routing
+from app.services.simulator import Simulator
+
+from .synthetic import grid_graph
+
+
+def _time(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    nodes, edges = grid_graph(args.nodes)
+    print(f"synthetic graph: {len(nodes)} nodes, {len(edges)} edges")
+
+    build_ms = _time(lambda: routing.RoadNetwork(nodes, edges), args.repeat)
+    print(f"RoadNetwork build (synthetic):   {build_ms:10.3f} ms")
+
+    graph = routing.RoadNetwork(nodes, edges)
+    sim_ms = _time(lambda: Simulator(road_network=graph), args.repeat)
+    print(f"Simulator() on shared graph:     {sim_ms:10.3f} ms")
+
+    routing.get_road_network.cache_clear()
+    cold_ms = _time(routing.get_road_network, 1)
+    warm_ms = _time(routing.get_road_network, args.repeat)
+    print(f"get_road_network() cold:         {cold_ms:10.3f} ms")
+    print(f"get_road_network() warm:         {warm_ms:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
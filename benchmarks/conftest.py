@@ -0,0 +1,20 @@
+import pytest
+
+# Problem sizes per --bench-scale. "quick" keeps a full run to a few
+# minutes; "full" covers the city-scale end of the range.
+SCALES = {
+    "quick": {"n_nodes": [100, 1_000, 10_000], "n_assets": [10, 100, 1_000], "n_sockets": [1, 10, 100]},
+    "full": {"n_nodes": [100, 1_000, 10_000, 100_000], "n_assets": [10, 100, 1_000, 10_000], "n_sockets": [1, 10, 100, 1_000]},
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption("--bench-scale", choices=sorted(SCALES), default="quick",
+                     help="problem sizes for the benchmark suite")
+
+
+def pytest_generate_tests(metafunc):
+    sizes = SCALES[metafunc.config.getoption("--bench-scale")]
+    for name, values in sizes.items():
+        if name in metafunc.fixturenames:
+            metafunc.parametrize(name, values)
@@ -0,0 +1,90 @@
+import math
+import random
+from functools import lru_cache
+from typing import Dict, List, Tuple, Type
+
+from app.core.entities import AssetState, Position
+from app.core.models import AssetStatus, AssetType, EventType, IncidentIn, Location
+from app.services.routing import RoadNetwork
+from app.services.simulator import Simulator
+from app.services.spatial import GridIndex
+
+# Synthetic road graphs for benchmarks, laid over the Koramangala sector so
+# coordinates stay in the same range as the real graph.
+ORIGIN = (12.9150, 77.6050)
+SPAN = 0.0300
+
+
+def grid_graph(n_nodes: int) -> Tuple[Dict[str, Tuple[float, float]], List[Tuple[str, str]]]:
+    """Square lattice with roughly `n_nodes` intersections."""
+    side = max(2, int(math.isqrt(n_nodes)))
+    step = SPAN / (side - 1)
+    nodes = {}
+    edges = []
+    for i in range(side):
+        for j in range(side):
+            name = f"G{i}_{j}"
+            nodes[name] = (ORIGIN[0] + i * step, ORIGIN[1] + j * step)
+            if i > 0:
+                edges.append((f"G{i-1}_{j}", name))
+            if j > 0:
+                edges.append((f"G{i}_{j-1}", name))
+    return nodes, edges
+
+
+def random_geometric_graph(n_nodes: int, degree: float = 6.0, seed: int = 0
+                           ) -> Tuple[Dict[str, Tuple[float, float]], List[Tuple[str, str]]]:
+    """Uniform random points joined to every neighbour within a radius
+    chosen for the given mean degree, plus a spine so the graph is connected."""
+    rng = random.Random(seed)
+    radius = SPAN * math.sqrt(degree / (math.pi * n_nodes))
+    nodes = {f"R{i}": (ORIGIN[0] + rng.random() * SPAN, ORIGIN[1] + rng.random() * SPAN) for i in range(n_nodes)}
+    index = GridIndex(cell_deg=radius)
+    for name, (lat, lng) in nodes.items():
+        index.insert_point(name, lat, lng)
+    edges = []
+    for name, (lat, lng) in nodes.items():
+        for other in index.query_radius(lat, lng, radius):
+            if other > name:
+                olat, olng = nodes[other]
+                if (olat - lat) ** 2 + (olng - lng) ** 2 <= radius * radius:
+                    edges.append((name, other))
+    # Chain nodes in lat order so every pair is reachable
+    ordered = sorted(nodes, key=lambda n: nodes[n])
+    edges.extend(zip(ordered, ordered[1:]))
+    return nodes, edges
+
+
+@lru_cache(maxsize=None)
+def road_network(kind: str, n_nodes: int) -> RoadNetwork:
+    """Cached synthetic RoadNetwork ("grid" or "geometric")."""
+    nodes, edges = grid_graph(n_nodes) if kind == "grid" else random_geometric_graph(n_nodes)
+    graph = RoadNetwork(nodes, edges)
+    # Build derived indexes up front so they are not timed
+    graph.node_index, graph.edge_lengths
+    return graph
+
+
+def make_simulator(graph: RoadNetwork, n_assets: int, n_events: int = 0, seed: int = 0,
+                   engine: Type[Simulator] = Simulator) -> Simulator:
+    """`engine` on `graph` with `n_assets` idle PCRs and `n_events` active incidents."""
+    rng = random.Random(seed)
+    sim = engine(road_network=graph)
+    node_names = list(graph.nodes)
+    sim.assets = {}
+    for i in range(n_assets):
+        node = rng.choice(node_names)
+        lat, lng = graph.nodes[node]
+        sim.assets[f"PCR-{i+1}"] = AssetState(
+            asset_id=f"PCR-{i+1}",
+            type=AssetType.PCR,
+            location=Position(lat, lng),
+            status=AssetStatus.IDLE,
+            current_node=node
+        )
+    for _ in range(n_events):
+        lat, lng = graph.nodes[rng.choice(node_names)]
+        sim.add_incident(IncidentIn(type=rng.choice(list(EventType)), severity=rng.randint(1, 10),
+                                    location=Location(lat=lat, lng=lng)))
+    sim._update_asset_index()
+    return sim
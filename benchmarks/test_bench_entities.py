@@ -0,0 +1,56 @@
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.core.entities import AssetState, Position, to_api_assets, to_json
+from app.core.models import Asset, AssetStatus, AssetType, Location
+
+KINDS = ("pydantic", "slots")
+
+
+def make_assets(kind: str, n: int):
+    if kind == "pydantic":
+        return [Asset(asset_id=f"PCR-{i}", type=AssetType.PCR, location=Location(lat=12.9, lng=77.6),
+                      status=AssetStatus.IDLE, current_node="N") for i in range(n)]
+    return [AssetState(f"PCR-{i}", AssetType.PCR, Position(12.9, 77.6), AssetStatus.IDLE, current_node="N")
+            for i in range(n)]
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_entity_memory(benchmark, kind):
+    n = 1_000
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    assets = make_assets(kind, n)
+    per_entity = (tracemalloc.get_traced_memory()[0] - before) / n
+    tracemalloc.stop()
+    benchmark.extra_info["bytes_per_entity"] = round(per_entity)
+    benchmark(make_assets, kind, 100)
+    assert len(assets) == n
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_attribute_access(benchmark, kind, n_assets):
+    assets = make_assets(kind, n_assets)
+
+    def hot_loop():
+        # The shape of the per-tick scans: status checks and position reads
+        total = 0.0
+        for a in assets:
+            if a.status == AssetStatus.IDLE:
+                total += a.location.lat + a.fatigue_level
+        return total
+
+    assert benchmark(hot_loop) > 0
+
+
+def test_bulk_to_api(benchmark, n_assets):
+    assets = make_assets("slots", n_assets)
+    assert len(benchmark(to_api_assets, assets)) == n_assets
+
+
+def test_encode_json(benchmark, n_assets):
+    assets = make_assets("slots", n_assets)
+    benchmark(lambda: [to_json(a) for a in assets])
@@ -0,0 +1,30 @@
+import itertools
+import random
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.core.models import Location
+
+from .synthetic import road_network
+
+
+@pytest.mark.parametrize("kind", ["grid", "geometric"])
+def test_get_path(benchmark, kind, n_nodes):
+    graph = road_network(kind, n_nodes)
+    rng = random.Random(1)
+    names = list(graph.nodes)
+    pairs = itertools.cycle([(rng.choice(names), rng.choice(names)) for _ in range(64)])
+    path = benchmark(lambda: graph.get_path(*next(pairs)))
+    assert isinstance(path, list)
+
+
+@pytest.mark.parametrize("kind", ["grid", "geometric"])
+def test_get_nearest_node(benchmark, kind, n_nodes):
+    graph = road_network(kind, n_nodes)
+    rng = random.Random(2)
+    points = itertools.cycle([
+        Location(lat=rng.uniform(12.915, 12.945), lng=rng.uniform(77.605, 77.635)) for _ in range(256)
+    ])
+    assert benchmark(lambda: graph.get_nearest_node(next(points))) in graph.nodes
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.core.models import AssetStatus, IncidentPhase
+from app.services import query
+from app.services.broadcast import ConnectionManager
+from app.services.des import EventDrivenSimulator
+from app.services.wire import encode_positions
+
+from .synthetic import make_simulator, road_network
+
+GRAPH_NODES = 10_000
+
+
+class FakeSocket:
+    """Stands in for a WebSocket; counts what would have been sent."""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send_text(self, message: str):
+        self.sent += len(message)
+
+    async def send_bytes(self, message: bytes):
+        self.sent += len(message)
+
+
+def test_assign_tasks(benchmark, n_assets):
+    graph = road_network("grid", GRAPH_NODES)
+    sim = make_simulator(graph, n_assets, n_events=max(1, n_assets // 10))
+
+    def reset():
+        for asset in sim.assets.values():
+            asset.status = AssetStatus.IDLE
+            asset.target_event_id = None
+            asset.path = []
+        for event in sim.events.values():
+            event.phase = IncidentPhase.PENDING
+            event.assigned_asset_id = None
+            sim.dispatch_queue.push(event)
+        sim._update_asset_index()
+        return (), {}
+
+    benchmark.pedantic(sim._assign_tasks, setup=reset, rounds=10)
+    assert all(e.assigned_asset_id for e in sim.events.values())
+
+
+def test_move_assets(benchmark, n_assets):
+    sim = make_simulator(road_network("grid", GRAPH_NODES), n_assets)
+    benchmark(sim._move_assets)
+
+
+def test_simulated_minute_ticked(benchmark, n_assets):
+    sim = make_simulator(road_network("grid", GRAPH_NODES), n_assets)
+
+    def minute():
+        for _ in range(int(60 / sim.tick_seconds)):
+            sim.step()
+
+    benchmark.pedantic(minute, rounds=3)
+
+
+def test_simulated_minute_event_driven(benchmark, n_assets):
+    sim = make_simulator(road_network("grid", GRAPH_NODES), n_assets, engine=EventDrivenSimulator)
+    benchmark.pedantic(sim.run_for, args=(60,), rounds=3)
+
+
+def test_encode_full_state(benchmark, n_assets):
+    sim = make_simulator(road_network("grid", GRAPH_NODES), n_assets, n_events=n_assets // 10)
+    assert benchmark(lambda: sim.build_frame().full()).startswith("{")
+
+
+def test_encode_binary_positions(benchmark, n_assets):
+    sim = make_simulator(road_network("grid", GRAPH_NODES), n_assets)
+    assets = list(sim.assets.values())
+    frame = benchmark(lambda: encode_positions(sim.wire_registry.update(assets), 0, 0.0))
+    assert len(frame) > 14 * n_assets
+
+
+def test_broadcast(benchmark, n_sockets):
+    sim = make_simulator(road_network("grid", GRAPH_NODES), 1_000, n_events=100)
+    manager = ConnectionManager()
+    sockets = [FakeSocket() for _ in range(n_sockets)]
+    manager.active_connections.extend(sockets)
+    frame = sim.build_frame()
+    loop = asyncio.new_event_loop()
+    try:
+        benchmark(lambda: loop.run_until_complete(manager.broadcast_frame(frame)))
+    finally:
+        loop.close()
+    assert all(s.sent for s in sockets)
+
+
+def test_query_assets_near(benchmark, n_assets):
+    sim = make_simulator(road_network("grid", GRAPH_NODES), n_assets)
+    frame = sim.build_frame()
+    origin = sim.assets["PCR-1"].location
+    page = benchmark(query.assets_near, frame, origin.lat, origin.lng, 500.0, fields=["asset_id", "status"], limit=20)
+    assert page["items"]
+
+
+def test_coverage_update(benchmark, n_assets):
+    sim = make_simulator(road_network("grid", GRAPH_NODES), n_assets)
+    sim._update_coverage() # The initial flood is not what a tick pays
+
+    def tick():
+        sim.step()
+        return (), {}
+
+    benchmark.pedantic(sim._update_coverage, setup=tick, rounds=20)
+    assert sim.coverage.eta
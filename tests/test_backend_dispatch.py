@@ -0,0 +1,76 @@
+import unittest
+from backend.core.models import AssetStatus, AssetType, Event, EventStatus, EventType, Location
+from backend.services.dispatch import CAPABILITIES, FleetIndex, solve
+from backend.services.simulator import Simulator
+
+def _medical(sim, event_id, node):
+    lat, lng = sim.road_network.nodes[node]
+    return Event(event_id=event_id, type=EventType.MEDICAL, severity=5,
+                 location=Location(lat=lat, lng=lng), status=EventStatus.PENDING, node_id=node)
+
+def _park(sim, asset_id, node):
+    asset = sim.assets[asset_id]
+    lat, lng = sim.road_network.nodes[node]
+    asset.current_node = node
+    asset.location = Location(lat=lat, lng=lng)
+    return asset
+
+class TestCapabilityDispatch(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator()
+        for asset in self.sim.assets.values():
+            _park(self.sim, asset.asset_id, "Indiranagar100ft")
+
+    def test_fire_gets_the_units_it_needs(self):
+        near = _park(self.sim, "FIRE_TRUCK-1", "StJohns")
+        event = self.sim.add_event("EVT-1", EventType.FIRE, "CheckPost")
+        types = sorted(self.sim.assets[a].type.value for a in event.assigned_asset_ids)
+        self.assertEqual(types, ["AMBULANCE", "FIRE_TRUCK", "FIRE_TRUCK"])
+        self.assertIn(near.asset_id, event.assigned_asset_ids)
+        self.assertEqual(event.status, EventStatus.ACTIVE)
+        self.assertNotIn(event.event_id, self.sim.open_events)
+        self.assertEqual(self.sim.fleet.count(AssetType.FIRE_TRUCK), 0)
+
+    def test_short_incident_waits_for_the_missing_type(self):
+        for asset in self.sim.assets.values():
+            if asset.type == AssetType.AMBULANCE:
+                asset.status = AssetStatus.BUSY
+                self.sim.fleet.discard(asset)
+        event = self.sim.add_event("EVT-1", EventType.ACCIDENT, "StJohns")
+        self.assertEqual([self.sim.assets[a].type for a in event.assigned_asset_ids], [AssetType.PCR])
+        self.assertIn(event.event_id, self.sim.open_events)
+
+        self.sim.release(self.sim.assets["AMBULANCE-2"])
+        self.assertIn("AMBULANCE-2", event.assigned_asset_ids)
+        self.assertNotIn(event.event_id, self.sim.open_events)
+
+    def test_units_return_to_the_pool_on_arrival(self):
+        event = self.sim.add_event("EVT-1", EventType.THEFT, "StJohns")
+        unit = self.sim.assets[event.assigned_asset_ids[0]]
+        self.assertEqual(unit.status, AssetStatus.BUSY)
+        for _ in range(500):
+            if unit.status != AssetStatus.BUSY:
+                break
+            self.sim._move_assets()
+        self.assertEqual(unit.current_node, "StJohns")
+        self.assertEqual(unit.status, AssetStatus.IDLE)
+        self.assertIsNone(unit.target_event_id)
+        self.assertEqual(self.sim.fleet.count(unit.type), sum(a.type == unit.type for a in self.sim.assets.values()))
+
+    def test_batch_pairs_each_slot_with_its_nearest_unit(self):
+        sim = self.sim
+        a = _park(sim, "AMBULANCE-1", "BTMJunction")
+        b = _park(sim, "AMBULANCE-2", "SonySignal")
+        far = _medical(sim, "EVT-1", "Koramangala80ft")
+        near = _medical(sim, "EVT-2", "MadiwalaMkt")
+        fleet = FleetIndex()
+        for unit in (a, b):
+            fleet.add(unit)
+        pairs = {e.event_id: u.asset_id for e, u in solve([far, near], sim.assets, fleet)}
+        self.assertEqual(pairs, {"EVT-1": "AMBULANCE-2", "EVT-2": "AMBULANCE-1"})
+
+    def test_every_event_type_has_requirements(self):
+        self.assertEqual(set(CAPABILITIES), set(EventType))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import math
+import unittest
+from unittest import mock
+from backend.core.models import AssetStatus, EventType, Location, MovementMode
+from backend.services.movement import BATTERY_RESERVE, PROFILES
+from backend.services.simulator import Simulator
+
+def _park(sim, asset_id, node):
+    asset = sim.assets[asset_id]
+    lat, lng = sim.road_network.nodes[node]
+    asset.current_node = node
+    asset.target_node = None
+    asset.current_path = []
+    asset.current_segment_waypoints = []
+    asset.location = Location(lat=lat, lng=lng)
+    return asset
+
+class TestMovementModes(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator()
+        for asset in self.sim.assets.values():
+            _park(self.sim, asset.asset_id, "Indiranagar100ft")
+
+    def test_drones_fly_without_path_searches(self):
+        drone = _park(self.sim, "DRONE-1", "Koramangala80ft")
+        with mock.patch.object(self.sim.road_network, "get_path", wraps=self.sim.road_network.get_path) as get_path:
+            event = self.sim.add_event("EVT-1", EventType.RIOT, "SonySignal")
+        self.assertIn(drone.asset_id, event.assigned_asset_ids)
+        self.assertEqual(drone.current_path, [])
+        self.assertEqual(get_path.call_count, 2) # The two PCRs only
+
+        target = self.sim.road_network.nodes["SonySignal"]
+        start = math.dist((drone.location.lat, drone.location.lng), target)
+        self.sim._move_assets()
+        moved = start - math.dist((drone.location.lat, drone.location.lng), target)
+        self.assertAlmostEqual(moved, PROFILES[drone.type].speed)
+        for _ in range(int(start / PROFILES[drone.type].speed) + 1):
+            self.sim._move_assets()
+        self.assertEqual(drone.current_node, "SonySignal")
+        self.assertLess(drone.battery, 1.0)
+
+    def test_idle_drone_recharges_in_place(self):
+        drone = _park(self.sim, "DRONE-1", "StJohns")
+        drone.battery = 0.5
+        self.sim._move_assets()
+        self.assertEqual((drone.location.lat, drone.location.lng), self.sim.road_network.nodes["StJohns"])
+        self.assertGreater(drone.battery, 0.5)
+
+    def test_road_eta_follows_the_network(self):
+        sim = self.sim
+        pcr = _park(sim, "PCR-1", "SonySignal")
+        event = sim.add_event("EVT-1", EventType.MEDICAL, "StJohns") # Takes an ambulance
+        steps = sim.movement.eta_matrix([event], [pcr])[0, 0]
+        length = sim.movement._edge_length("SonySignal", "StJohns")
+        self.assertAlmostEqual(steps, length / PROFILES[pcr.type].speed)
+        self.assertGreater(length, math.dist(sim.road_network.nodes["SonySignal"], sim.road_network.nodes["StJohns"]))
+
+    def test_drone_out_of_battery_range_is_not_sent(self):
+        sim = self.sim
+        for asset in sim.assets.values():
+            if asset.mode == MovementMode.AIR:
+                asset.battery = BATTERY_RESERVE
+        event = sim.add_event("EVT-1", EventType.RIOT, "StJohns")
+        drones = [a for a in event.assigned_asset_ids if sim.assets[a].mode == MovementMode.AIR]
+        self.assertEqual(drones, [])
+        self.assertIn(event.event_id, sim.open_events)
+        self.assertTrue(all(sim.assets[a].status == AssetStatus.BUSY for a in event.assigned_asset_ids))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import unittest
+from app.core.models import EventType, IncidentIn, Location
+from app.services.broadcast import LAYERS, ConnectionManager, Subscription
+from app.services.simulator import Simulator
+from app.services.wire import decode_positions
+
+class TestSubscription(unittest.TestCase):
+    def test_defaults_to_everything(self):
+        sub = Subscription.from_message({"type": "subscribe"})
+        self.assertIsNone(sub.bbox)
+        self.assertEqual(sub.layers, LAYERS)
+        self.assertTrue(sub.due(0.0))
+
+    def test_rejects_bad_messages(self):
+        for message in ({"bbox": [1, 2, 3]}, {"bbox": [2, 0, 1, 1]}, {"layers": ["weather"]}, {"max_hz": 0}):
+            with self.assertRaises(ValueError):
+                Subscription.from_message(message)
+
+    def test_rate_limit(self):
+        sub = Subscription.from_message({"max_hz": 2})
+        sub.last_sent = 10.0
+        self.assertFalse(sub.due(10.4))
+        self.assertTrue(sub.due(10.5))
+
+class TestTickFrame(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator()
+        sony = self.sim.road_network.nodes["SONY_WORLD"]
+        silk = self.sim.road_network.nodes["SILK_BOARD"]
+        for i, asset in enumerate(self.sim.assets.values()):
+            asset.location = Location(lat=sony[0], lng=sony[1]) if i % 2 else Location(lat=silk[0], lng=silk[1])
+        self.sim.add_incident(IncidentIn(type=EventType.THEFT, location=Location(lat=silk[0], lng=silk[1])))
+        self.sim._update_asset_index()
+        self.frame = self.sim.build_frame()
+        self.sony = sony
+
+    def test_full_frame(self):
+        """Unsubscribed clients get the complete state"""
+        state = json.loads(self.frame.render(None))
+        self.assertEqual(len(state["assets"]), len(self.sim.assets))
+        self.assertEqual(set(state), {"timestamp"} | LAYERS)
+
+    def test_viewport_filter(self):
+        """A bounding box around Sony World only carries what is inside it"""
+        lat, lng = self.sony
+        sub = Subscription.from_message({"bbox": [lat - 0.001, lng - 0.001, lat + 0.001, lng + 0.001],
+                                         "layers": ["assets", "events", "heatmap"]})
+        state = json.loads(self.frame.render(sub))
+        self.assertEqual(set(state), {"timestamp", "assets", "events", "heatmap"})
+        self.assertEqual(len(state["assets"]), len(self.sim.assets) // 2)
+        self.assertEqual(state["events"], [])
+        self.assertEqual(state["heatmap"], [[lat, lng, 0.5]])
+
+    def test_binary_clients_get_no_asset_json(self):
+        """A binary subscriber's units come only as packed positions"""
+        manager = ConnectionManager()
+        socket = _Socket()
+        manager.active_connections.append(socket)
+        manager.subscribe(socket, Subscription.from_message({"format": "binary"}))
+        asyncio.run(manager.broadcast_frame(self.frame))
+        meta, state = (json.loads(text) for text in socket.text)
+        self.assertEqual(meta["type"], "asset_meta")
+        self.assertEqual(set(state), {"timestamp"} | (LAYERS - {"assets"}))
+        self.assertEqual(len(state["events"]), 1)
+        self.assertEqual(len(decode_positions(socket.binary[0])[2]), len(self.sim.assets))
+
+class _Socket:
+    def __init__(self):
+        self.text = []
+        self.binary = []
+
+    async def send_text(self, message: str):
+        self.text.append(message)
+
+    async def send_bytes(self, message: bytes):
+        self.binary.append(message)
+
+if __name__ == '__main__':
+    unittest.main()
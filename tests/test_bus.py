@@ -0,0 +1,185 @@
+import asyncio
+import json
+import math
+import os
+import stat
+import tempfile
+import unittest
+from app.core.models import EventType, IncidentIn, Location, RoadScale
+from app.services.broadcast import Subscription
+from app.services.bus import KIND_INCIDENTS, KIND_ROADS, BusClient, BusServer, FrameMirror, decode_packet, decode_payload, encode_frame
+from app.services.ingest import IngestQueue
+from app.services.shmring import FrameRing
+from app.services.simulator import Simulator
+from app.services.wire import decode_positions
+
+class TestFrameMirror(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=1)
+        for _ in range(5):
+            self.sim.step()
+        self.frame = self.sim.build_frame()
+
+    def test_waits_for_keyframe(self):
+        mirror = FrameMirror()
+        self.assertIsNone(mirror.apply(encode_frame(self.frame)))
+        self.assertIsNotNone(mirror.apply(encode_frame(self.frame, keyframe=True)))
+        self.assertIsNotNone(mirror.apply(encode_frame(self.frame)))
+
+    def test_mirrored_frame_renders_identically(self):
+        mirrored = FrameMirror().apply(encode_frame(self.frame, keyframe=True))
+        self.assertEqual(json.loads(mirrored.full()), json.loads(self.frame.full()))
+        sony = self.sim.road_network.nodes["SONY_WORLD"]
+        sub = Subscription.from_message({"bbox": [sony[0] - 0.05, sony[1] - 0.05, sony[0] + 0.05, sony[1] + 0.05]})
+        # Entities inside a bbox come out of a set, so compare them unordered
+        ours, theirs = json.loads(mirrored.render(sub)), json.loads(self.frame.render(sub))
+        for layer in ("assets", "events"):
+            self.assertEqual(sorted(map(json.dumps, ours.pop(layer))), sorted(map(json.dumps, theirs.pop(layer))))
+        self.assertEqual(ours, theirs)
+
+        binary = Subscription.from_message({"format": "binary"})
+        original = Subscription.from_message({"format": "binary"})
+        self.assertEqual(json.loads(mirrored.asset_meta(binary))["assets"],
+                         json.loads(self.frame.asset_meta(original))["assets"])
+        self.assertEqual(decode_positions(mirrored.render_positions(binary))[2].tolist(),
+                         decode_positions(self.frame.render_positions(original))[2].tolist())
+
+    def test_payloads_are_plain_data(self):
+        payload = encode_frame(self.frame, keyframe=True)
+        packet = decode_packet(payload)
+        self.assertEqual(packet["positions"], self.frame.packed()[0].tobytes())
+        with self.assertRaises(ValueError):
+            decode_payload(payload[:-len(packet["positions"]) - 10])
+
+    def test_kpis_are_sent_when_they_change(self):
+        mirror = FrameMirror()
+        sla = self.frame.sla
+        sla.record_dispatch("THEFT", "0:0", self.sim.clock.now(), 30.0)
+        cached = mirror.apply(encode_frame(self.frame, keyframe=True)).sla
+        self.assertIsNone(decode_packet(encode_frame(self.frame, sla_version=sla.version))["sla"])
+        self.assertIs(mirror.apply(encode_frame(self.frame, sla_version=sla.version)).sla, cached)
+        version = sla.version
+        sla.record_arrival("THEFT", "0:0", self.sim.clock.now(), 90.0)
+        updated = mirror.apply(encode_frame(self.frame, sla_version=version)).sla
+        self.assertEqual(updated.query(), sla.query())
+        self.assertIsNotNone(decode_packet(encode_frame(self.frame, keyframe=True, sla_version=sla.version))["sla"])
+
+class _Collector:
+    def __init__(self):
+        self.frames = []
+
+    async def broadcast_frame(self, frame):
+        self.frames.append(frame)
+
+class TestBusRoundTrip(unittest.TestCase):
+    def test_frames_out_and_ingest_back(self):
+        """A gateway receives every tick and its ingest reaches the producer"""
+        sim = Simulator(seed=2)
+        path = os.path.join(tempfile.mkdtemp(), "vos", "bus.sock")
+        gateway_queue = IngestQueue()
+        road_queue = IngestQueue(model=RoadScale)
+        u, v = sim.road_network.edges[0]
+
+        async def scenario():
+            server = BusServer(path, handlers={KIND_INCIDENTS: sim.ingest_queue.submit_batch,
+                                               KIND_ROADS: sim.road_queue.submit_batch})
+            await server.start()
+            # Only the owner may connect
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode), 0o700)
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+            client = BusClient(path, forward={KIND_INCIDENTS: gateway_queue, KIND_ROADS: road_queue}, retry_seconds=0.01)
+            collector = _Collector()
+            task = asyncio.create_task(client.run(collector))
+            while not server.writers:
+                await asyncio.sleep(0.01)
+            gateway_queue.submit_batch([IncidentIn(type=EventType.THEFT, location=Location(lat=12.93, lng=77.62))])
+            road_queue.submit_batch([RoadScale(from_node=u, to_node=v, factor=math.inf)])
+            for _ in range(3):
+                sim.step()
+                await server.broadcast_frame(sim.build_frame())
+                await asyncio.sleep(0.1)
+            client.running = False
+            task.cancel()
+            await server.close()
+            return collector.frames
+
+        frames = asyncio.run(scenario())
+        self.assertEqual([f.seq for f in frames], [1, 2, 3])
+        self.assertTrue(any(e.startswith("EVT-IN-") for e in sim.events))
+        self.assertFalse(sim.conditions.is_open(u, v))
+        self.assertEqual(frames[-1].roads, sim.conditions.describe())
+        self.assertTrue(frames[-1].roads[0]["closed"])
+
+class TestFrameRing(unittest.TestCase):
+    def setUp(self):
+        self.ring = FrameRing.create(f"vos-test-{os.getpid()}", slots=2, slot_size=64)
+        self.reader = FrameRing.attach(self.ring.shm.name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.ring.close()
+
+    def test_reader_skips_to_latest(self):
+        self.assertIsNone(self.reader.read_latest(bytes))
+        for payload in (b"one", b"two", b"three"):
+            self.ring.publish(payload)
+        self.assertEqual(self.reader.read_latest(bytes), (3, b"three"))
+        self.assertIsNone(self.reader.read_latest(bytes, after=3))
+
+    def test_overwritten_slot_is_detected(self):
+        self.ring.publish(b"old")
+
+        def decode_while_writer_laps(view):
+            data = bytes(view)
+            if data == b"old":
+                self.ring.publish(b"x")
+                self.ring.publish(b"new")
+            return data
+
+        self.assertEqual(self.reader.read_latest(decode_while_writer_laps), (3, b"new"))
+        self.assertEqual(self.reader.torn, 1)
+
+    def test_decode_bugs_are_not_swallowed(self):
+        self.ring.publish(b"{}")
+
+        def undecodable(view):
+            raise ValueError("garbage")
+
+        self.assertIsNone(self.reader.read_latest(undecodable))
+        with self.assertRaises(KeyError):
+            self.reader.read_latest(lambda view: {}["seq"])
+
+    def test_oversized_packet_rejected(self):
+        with self.assertRaises(ValueError):
+            self.ring.publish(b"x" * 65)
+
+class TestRingGateway(unittest.TestCase):
+    def test_gateway_reads_frames_from_shared_memory(self):
+        sim = Simulator(seed=4)
+        path = os.path.join(tempfile.mkdtemp(), "bus.sock")
+        ring = FrameRing.create(f"vos-test-gw-{os.getpid()}", slot_size=4 * 1024 * 1024)
+
+        async def scenario():
+            server = BusServer(path, handlers={}, ring=ring)
+            await server.start()
+            client = BusClient(path, retry_seconds=0.01, ring_name=ring.shm.name)
+            collector = _Collector()
+            task = asyncio.create_task(client.run(collector))
+            while not server.writers:
+                await asyncio.sleep(0.01)
+            for _ in range(3):
+                sim.step()
+                await server.broadcast_frame(sim.build_frame())
+                await asyncio.sleep(0.1)
+            client.running = False
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await server.close()
+            return collector.frames
+
+        try:
+            frames = asyncio.run(scenario())
+        finally:
+            ring.close()
+        self.assertEqual([f.seq for f in frames], [1, 2, 3])
+        self.assertEqual(json.loads(frames[-1].full())["assets"], json.loads(sim.build_frame().full())["assets"])
@@ -0,0 +1,158 @@
+import math
+import random
+import unittest
+from app.core.models import AssetStatus, EventType, IncidentIn, IncidentPhase, Location
+from app.services.conditions import RoadConditions, uses
+from app.services.coverage import Coverage
+from app.services.routing import RoadNetwork
+from app.services.simulator import Simulator
+from tests.test_coverage import _from_scratch, _grid
+
+def _dispatch(sim, unit_id, start, target):
+    unit = sim.assets[unit_id]
+    unit.current_node = start
+    unit.location = Location(lat=sim.road_network.nodes[start][0], lng=sim.road_network.nodes[start][1])
+    unit.path = []
+    lat, lng = sim.road_network.nodes[target]
+    event = sim.add_incident(IncidentIn(type=EventType.THEFT, location=Location(lat=lat, lng=lng)))
+    sim._dispatch_unit(unit, event, sim._path_to(unit, event))
+    return unit
+
+class TestRoadConditions(unittest.TestCase):
+    def test_routes_avoid_closed_roads(self):
+        conditions = RoadConditions(RoadNetwork())
+        path = conditions.route("SILK_BOARD", "SONY_WORLD")
+        u, v = path[1], path[2]
+        conditions.set_factor(u, v, math.inf)
+        detour = conditions.route("SILK_BOARD", "SONY_WORLD")
+        self.assertFalse(uses(detour, u, v))
+        self.assertEqual(detour[-1], "SONY_WORLD")
+        self.assertNotIn(v, conditions.open_neighbors(u))
+        conditions.set_factor(v, u, 1.0) # Either direction names the same road
+        self.assertEqual(conditions.route("SILK_BOARD", "SONY_WORLD"), path)
+        self.assertFalse(conditions.factors)
+
+    def test_rejects_unknown_roads(self):
+        conditions = RoadConditions(RoadNetwork())
+        with self.assertRaises(ValueError):
+            conditions.set_factor("SILK_BOARD", "SONY_WORLD", 2.0) # Not adjacent
+        with self.assertRaises(ValueError):
+            conditions.set_factor("SILK_BOARD", "MADIWALA_CHECKPOST", 0.0)
+
+    def test_only_units_on_the_road_are_rerouted(self):
+        sim = Simulator(seed=1)
+        through = _dispatch(sim, "PCR-1", "SILK_BOARD", "SONY_WORLD_NORTH")
+        elsewhere = _dispatch(sim, "PCR-2", "FORUM_MALL", "CHRIST_COLLEGE")
+        route = [through.current_node, *through.path]
+        u, v = route[2], route[3]
+        self.assertFalse(uses([elsewhere.current_node, *elsewhere.path], u, v))
+        kept = list(elsewhere.path)
+
+        self.assertEqual(sim.close_road(u, v), ["PCR-1"])
+        self.assertFalse(uses([through.current_node, *through.path], u, v))
+        self.assertEqual(through.path[0], route[1]) # Still heading for the same next node
+        self.assertEqual(through.path[-1], "SONY_WORLD_NORTH")
+        self.assertEqual(elsewhere.path, kept)
+        self.assertEqual(sim.reopen_road(u, v), []) # Reopening does not divert anyone
+
+    def test_slowdown_reroutes_and_released_units_are_forgotten(self):
+        sim = Simulator(seed=1)
+        unit = _dispatch(sim, "PCR-1", "SILK_BOARD", "SONY_WORLD_NORTH")
+        route = [unit.current_node, *unit.path]
+        u, v = route[1], route[2]
+        self.assertEqual(sim.set_road_factor(u, v, 20.0), ["PCR-1"])
+        sim._release(unit)
+        self.assertEqual(sim.conditions.users(u, v), set())
+        self.assertEqual(sim.set_road_factor(u, v, 40.0), [])
+
+    def test_cut_off_incident_stays_pending(self):
+        sim = Simulator(seed=1)
+        closed = [(u, v) for u, v in sim.road_network.edges if "SILK_BOARD" in (u, v)]
+        for u, v in closed:
+            sim.close_road(u, v)
+        for unit in sim.assets.values():
+            if unit.current_node == "SILK_BOARD":
+                _dispatch(sim, unit.asset_id, "FORUM_MALL", "FORUM_MALL")
+        lat, lng = sim.road_network.nodes["SILK_BOARD"]
+        event = sim.add_incident(IncidentIn(type=EventType.MEDICAL, location=Location(lat=lat, lng=lng)))
+        sim._assign_tasks()
+        self.assertEqual(event.phase, IncidentPhase.PENDING)
+        self.assertIsNone(event.dispatched_at)
+        self.assertEqual(sim.sla.query()["arrival"]["count"], 0)
+        self.assertIs(sim.dispatch_queue.peek(sim.events), event) # Retried next tick
+
+        sim.reopen_road(*closed[0])
+        sim._assign_tasks()
+        self.assertEqual(event.phase, IncidentPhase.EN_ROUTE)
+        self.assertTrue(sim.assets[event.assigned_asset_id].path)
+
+    def test_isolated_nearest_unit_is_passed_over(self):
+        sim = Simulator(seed=1)
+        isolated = sim.assets["PCR-1"]
+        for unit in sim.assets.values():
+            _dispatch(sim, unit.asset_id, "FORUM_MALL", "FORUM_MALL")
+            sim._release(unit)
+        _dispatch(sim, "PCR-1", "SONY_WORLD", "SONY_WORLD")
+        sim._release(isolated)
+        sim._update_asset_index()
+        walls = [(u, v) for u, v in sim.road_network.edges if "SONY_WORLD" in (u, v)]
+        for u, v in walls:
+            sim.close_road(u, v)
+        neighbor = next(n for n in sim.road_network.adj_list["SONY_WORLD"] if len(sim.road_network.adj_list[n]) > 1)
+        lat, lng = sim.road_network.nodes[neighbor]
+        event = sim.add_incident(IncidentIn(type=EventType.ASSAULT, location=Location(lat=lat, lng=lng)))
+        self.assertIs(sim._nearest_available(event), isolated)
+        sim._assign_tasks()
+        self.assertEqual(event.phase, IncidentPhase.EN_ROUTE)
+        self.assertNotEqual(event.assigned_asset_id, "PCR-1")
+
+        # Out of the pool until a road out reopens
+        sim._update_asset_index()
+        self.assertNotIn("PCR-1", sim.available_index.boxes)
+        sim.reopen_road(*walls[0])
+        sim._update_asset_index()
+        self.assertIn("PCR-1", sim.available_index.boxes)
+
+    def test_unit_cut_off_en_route_is_recalled(self):
+        sim = Simulator(seed=1)
+        unit = _dispatch(sim, "PCR-1", "SILK_BOARD", "SONY_WORLD_NORTH")
+        event = sim.events[unit.target_event_id]
+        head = unit.path[0]
+        for u, v in sim.road_network.edges:
+            if "SONY_WORLD_NORTH" in (u, v):
+                sim.close_road(u, v)
+        self.assertEqual(unit.status, AssetStatus.IDLE)
+        self.assertEqual(unit.path, [head]) # Finishes the road it is on
+        self.assertEqual(event.phase, IncidentPhase.PENDING)
+        self.assertIsNone(event.assigned_asset_id)
+        self.assertIs(sim.dispatch_queue.peek(sim.events), event)
+
+    def test_coverage_follows_road_changes(self):
+        graph = _grid(10)
+        conditions = RoadConditions(graph)
+        coverage = Coverage(graph, speed_mps=10.0, target_s=150.0, lengths=conditions.lengths)
+        rng = random.Random(2)
+        names = list(graph.nodes)
+        coverage.update({f"U{i}": (rng.choice(names), 0.0) for i in range(5)})
+        for _ in range(60):
+            u, v = rng.choice(graph.edges)
+            old, _ = conditions.set_factor(u, v, rng.choice([math.inf, 1.0, 0.5, 3.0]))
+            coverage.edge_changed(u, v, old)
+            expected = _from_scratch(coverage)
+            self.assertEqual(set(coverage.eta), set(expected))
+            for node, eta in expected.items():
+                self.assertAlmostEqual(coverage.eta[node], eta, places=6)
+
+    def test_patrols_do_not_enter_closed_roads(self):
+        sim = Simulator(seed=3)
+        for u, v in sim.road_network.edges:
+            if "SILK_BOARD" in (u, v):
+                sim.close_road(u, v)
+        for _ in range(400):
+            sim.step()
+            for asset in sim.assets.values():
+                if asset.status == AssetStatus.IDLE and asset.path:
+                    self.assertTrue(sim.conditions.is_open(asset.current_node, asset.path[0]))
+
+if __name__ == '__main__':
+    unittest.main()
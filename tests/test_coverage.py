@@ -0,0 +1,96 @@
+import heapq
+import math
+import random
+import unittest
+from app.core.models import AssetStatus
+from app.services.coverage import Coverage
+from app.services.routing import RoadNetwork
+from app.services.simulator import Simulator
+
+def _grid(n):
+    nodes = {f"{i}-{j}": (12.9 + i * 0.004, 77.6 + j * 0.004) for i in range(n) for j in range(n)}
+    edges = [(f"{i}-{j}", f"{i}-{j+1}") for i in range(n) for j in range(n - 1)]
+    edges += [(f"{i}-{j}", f"{i+1}-{j}") for i in range(n - 1) for j in range(n)]
+    return RoadNetwork(nodes, edges)
+
+def _from_scratch(coverage):
+    # Plain multi-source Dijkstra over the anchors the coverage holds
+    graph = coverage.road_network
+    eta = {}
+    heap = [(seconds, node) for node, seconds in coverage.anchors.values()]
+    heapq.heapify(heap)
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > coverage.target_s or d >= eta.get(node, math.inf):
+            continue
+        eta[node] = d
+        for neighbor in graph.adj_list[node]:
+            heapq.heappush(heap, (d + coverage.lengths[(node, neighbor)] / coverage.speed_mps, neighbor))
+    return eta
+
+class TestCoverage(unittest.TestCase):
+    def test_incremental_matches_recompute(self):
+        graph = _grid(12)
+        coverage = Coverage(graph, speed_mps=10.0, target_s=120.0, tolerance_s=5.0)
+        rng = random.Random(3)
+        names = list(graph.nodes)
+        units = {f"U{i}": (rng.choice(names), rng.uniform(0, 40)) for i in range(8)}
+        for step in range(200):
+            unit = rng.choice(list(units) + ["U-new"])
+            move = rng.random()
+            if move < 0.2:
+                units.pop(unit, None) # Dispatched
+            elif move < 0.5:
+                units[unit] = (rng.choice(names), rng.uniform(0, 40)) # Reached its anchor, picked the next
+            elif unit in units:
+                node, seconds = units[unit]
+                units[unit] = (node, max(0.0, seconds - rng.uniform(0, 12))) # Closing in
+            coverage.update(dict(units))
+            expected = _from_scratch(coverage)
+            self.assertEqual(set(coverage.eta), set(expected), step)
+            for node, eta in expected.items():
+                self.assertAlmostEqual(coverage.eta[node], eta, places=6)
+            self.assertEqual(coverage.gaps, set(names) - set(expected))
+            for node, unit in coverage.owner.items():
+                self.assertIn(unit, coverage.anchors)
+
+    def test_small_moves_are_not_propagated(self):
+        graph = _grid(4)
+        coverage = Coverage(graph, speed_mps=10.0, target_s=300.0, tolerance_s=5.0)
+        coverage.update({"U1": ("0-0", 20.0)})
+        settled = coverage.relaxed
+        coverage.update({"U1": ("0-0", 17.0)})
+        self.assertEqual(coverage.relaxed, settled)
+        self.assertEqual(coverage.eta["0-0"], 20.0) # Stale by less than the tolerance, never early
+        coverage.update({"U1": ("0-0", 12.0)})
+        self.assertEqual(coverage.eta["0-0"], 12.0)
+
+    def test_withdrawing_a_unit_opens_a_gap(self):
+        graph = _grid(6)
+        coverage = Coverage(graph, speed_mps=10.0, target_s=60.0)
+        coverage.update({"U1": ("0-0", 0.0), "U2": ("5-5", 0.0)})
+        self.assertEqual(coverage.owner["0-0"], "U1")
+        coverage.update({"U2": ("5-5", 0.0)})
+        self.assertIn("0-0", coverage.gaps)
+        self.assertNotIn("5-5", coverage.gaps)
+        self.assertEqual(set(coverage.owner.values()), {"U2"})
+
+    def test_simulator_publishes_coverage(self):
+        sim = Simulator(seed=5)
+        frame = sim.build_frame()
+        layer = frame.coverage
+        self.assertEqual(len(layer["covered"]) + len(layer["gaps"]), len(sim.road_network.nodes))
+        self.assertTrue(layer["covered"])
+        self.assertTrue(all(row[3] in sim.assets for row in layer["covered"]))
+
+        # With a short target, taking every unit off the board leaves only gaps
+        sim.coverage.target_s = 30.0
+        for asset in sim.assets.values():
+            asset.status = AssetStatus.OFF_DUTY
+        sim._update_asset_index()
+        layer = sim.build_frame().coverage
+        self.assertEqual(layer["covered"], [])
+        self.assertEqual(len(layer["gaps"]), len(sim.road_network.nodes))
+
+if __name__ == '__main__':
+    unittest.main()
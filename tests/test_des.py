@@ -0,0 +1,73 @@
+import unittest
+from app.core.models import AssetStatus, EventType, IncidentIn, Location
+from app.services import trace
+from app.services.des import ARRIVE, EventDrivenSimulator
+from app.services.schedule import EventQueue
+from app.services.simulator import Simulator
+
+class TestEventQueue(unittest.TestCase):
+    def test_pops_in_time_then_schedule_order(self):
+        q = EventQueue()
+        q.schedule(2.0, "b", 1)
+        q.schedule(1.0, "a", 1)
+        q.schedule(1.0, "a", 2)
+        self.assertEqual([q.pop_due(5.0)[2] for _ in range(2)], [1, 2])
+        self.assertIsNone(q.pop_due(1.5))
+        self.assertEqual(q.pop_due(2.0)[1], "b")
+
+    def test_reschedule_and_cancel_supersede(self):
+        q = EventQueue()
+        q.schedule(1.0, "arrive", "PCR-1")
+        q.schedule(3.0, "arrive", "PCR-1")
+        q.schedule(2.0, "arrive", "PCR-2")
+        q.cancel("arrive", "PCR-2")
+        self.assertEqual(len(q), 1)
+        self.assertIsNone(q.pop_due(2.5))
+        self.assertEqual(q.pop_due(3.0)[0], 3.0)
+        self.assertIsNone(q.peek_time())
+
+class TestEventDrivenSimulator(unittest.TestCase):
+    def test_seeded_runs_are_reproducible(self):
+        self.assertIsNone(trace.compare(EventDrivenSimulator(seed=3), EventDrivenSimulator(seed=3), 200))
+
+    def test_units_stay_on_their_legs(self):
+        sim = EventDrivenSimulator(seed=4)
+        for _ in range(50):
+            sim.step()
+        nodes = sim.road_network.nodes
+        for asset_id, leg in sim.legs.items():
+            asset = sim.assets[asset_id]
+            target = nodes[leg.to_node]
+            lo_lat, hi_lat = sorted((leg.from_lat, target[0]))
+            self.assertTrue(lo_lat - 1e-12 <= asset.location.lat <= hi_lat + 1e-12)
+            self.assertIn((ARRIVE, asset_id), sim.timers)
+
+    def test_response_time_matches_reference(self):
+        """A dispatched unit reaches the scene within a tick per hop of the reference engine"""
+        def ticks_to_scene(sim):
+            occupied = {a.current_node for a in sim.assets.values()}
+            node = next(n for n in sim.road_network.nodes if n not in occupied)
+            lat, lng = sim.road_network.nodes[node]
+            event = sim.add_incident(IncidentIn(type=EventType.ASSAULT, location=Location(lat=lat, lng=lng)))
+            for tick in range(1, 2000):
+                sim.step()
+                unit = next((a for a in sim.assets.values() if a.target_event_id == event.event_id), None)
+                if unit is not None and unit.status == AssetStatus.BUSY:
+                    return tick, unit.asset_id, node
+            self.fail("unit never arrived")
+
+        reference = Simulator(seed=9)
+        candidate = EventDrivenSimulator(seed=9)
+        start = {a.asset_id: a.current_node for a in reference.assets.values()}
+        ref_ticks, ref_unit, node = ticks_to_scene(reference)
+        des_ticks, des_unit, _ = ticks_to_scene(candidate)
+        self.assertEqual(ref_unit, des_unit)
+        hops = len(reference.road_network.get_path(start[ref_unit], node))
+        self.assertLessEqual(abs(ref_ticks - des_ticks), max(hops, 2) + 1)
+
+    def test_fast_forward_costs_decisions_not_ticks(self):
+        sim = EventDrivenSimulator(seed=5)
+        sim.run_for(3 * 3600)
+        self.assertEqual(sim.tick_count, 3 * 3600 * 2)
+        self.assertGreater(len(sim.events), 0)
+        self.assertLess(sim.decisions, sim.tick_count * len(sim.assets) / 4)
@@ -0,0 +1,79 @@
+import unittest
+from datetime import timedelta
+from app.core.models import AssetStatus, EventType, IncidentIn, IncidentPhase, Location
+from app.services.dispatch import DispatchQueue
+from app.services.simulator import Simulator
+
+def _incident(sim, node, event_type, severity, **kwargs):
+    lat, lng = sim.road_network.nodes[node]
+    return sim.add_incident(IncidentIn(type=event_type, severity=severity, location=Location(lat=lat, lng=lng), **kwargs))
+
+def _single_unit(sim, node):
+    """Leave one available unit, parked at `node`; everyone else is busy."""
+    units = list(sim.assets.values())
+    for other in units[1:]:
+        other.status = AssetStatus.BUSY
+    unit = units[0]
+    unit.current_node = node
+    unit.location = Location(lat=sim.road_network.nodes[node][0], lng=sim.road_network.nodes[node][1])
+    unit.path = []
+    sim._update_asset_index()
+    return unit
+
+class TestDispatchQueue(unittest.TestCase):
+    def test_orders_by_severity_type_and_age(self):
+        sim = Simulator(seed=1)
+        now = sim.clock.now()
+        minor = _incident(sim, "SILK_BOARD", EventType.THEFT, 1)
+        urgent = _incident(sim, "SILK_BOARD", EventType.ASSAULT, 10)
+        stale = _incident(sim, "SILK_BOARD", EventType.THEFT, 1, reported_at=now - timedelta(hours=1))
+        queue = DispatchQueue()
+        for event in (minor, urgent, stale):
+            queue.push(event)
+        order = []
+        while queue.peek(sim.events) is not None:
+            order.append(queue.peek(sim.events).event_id)
+            queue.pop()
+        self.assertEqual(order, [stale.event_id, urgent.event_id, minor.event_id])
+
+    def test_skips_incidents_no_longer_pending(self):
+        sim = Simulator(seed=1)
+        event = _incident(sim, "SILK_BOARD", EventType.THEFT, 3)
+        queue = DispatchQueue()
+        queue.push(event)
+        event.phase = IncidentPhase.DISPATCHED
+        self.assertIsNone(queue.peek(sim.events))
+
+class TestPriorityDispatch(unittest.TestCase):
+    def test_severe_incident_gets_the_last_unit(self):
+        sim = Simulator(seed=1, preempt_gain_m=None)
+        unit = _single_unit(sim, "SONY_WORLD")
+        minor = _incident(sim, "SILK_BOARD", EventType.THEFT, 1)
+        urgent = _incident(sim, "SILK_BOARD", EventType.ASSAULT, 10)
+        sim._assign_tasks()
+        self.assertEqual(unit.target_event_id, urgent.event_id)
+        self.assertEqual(minor.phase, IncidentPhase.PENDING)
+
+    def test_en_route_unit_diverted_to_more_urgent_call(self):
+        sim = Simulator(seed=1)
+        unit = _single_unit(sim, "SONY_WORLD")
+        minor = _incident(sim, "SILK_BOARD", EventType.THEFT, 1)
+        sim._assign_tasks()
+        self.assertEqual(minor.phase, IncidentPhase.EN_ROUTE)
+
+        urgent = _incident(sim, "SONY_WORLD", EventType.ASSAULT, 10)
+        sim._assign_tasks()
+        self.assertEqual(unit.target_event_id, urgent.event_id)
+        self.assertEqual(urgent.phase, IncidentPhase.ON_SCENE)
+        self.assertEqual(minor.phase, IncidentPhase.PENDING)
+        self.assertIsNone(minor.assigned_asset_id)
+
+    def test_preemption_can_be_disabled(self):
+        sim = Simulator(seed=1, preempt_gain_m=None)
+        unit = _single_unit(sim, "SONY_WORLD")
+        minor = _incident(sim, "SILK_BOARD", EventType.THEFT, 1)
+        sim._assign_tasks()
+        urgent = _incident(sim, "SONY_WORLD", EventType.ASSAULT, 10)
+        sim._assign_tasks()
+        self.assertEqual(unit.target_event_id, minor.event_id)
+        self.assertEqual(urgent.phase, IncidentPhase.PENDING)
@@ -0,0 +1,48 @@
+import json
+import time
+import unittest
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from app.core.entities import AssetState, EventState, Position, to_api_assets, to_api_events, to_json
+from app.core.models import Asset, AssetStatus, AssetType, EventStatus, EventType, IncidentPhase, Location
+
+class TestEntities(unittest.TestCase):
+    def setUp(self):
+        self.asset = AssetState("PCR-1", AssetType.PCR, Position(12.93, 77.62), AssetStatus.DISPATCHED,
+                                fatigue_level=0.25, last_ping=datetime(2025, 1, 1, 8, 0, 0, 500),
+                                current_node="SILK_BOARD", path=["A", "B"], target_event_id="EVT-1")
+        self.event = EventState("EVT-1", EventType.ACCIDENT, 7, Position(12.94, 77.61), EventStatus.ACTIVE,
+                                created_at=datetime(2025, 1, 1), phase=IncidentPhase.EN_ROUTE,
+                                assigned_asset_id="PCR-1")
+
+    def test_json_matches_the_api_models(self):
+        asset, = to_api_assets([self.asset])
+        event, = to_api_events([self.event])
+        self.assertIsInstance(asset, Asset)
+        self.assertEqual(asset.path, ["A", "B"])
+        self.assertEqual(event.phase, IncidentPhase.EN_ROUTE)
+        self.assertEqual(to_json(self.asset), json.dumps(jsonable_encoder(asset)))
+        self.assertEqual(to_json(self.event), json.dumps(jsonable_encoder(event)))
+
+    def test_slotted(self):
+        self.assertFalse(hasattr(self.asset, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.asset.node_id = "X" # No attributes added on the fly
+
+    def test_fingerprint_sees_in_place_edits(self):
+        before = self.asset.fingerprint()
+        self.asset.path.pop(0)
+        self.assertNotEqual(self.asset.fingerprint(), before)
+        before = self.event.fingerprint()
+        self.event.location.lat += 0.001
+        self.assertNotEqual(self.event.fingerprint(), before)
+
+    def test_timestamps_default_to_creation_time(self):
+        first = Asset(asset_id="A", type=AssetType.PCR, location=Location(lat=0, lng=0), status=AssetStatus.IDLE)
+        time.sleep(0.01)
+        second = Asset(asset_id="B", type=AssetType.PCR, location=Location(lat=0, lng=0), status=AssetStatus.IDLE)
+        self.assertLess(first.last_ping, second.last_ping)
+        self.assertIsNot(first.path, second.path)
+
+if __name__ == '__main__':
+    unittest.main()
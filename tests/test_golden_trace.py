@@ -0,0 +1,38 @@
+import os
+import unittest
+from app.services import trace
+from app.services.simulator import Simulator
+
+GOLDEN = os.path.join(os.path.dirname(__file__), "golden", "reference_seed7.json")
+
+class TestDeterminism(unittest.TestCase):
+    def test_same_seed_same_run(self):
+        """Two seeded simulators agree tick-for-tick"""
+        self.assertIsNone(trace.compare(Simulator(seed=3), Simulator(seed=3), 200))
+
+    def test_event_ids_unique_and_monotonic(self):
+        sim = Simulator(seed=5)
+        for _ in range(400):
+            sim.step()
+        ids = list(sim.events)
+        self.assertGreater(len(ids), 1)
+        self.assertEqual(ids, sorted(set(ids)))
+
+    def test_divergence_is_located(self):
+        """A behavioural change is reported at the first tick and field it shows up"""
+        candidate = Simulator(seed=3)
+        candidate.assets["PCR-2"].fatigue_level = 0.25
+        divergence = trace.compare(Simulator(seed=3), candidate, 10)
+        self.assertEqual(divergence.tick, 1)
+        self.assertEqual(divergence.field, "assets.PCR-2.fatigue")
+
+    def test_matches_golden_trace(self):
+        """The reference engine still reproduces the recorded golden run
+
+        Re-record with `python -m tools.golden_trace record` only for
+        intentional behaviour changes."""
+        golden = trace.load(GOLDEN)
+        self.assertIsNone(trace.check_golden(golden, lambda: Simulator(seed=golden["seed"])))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from app.core.models import IncidentIn
+from app.services.ingest import IngestQueue
+from app.services.simulator import Simulator
+
+INCIDENT = {"type": "THEFT", "severity": 4, "location": {"lat": 12.9360, "lng": 77.6270}}
+
+class TestIngestQueue(unittest.TestCase):
+    def test_bulk_validation(self):
+        """Invalid payloads are reported per index, valid ones are queued"""
+        queue = IngestQueue()
+        result = queue.submit_batch([INCIDENT, {"type": "UFO"}, dict(INCIDENT, severity=11)])
+        self.assertEqual(result["accepted"], 1)
+        self.assertEqual([err["index"] for err in result["rejected"]], [1, 2])
+        self.assertEqual(queue.stats()["queue_depth"], 1)
+
+    def test_overflow_is_rejected(self):
+        """A full queue rejects instead of blocking"""
+        queue = IngestQueue(maxsize=2)
+        result = queue.submit_batch([INCIDENT] * 3)
+        self.assertEqual(result["accepted"], 2)
+        self.assertEqual(result["rejected"][0]["reason"], "queue_full")
+        self.assertEqual(queue.stats()["dropped"], 1)
+
+    def test_duplicate_ids_are_rejected(self):
+        """A caller-supplied event_id is accepted once, never overwriting the live event"""
+        queue = IngestQueue()
+        result = queue.submit_batch([dict(INCIDENT, event_id="CAD-1"), dict(INCIDENT, event_id="CAD-1"), INCIDENT])
+        self.assertEqual(result["accepted"], 2)
+        self.assertEqual(result["rejected"], [{"index": 1, "reason": "duplicate"}])
+
+        sim = Simulator()
+        event = sim.add_incident(IncidentIn(**dict(INCIDENT, event_id="CAD-2")))
+        event.assigned_asset_id = "PCR-1"
+        with self.assertRaises(ValueError):
+            sim.add_incident(IncidentIn(**dict(INCIDENT, event_id="CAD-2", severity=9)))
+        self.assertIs(sim.events["CAD-2"], event)
+        # Duplicates reaching the tick from another queue are dropped there
+        sim.ingest_queue.submit_batch([dict(INCIDENT, event_id="CAD-2")])
+        sim._ingest_events()
+        self.assertEqual(sim.events["CAD-2"].assigned_asset_id, "PCR-1")
+        self.assertEqual(sim.ingest_queue.rejected, 1)
+
+    def test_tick_drains_in_batches(self):
+        """The simulator materializes at most batch_size incidents per tick"""
+        sim = Simulator()
+        sim.ingest_queue = IngestQueue(batch_size=2)
+        sim.ingest_queue.submit_batch([INCIDENT] * 3)
+        sim._ingest_events()
+        self.assertEqual(len(sim.events), 2)
+        self.assertEqual(sim.events["EVT-IN-1"].node_id, "SONY_WORLD")
+        sim._ingest_events()
+        self.assertEqual(len(sim.events), 3)
+
+if __name__ == '__main__':
+    unittest.main()
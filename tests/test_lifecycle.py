@@ -0,0 +1,60 @@
+import unittest
+from unittest import mock
+from app.core.models import AssetStatus, EventStatus, EventType, IncidentIn, IncidentPhase, Location
+from app.services import lifecycle
+from app.services.des import EventDrivenSimulator
+from app.services.simulator import Simulator
+
+FAST = {t: 0.1 for t in EventType} # Six-second jobs
+
+class TestLifecycle(unittest.TestCase):
+    def test_illegal_transition_rejected(self):
+        sim = Simulator(seed=1)
+        event = sim.add_incident(IncidentIn(type=EventType.THEFT, location=Location(lat=12.93, lng=77.62)))
+        with self.assertRaises(ValueError):
+            lifecycle.transition(event, IncidentPhase.ON_SCENE)
+
+    def test_service_time_grows_with_severity(self):
+        sim = Simulator(seed=1)
+        event = sim.add_incident(IncidentIn(type=EventType.ACCIDENT, location=Location(lat=12.93, lng=77.62)))
+        def mean(severity):
+            event.severity = severity
+            return sum(lifecycle.on_scene_seconds(sim.rng, event) for _ in range(500)) / 500
+        self.assertGreater(mean(10), 1.5 * mean(1))
+
+    @mock.patch.dict(lifecycle.ON_SCENE_MINUTES, FAST)
+    @mock.patch.object(lifecycle, "CLEARING_MINUTES", 0.1)
+    def test_incident_resolves_and_unit_returns_to_patrol(self):
+        sim = Simulator(seed=2)
+        unit = sim.assets["PCR-1"]
+        lat, lng = sim.road_network.nodes[unit.current_node]
+        event = sim.add_incident(IncidentIn(type=EventType.THEFT, location=Location(lat=lat, lng=lng)))
+        phases = []
+        for _ in range(200):
+            sim.step()
+            if not phases or phases[-1] != event.phase:
+                phases.append(event.phase)
+            if event.phase == IncidentPhase.RESOLVED:
+                break
+        self.assertEqual(phases[-3:], [IncidentPhase.ON_SCENE, IncidentPhase.CLEARING, IncidentPhase.RESOLVED])
+        self.assertEqual(event.status, EventStatus.RESOLVED)
+        self.assertIsNotNone(event.resolved_at)
+        responder = sim.assets[event.assigned_asset_id]
+        self.assertEqual(responder.status, AssetStatus.IDLE)
+        self.assertIsNone(responder.target_event_id)
+
+        for _ in range(int(lifecycle.RESOLVED_RETENTION_SECONDS / sim.tick_seconds) + 1):
+            sim.step()
+        self.assertNotIn(event.event_id, sim.events)
+        self.assertNotIn(event.event_id, sim.event_index)
+
+    def test_units_cycle_through_incidents_over_a_long_run(self):
+        sim = EventDrivenSimulator(seed=3)
+        sim.run_for(6 * 3600)
+        generated = max(int(e[4:]) for e in sim.events if e.startswith("EVT-0"))
+        purged = generated - sum(e.startswith("EVT-0") for e in sim.events)
+        self.assertGreater(purged, 3 * len(sim.assets))
+        # Each unit holds at most one open incident
+        in_progress = [e for e in sim.events.values() if e.phase not in (IncidentPhase.PENDING, IncidentPhase.RESOLVED)]
+        self.assertLessEqual(len(in_progress), len(sim.assets))
+        self.assertEqual(len({e.assigned_asset_id for e in in_progress}), len(in_progress))
@@ -0,0 +1,39 @@
+import io
+import json
+import logging
+import queue
+import unittest
+from app.core.log import DroppingQueueHandler, RateLimitFilter, configure_logging, get_logger, stop_logging
+
+class TestStructuredLogging(unittest.TestCase):
+    def tearDown(self):
+        stop_logging()
+
+    def test_json_lines_from_background_thread(self):
+        stream = io.StringIO()
+        configure_logging(level="DEBUG", stream=stream)
+        get_logger("dispatch").debug("unit dispatched", extra={"fields": {"asset_id": "PCR-1"}})
+        stop_logging()
+        entry = json.loads(stream.getvalue().splitlines()[0])
+        self.assertEqual(entry["logger"], "vos.dispatch")
+        self.assertEqual(entry["asset_id"], "PCR-1")
+
+    def test_trace_disabled_at_info(self):
+        stream = io.StringIO()
+        configure_logging(level="INFO", stream=stream)
+        self.assertFalse(get_logger("events").isEnabledFor(logging.DEBUG))
+
+    def test_rate_limit(self):
+        limiter = RateLimitFilter(per_second=0.001, burst=2)
+        record = logging.makeLogRecord({})
+        self.assertEqual([limiter.filter(record) for _ in range(4)], [True, True, False, False])
+        self.assertEqual(limiter.suppressed, 2)
+
+    def test_full_queue_drops(self):
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+        for _ in range(3):
+            handler.handle(logging.makeLogRecord({"msg": "x"}))
+        self.assertEqual(handler.dropped, 2)
+
+if __name__ == '__main__':
+    unittest.main()
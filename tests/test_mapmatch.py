@@ -0,0 +1,72 @@
+import random
+import unittest
+from app.core.models import GpsPing, Location
+from app.services.mapmatch import HMMMapMatcher
+from app.services.routing import get_road_network
+from app.services.simulator import Simulator
+from app.services.spatial import GridIndex
+
+def _along(u, v, frac, offset=0.0):
+    """Point `frac` of the way from node u to v, shifted `offset` degrees east."""
+    graph = get_road_network()
+    (lat1, lng1), (lat2, lng2) = graph.nodes[u], graph.nodes[v]
+    return lat1 + (lat2 - lat1) * frac, lng1 + (lng2 - lng1) * frac + offset
+
+class TestGridIndex(unittest.TestCase):
+    def test_nearest_matches_brute_force(self):
+        """Ring search returns the same point as a full scan"""
+        rng = random.Random(7)
+        points = {i: (rng.uniform(12.9, 13.0), rng.uniform(77.5, 77.7)) for i in range(500)}
+        index = GridIndex(cell_deg=0.005)
+        for key, (lat, lng) in points.items():
+            index.insert_point(key, lat, lng)
+        for _ in range(50):
+            lat, lng = rng.uniform(12.9, 13.0), rng.uniform(77.5, 77.7)
+            expected = min(points, key=lambda k: (points[k][0] - lat) ** 2 + (points[k][1] - lng) ** 2)
+            self.assertEqual(index.nearest(lat, lng), expected)
+
+    def test_move_and_remove(self):
+        """Moving a point updates bbox queries; removed points disappear"""
+        index = GridIndex()
+        index.insert_point("A", 12.93, 77.62)
+        index.insert_point("A", 12.95, 77.64)
+        self.assertEqual(index.query_radius(12.93, 77.62, 0.001), set())
+        self.assertEqual(index.query_radius(12.95, 77.64, 0.001), {"A"})
+        index.remove("A")
+        self.assertEqual(len(index), 0)
+
+class TestHMMMapMatcher(unittest.TestCase):
+    def test_track_follows_road(self):
+        """Noisy pings along 100ft Road match the SONY_WORLD-OASIS_MALL edge"""
+        matcher = HMMMapMatcher(get_road_network())
+        pings = [GpsPing(asset_id="U1", lat=lat, lng=lng, timestamp=i)
+                 for i, (lat, lng) in enumerate(_along("SONY_WORLD", "OASIS_MALL", f, 0.00008)
+                                                for f in (0.2, 0.4, 0.6, 0.8))]
+        matches = matcher.match_batch(list(reversed(pings)))
+        self.assertEqual([m.timestamp for m in matches], [0, 1, 2, 3])
+        for match in matches:
+            self.assertEqual(set(match.edge), {"SONY_WORLD", "OASIS_MALL"})
+
+    def test_off_network_ping(self):
+        """Pings far from any road are passed through unmatched"""
+        matcher = HMMMapMatcher(get_road_network())
+        match = matcher.match_batch([GpsPing(asset_id="U1", lat=13.5, lng=78.0)])[0]
+        self.assertIsNone(match.edge)
+        self.assertEqual((match.lat, match.lng), (13.5, 78.0))
+
+class TestTelemetryIngest(unittest.TestCase):
+    def test_pings_drive_live_assets(self):
+        """Pinged units are created, snapped to the road and not moved by the simulator"""
+        sim = Simulator()
+        lat, lng = _along("SONY_WORLD", "OASIS_MALL", 0.9, 0.00005)
+        sim.telemetry_queue.submit_batch([{"asset_id": "GPS-1", "lat": lat, "lng": lng}])
+        sim._ingest_telemetry()
+        asset = sim.assets["GPS-1"]
+        self.assertTrue(asset.telemetry)
+        self.assertEqual(asset.current_node, "OASIS_MALL")
+        before = (asset.location.lat, asset.location.lng)
+        sim._move_assets()
+        self.assertEqual((asset.location.lat, asset.location.lng), before)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from app.core.metrics import Registry
+
+class TestMetrics(unittest.TestCase):
+    def test_prometheus_exposition(self):
+        """Counters, callback gauges and histograms render in text format"""
+        registry = Registry()
+        counter = registry.counter("jobs", "Jobs done.", ("kind",))
+        gauge = registry.gauge("depth", "Queue depth.")
+        hist = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        counter.labels("a").inc(2)
+        gauge.set_function(lambda: 7)
+        for value in (0.05, 0.5, 5.0):
+            hist.observe(value)
+
+        text = registry.render()
+        self.assertIn('jobs_total{kind="a"} 2.0', text)
+        self.assertIn("depth 7.0", text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 2', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("latency_seconds_count 3", text)
+
+    def test_label_arity(self):
+        registry = Registry()
+        counter = registry.counter("jobs", "Jobs done.", ("kind",))
+        with self.assertRaises(ValueError):
+            counter.labels("a", "b")
+        with self.assertRaises(ValueError):
+            registry.counter("jobs", "Again.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import math
+import unittest
+
+from app.core.models import AssetStatus
+from app.services.broadcast import ConnectionManager, Subscription
+from app.services.bus import FrameMirror, encode_frame
+from app.services.des import EventDrivenSimulator
+from app.services.motion import MAX_HINT_NODES, MotionTracker, position_at
+from app.services.simulator import SPEED, Simulator
+
+class _Socket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, message: str):
+        self.sent.append(message)
+
+class _Client:
+    """What a dashboard keeps: last known units and their hints."""
+
+    def __init__(self):
+        self.positions = {}
+        self.hints = {}
+
+    def apply(self, message: dict):
+        if message["type"] == "keyframe":
+            self.positions.clear()
+            self.hints.clear()
+        for asset in message.get("assets", []):
+            self.positions[asset["asset_id"]] = (asset["location"]["lat"], asset["location"]["lng"])
+            self.hints.pop(asset["asset_id"], None)
+        for asset_id in message.get("removed_assets", []):
+            self.positions.pop(asset_id, None)
+            self.hints.pop(asset_id, None)
+        self.hints.update(message.get("motion", {}))
+
+    def position(self, asset_id: str, sim_time: float):
+        hint = self.hints.get(asset_id)
+        return position_at(hint, sim_time) if hint else self.positions[asset_id]
+
+def _run(sim: Simulator, ticks: int):
+    """Serve a full-state and a motion subscriber; returns both sockets and the worst extrapolation error."""
+    manager = ConnectionManager()
+    full, motion = _Socket(), _Socket()
+    manager.active_connections += [full, motion]
+    manager.subscribe(full, Subscription.from_message({"layers": ["assets", "events"]}))
+    manager.subscribe(motion, Subscription.from_message({"motion": True, "layers": ["assets", "events"]}))
+    client = _Client()
+    worst = 0.0
+
+    async def drive():
+        nonlocal worst
+        for tick in range(ticks):
+            sim.step()
+            frame = sim.build_frame()
+            seen = len(motion.sent)
+            await manager.broadcast_frame(frame, now=tick * sim.tick_seconds)
+            for message in motion.sent[seen:]:
+                client.apply(json.loads(message))
+            for asset in sim.assets.values():
+                lat, lng = client.position(asset.asset_id, frame.sim_time)
+                worst = max(worst, math.hypot(lat - asset.location.lat, lng - asset.location.lng))
+
+    asyncio.run(drive())
+    return full, motion, worst
+
+class TestMotionHints(unittest.TestCase):
+    def test_clients_track_units_from_far_fewer_bytes(self):
+        full, motion, worst = _run(Simulator(seed=7), 600)
+        # Off by at most the last node snap of the per-tick movement
+        self.assertLessEqual(worst, SPEED + 1e-9)
+        self.assertLess(len(motion.sent), len(full.sent) / 3)
+        self.assertLess(sum(map(len, motion.sent)), sum(map(len, full.sent)) / 3)
+
+    def test_event_driven_hints_are_exact(self):
+        _, _, worst = _run(EventDrivenSimulator(seed=7), 400)
+        self.assertLess(worst, 1e-6) # Centimetres, from the rounding of the etas
+
+    def test_hint_is_reissued_only_when_it_stops_holding(self):
+        sim = Simulator(seed=3)
+        tracker = MotionTracker()
+        unit = sim.assets["PCR-1"]
+        unit.path = list(sim.road_network.adj_list[unit.current_node][:1]) * (MAX_HINT_NODES + 2)
+        self.assertEqual(tracker.update(sim.assets.values(), sim._motion_hint), set(sim.assets))
+        self.assertEqual(tracker.update(sim.assets.values(), sim._motion_hint), set())
+        unit.path.pop(0) # Progress along the hinted line
+        self.assertEqual(tracker.update(sim.assets.values(), sim._motion_hint), set())
+        del unit.path[:MAX_HINT_NODES - 1] # Past the last hinted node
+        self.assertEqual(tracker.update(sim.assets.values(), sim._motion_hint), {"PCR-1"})
+        unit.path = list(unit.path) # Re-planned
+        self.assertEqual(tracker.update(sim.assets.values(), sim._motion_hint), {"PCR-1"})
+        unit.status = AssetStatus.OFF_DUTY
+        del sim.assets["PCR-2"]
+        self.assertEqual(tracker.update(sim.assets.values(), sim._motion_hint), {"PCR-1", "PCR-2"})
+        self.assertNotIn("PCR-2", tracker.hints)
+
+    def test_subscription_and_mirror(self):
+        with self.assertRaises(ValueError):
+            Subscription.from_message({"motion": True, "format": "binary"})
+        with self.assertRaises(ValueError):
+            Subscription.from_message({"motion": True, "keyframe_s": 0})
+        sim = Simulator(seed=5)
+        mirror = FrameMirror()
+        packets = []
+        for _ in range(4):
+            sim.step()
+            packets.append(encode_frame(sim.build_frame(), keyframe=True))
+        self.assertIsNone(mirror.apply(packets[0]).changes)
+        self.assertIsNotNone(mirror.apply(packets[1]).changes)
+        frame = mirror.apply(packets[3]) # Missed one: subscribers get a keyframe instead
+        self.assertIsNone(frame.changes)
+        self.assertEqual(frame.motion, sim.motion.hints)
+        self.assertEqual(frame.sim_time, sim.sim_time)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import unittest
+from app.core.models import AssetStatus, EventType, IncidentIn, Location
+from app.core.utils import equirectangular_m
+from app.services import query
+from app.services.simulator import Simulator
+
+class TestQuery(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=3)
+        self.silk = self.sim.road_network.nodes["SILK_BOARD"]
+        self.sony = self.sim.road_network.nodes["SONY_WORLD"]
+        for i, asset in enumerate(self.sim.assets.values()):
+            lat, lng = self.silk if i % 2 else self.sony
+            asset.location = Location(lat=lat + i * 1e-5, lng=lng)
+        self.sim.add_incident(IncidentIn(type=EventType.THEFT, location=Location(lat=self.silk[0], lng=self.silk[1])))
+        self.sim.add_incident(IncidentIn(type=EventType.MEDICAL, location=Location(lat=self.sony[0], lng=self.sony[1])))
+        self.sim._update_asset_index()
+        self.frame = self.sim.build_frame()
+
+    def test_assets_near_matches_brute_force(self):
+        lat, lng = self.silk
+        page = query.assets_near(self.frame, lat, lng, 300.0, limit=query.MAX_LIMIT)
+        expected = sorted(a.asset_id for a in self.sim.assets.values()
+                          if equirectangular_m((lat, lng), (a.location.lat, a.location.lng)) <= 300.0)
+        self.assertTrue(expected)
+        self.assertEqual(sorted(item["asset_id"] for item in page["items"]), expected)
+        distances = [item["distance_m"] for item in page["items"]]
+        self.assertEqual(distances, sorted(distances))
+        self.assertIsNone(page["next_offset"])
+
+    def test_pagination_and_fields(self):
+        lat, lng = self.silk
+        first = query.assets_near(self.frame, lat, lng, 300.0, fields=["asset_id"], limit=2)
+        self.assertEqual(first["next_offset"], 2)
+        self.assertEqual(set(first["items"][0]), {"asset_id", "distance_m"})
+        rest = query.assets_near(self.frame, lat, lng, 300.0, fields=["asset_id"], offset=2, limit=query.MAX_LIMIT)
+        ids = [item["asset_id"] for item in first["items"] + rest["items"]]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), first["total"])
+
+    def test_status_filter(self):
+        busy = self.sim.assets["PCR-1"]
+        busy.status = AssetStatus.BUSY
+        frame = self.sim.build_frame()
+        lat, lng = busy.location.lat, busy.location.lng
+        page = query.assets_near(frame, lat, lng, 300.0, status="BUSY", limit=query.MAX_LIMIT)
+        self.assertEqual([item["asset_id"] for item in page["items"]], ["PCR-1"])
+
+    def test_events_within_polygon(self):
+        lat, lng = self.silk
+        d = 0.002
+        triangle = query.parse_polygon(f"{lat - d},{lng - d};{lat - d},{lng + d};{lat + d},{lng}")
+        page = query.events_within(self.frame, triangle)
+        self.assertEqual(page["total"], 1)
+        self.assertEqual(page["items"][0]["type"], EventType.THEFT.value)
+        phase = page["items"][0]["phase"]
+        self.assertEqual(query.events_within(self.frame, triangle, status=phase)["total"], 1)
+        self.assertEqual(query.events_within(self.frame, triangle, status="NO_SUCH_STATE")["total"], 0)
+
+    def test_bad_polygons_are_rejected(self):
+        for text in ("1,2;3,4", "1,2;3,4;5", "1,2;3,4;95,0", "a,b;c,d;e,f"):
+            with self.assertRaises(ValueError):
+                query.parse_polygon(text)
+
+    def test_get_asset(self):
+        asset = query.get_asset(self.frame, "PCR-1", ["asset_id", "status"])
+        self.assertEqual(asset, {"asset_id": "PCR-1", "status": json.loads(self.frame.assets["PCR-1"])["status"]})
+        self.assertIsNone(query.get_asset(self.frame, "PCR-999"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from datetime import timedelta
+from app.core.models import AssetStatus, EventType, IncidentIn, Location
+from app.services import roster
+from app.services.des import EventDrivenSimulator
+from app.services.simulator import SHIFT_END, Simulator
+
+def _steps(sim, seconds):
+    for _ in range(int(seconds / sim.tick_seconds) + 1):
+        sim.step()
+
+class TestRoster(unittest.TestCase):
+    def test_accrues_by_duty(self):
+        sim = Simulator(seed=1)
+        patrol, on_call, resting = (sim.assets[f"PCR-{i}"] for i in (1, 2, 3))
+        for unit in sim.assets.values():
+            unit.fatigue_level = 0.5
+            unit.time_worked_minutes = 0.0
+        on_call.status = AssetStatus.BUSY
+        resting.status = AssetStatus.OFF_DUTY
+        sim.roster.rebuild(sim.assets)
+        sim.roster.accrue(3600.0)
+        sim.roster.write_back()
+        self.assertAlmostEqual(patrol.fatigue_level, 0.5 + roster.FATIGUE_PER_HOUR[roster.PATROL])
+        self.assertAlmostEqual(on_call.fatigue_level, 0.5 + roster.FATIGUE_PER_HOUR[roster.ON_CALL])
+        self.assertLess(resting.fatigue_level, 0.5)
+        self.assertAlmostEqual(patrol.time_worked_minutes, 60.0)
+        self.assertEqual(resting.time_worked_minutes, 0.0)
+
+    def test_shift_end_hands_over_to_a_fresh_crew(self):
+        sim = Simulator(seed=1)
+        unit = sim.assets["PCR-1"]
+        unit.shift_start = sim.clock.now() - timedelta(seconds=roster.SHIFT_SECONDS)
+        sim.step()
+        self.assertEqual(unit.status, AssetStatus.OFF_DUTY)
+        self.assertNotIn(unit.asset_id, sim.available_index)
+
+        _steps(sim, roster.HANDOVER_SECONDS)
+        self.assertNotEqual(unit.status, AssetStatus.OFF_DUTY)
+        self.assertLess(unit.time_worked_minutes, 1.0)
+        self.assertGreater(unit.shift_start, sim.clock.now() - timedelta(seconds=2))
+
+    def test_shift_end_waits_for_the_current_call(self):
+        sim = Simulator(seed=1)
+        unit = sim.assets["PCR-1"]
+        unit.status = AssetStatus.BUSY
+        unit.shift_start = sim.clock.now() - timedelta(seconds=roster.SHIFT_SECONDS)
+        sim.step()
+        self.assertEqual(unit.status, AssetStatus.BUSY)
+        sim._release(unit)
+        self.assertEqual(unit.status, AssetStatus.OFF_DUTY)
+
+    def test_over_fatigued_unit_is_not_dispatched_and_is_relieved(self):
+        sim = Simulator(seed=1)
+        unit = sim.assets["PCR-1"]
+        unit.fatigue_level = roster.FATIGUE_LIMIT
+        lat, lng = sim.road_network.nodes[unit.current_node]
+        event = sim.add_incident(IncidentIn(type=EventType.ASSAULT, severity=10, location=Location(lat=lat, lng=lng)))
+        sim.step()
+        self.assertNotEqual(event.assigned_asset_id, unit.asset_id)
+        self.assertEqual(unit.status, AssetStatus.OFF_DUTY)
+
+        _steps(sim, roster.HANDOVER_SECONDS)
+        self.assertEqual(unit.fatigue_level, sim.roster.fatigue[sim.roster.rows[unit.asset_id]])
+        self.assertLess(unit.fatigue_level, 0.01)
+        self.assertNotIn(unit.asset_id, sim.roster.fatigued)
+
+    def test_every_crew_is_relieved_over_a_day(self):
+        sim = EventDrivenSimulator(seed=4)
+        start = sim.clock.now()
+        sim.run_for(10 * 3600)
+        for unit in sim.assets.values():
+            if unit.asset_id in sim._leave_due:
+                # Still finishing the call its shift ended on
+                self.assertIn(unit.status, (AssetStatus.DISPATCHED, AssetStatus.BUSY))
+            elif sim._off_duty.get(unit.asset_id) == SHIFT_END:
+                self.assertEqual(unit.status, AssetStatus.OFF_DUTY) # Handing over
+            else:
+                self.assertGreater(unit.shift_start, start, unit.asset_id)
+                self.assertLess(unit.time_worked_minutes, 10 * 60)
+
+if __name__ == '__main__':
+    unittest.main()
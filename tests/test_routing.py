@@ -0,0 +1,26 @@
+import unittest
+from app.services.routing import RoadNetwork, get_road_network
+from app.services.simulator import Simulator
+
+class TestSharedRoadNetwork(unittest.TestCase):
+    def test_simulators_share_graph(self):
+        """Simulators reuse the lazily built process-wide graph"""
+        self.assertIs(Simulator().road_network, get_road_network())
+        self.assertIs(Simulator().road_network, Simulator().road_network)
+
+    def test_graph_is_read_only(self):
+        """Shared graph cannot be mutated in place"""
+        graph = get_road_network()
+        with self.assertRaises(TypeError):
+            graph.nodes["NEW"] = (0.0, 0.0)
+        with self.assertRaises(TypeError):
+            graph.adj_list["SONY_WORLD"] = ()
+
+    def test_custom_graph(self):
+        """RoadNetwork accepts its own nodes and edges"""
+        graph = RoadNetwork({"A": (0.0, 0.0), "B": (0.0, 1.0)}, [("A", "B")])
+        self.assertEqual(graph.adj_list["A"], ("B",))
+        self.assertEqual(graph.to_dict()["edges"], {"A": ["B"], "B": ["A"]})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+
+from app.services.simulator import Simulator
+from app.services.sla import RELATIVE_ACCURACY, LatencySketch, SlaStats, merged
+from app.services.spatial import hex_cell, hex_center
+
+START = datetime(2025, 1, 1, 8, 0, 0)
+
+def _stats(seed: int, n: int = 400, stats: Optional[SlaStats] = None) -> SlaStats:
+    rng = random.Random(seed)
+    stats = stats or SlaStats()
+    for i in range(n):
+        at = START + timedelta(seconds=i * 30)
+        event_type = rng.choice(["MEDICAL", "THEFT"])
+        cell = rng.choice(["0:0", "1:0", "0:1"])
+        stats.record_dispatch(event_type, cell, at, rng.expovariate(1 / 60), late=rng.random() < 0.1)
+        stats.record_arrival(event_type, cell, at, rng.expovariate(1 / 300))
+    return stats
+
+class TestLatencySketch(unittest.TestCase):
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(3)
+        values = [rng.lognormvariate(5, 1) for _ in range(20000)]
+        sketch = LatencySketch()
+        for v in values:
+            sketch.add(v)
+        for q in (0.5, 0.9, 0.99):
+            exact = float(np.quantile(values, q, method="inverted_cdf"))
+            self.assertLessEqual(abs(sketch.quantile(q) - exact), exact * RELATIVE_ACCURACY * 1.01)
+        self.assertEqual(sketch.count, len(values))
+        self.assertIsNone(LatencySketch().quantile(0.5))
+
+    def test_merge_is_exact(self):
+        rng = random.Random(4)
+        values = [rng.expovariate(1 / 120) for _ in range(5000)] + [0.0] * 10
+        whole, left, right = LatencySketch(), LatencySketch(), LatencySketch()
+        for i, v in enumerate(values):
+            whole.add(v)
+            (left if i % 2 else right).add(v)
+        left.merge(right)
+        self.assertEqual(left.buckets, whole.buckets)
+        self.assertEqual(left.summary(), whole.summary())
+
+class TestSlaStats(unittest.TestCase):
+    def test_rolling_windows_and_groups(self):
+        stats = SlaStats(window_s=600, keep=4)
+        for minute in range(0, 60, 5):
+            stats.record_dispatch("MEDICAL", "0:0", START + timedelta(minutes=minute), minute)
+        # Six 10 minute windows were touched, the oldest two have been dropped
+        self.assertEqual(len(stats.windows), 4)
+        self.assertEqual(stats.query()["dispatch"]["count"], 8)
+        last = stats.query(minutes=10)
+        self.assertEqual(last["dispatch"]["count"], 2)
+        self.assertEqual(last["dispatch"]["max"], 55.0)
+        windows = stats.query(by="window")["groups"]
+        self.assertEqual([g["dispatch"]["count"] for g in windows], [2, 2, 2, 2])
+        with self.assertRaises(ValueError):
+            stats.query(by="severity")
+
+    def test_shards_merge_like_one_stream(self):
+        a, b = _stats(1), _stats(2)
+        both = _stats(2, stats=_stats(1))
+        # Shards can also come over the wire as exports
+        combined = merged([a, SlaStats.from_export(b.export())])
+        self.assertEqual(combined.query(by="type"), both.query(by="type"))
+        self.assertEqual(combined.query(cell="1:0", event_type="THEFT"), both.query(cell="1:0", event_type="THEFT"))
+        self.assertEqual(combined.query()["dispatch"]["count"], 800)
+
+    def test_simulator_records_dispatch_and_arrival(self):
+        sim = Simulator(seed=7)
+        for _ in range(1200):
+            sim.step()
+        dispatched = [e for e in sim.events.values() if e.dispatched_at is not None]
+        arrived = [e for e in dispatched if e.arrived_at is not None]
+        self.assertTrue(arrived)
+        for e in arrived:
+            self.assertLessEqual(e.created_at, e.dispatched_at)
+            self.assertLessEqual(e.dispatched_at, e.arrived_at)
+        kpis = sim.sla.query(by="cell")
+        self.assertEqual(kpis["dispatch"]["count"], len(dispatched))
+        self.assertEqual(kpis["arrival"]["count"], len(arrived))
+        self.assertEqual(sum(g["arrival"]["count"] for g in kpis["groups"]), len(arrived))
+        self.assertIs(sim.build_frame().sla, sim.sla)
+
+    def test_timezone_aware_report_times(self):
+        sim = Simulator(seed=7)
+        lat, lng = sim.road_network.nodes["SONY_WORLD"]
+        result = sim.ingest_queue.submit_batch([{"type": "MEDICAL", "location": {"lat": lat, "lng": lng},
+                                                 "event_id": "EVT-TZ", "reported_at": "2025-01-01T02:30:00Z"}])
+        self.assertEqual(result["accepted"], 1)
+        for _ in range(600):
+            sim.step()
+            if "EVT-TZ" in sim.events and sim.events["EVT-TZ"].arrived_at is not None:
+                break
+        event = sim.events["EVT-TZ"]
+        self.assertIsNone(event.created_at.tzinfo)
+        self.assertEqual(event.created_at, datetime(2025, 1, 1, 2, 30, tzinfo=timezone.utc).astimezone().replace(tzinfo=None))
+        self.assertIsNotNone(event.arrived_at)
+        self.assertGreaterEqual(sim.sla.query()["arrival"]["count"], 1)
+
+    def test_hex_cells(self):
+        rng = random.Random(5)
+        for _ in range(1000):
+            lat, lng = rng.uniform(12.9, 13.0), rng.uniform(77.6, 77.7)
+            cell = hex_cell(lat, lng)
+            center = hex_center(cell)
+            self.assertEqual(hex_cell(*center), cell)
+            self.assertLessEqual(np.hypot(center[0] - lat, center[1] - lng), 0.005 + 1e-12)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from app.core.models import EventType, IncidentIn, Location
+from app.services.simulator import Simulator
+from app.services.snapshot import SnapshotStore
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=2)
+        lat, lng = self.sim.road_network.nodes["SILK_BOARD"]
+        self.event = self.sim.add_incident(IncidentIn(type=EventType.THEFT, location=Location(lat=lat, lng=lng)))
+
+    def test_unchanged_entities_are_shared(self):
+        store = SnapshotStore()
+        first = store.publish("t1", self.sim.assets.values(), self.sim.events.values())
+        moved = self.sim.assets["PCR-1"]
+        moved.location.lat += 0.001 # In-place edit of a nested model
+        second = store.publish("t2", self.sim.assets.values(), self.sim.events.values())
+        self.assertIs(second.events[self.event.event_id], first.events[self.event.event_id])
+        self.assertIs(second.assets["PCR-2"], first.assets["PCR-2"])
+        self.assertIsNot(second.assets["PCR-1"], first.assets["PCR-1"])
+
+        delta = second.diff(first)
+        self.assertEqual(list(delta.assets), ["PCR-1"])
+        self.assertFalse(delta.events)
+        self.assertEqual((delta.since, delta.version), (first.version, second.version))
+
+    def test_diff_reports_added_and_removed(self):
+        store = SnapshotStore()
+        first = store.publish("t1", self.sim.assets.values(), self.sim.events.values())
+        gone = self.sim.assets.pop("PCR-3")
+        self.sim.events.clear()
+        second = store.publish("t2", self.sim.assets.values(), [])
+        delta = store.delta(first.version)
+        self.assertEqual(delta.removed_assets, [gone.asset_id])
+        self.assertEqual(delta.removed_events, [self.event.event_id])
+        third = store.publish("t3", [*self.sim.assets.values(), gone], [])
+        self.assertEqual(list(third.diff(second).assets), ["PCR-3"])
+
+    def test_published_snapshot_does_not_change(self):
+        frame = self.sim.build_frame()
+        snapshot = self.sim.snapshots.latest
+        before = dict(snapshot.assets)
+        for _ in range(20):
+            self.sim.step()
+        self.sim.build_frame()
+        self.assertEqual(snapshot.assets, before)
+        self.assertIs(frame.assets, snapshot.assets)
+        self.assertGreater(self.sim.snapshots.latest.version, snapshot.version)
+
+    def test_keeps_only_recent_versions(self):
+        store = SnapshotStore(keep=2)
+        for i in range(4):
+            store.publish(f"t{i}", self.sim.assets.values(), ())
+        self.assertEqual([s.version for s in store.history], [3, 4])
+        self.assertIsNone(store.get(1))
+        self.assertIsNone(store.delta(1))
+        self.assertFalse(store.delta(3)) # Nothing changed
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import json
+import unittest
+from app.core.models import AssetStatus
+from app.services.broadcast import Subscription
+from app.services.simulator import Simulator
+from app.services.wire import COORD_SCALE, POSITION_DTYPE, STATUS_NAMES, decode_positions
+
+class TestBinaryPositions(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator()
+        self.sim._update_asset_index()
+        self.sub = Subscription.from_message({"format": "binary"})
+
+    def test_round_trip(self):
+        """Packed frames decode to the quantized asset state"""
+        asset = self.sim.assets["PCR-3"]
+        asset.status = AssetStatus.DISPATCHED
+        asset.fatigue_level = 0.5
+        frame = self.sim.build_frame()
+        meta = json.loads(frame.asset_meta(self.sub))
+        seq, _, records = decode_positions(frame.render_positions(self.sub))
+        self.assertEqual(seq, frame.seq)
+        self.assertEqual(len(records), len(self.sim.assets))
+        self.assertEqual(POSITION_DTYPE.itemsize, 14)
+
+        index = {m["asset_id"]: m["index"] for m in meta["assets"]}[asset.asset_id]
+        record = records[records["index"] == index][0]
+        self.assertAlmostEqual(record["lat"] / COORD_SCALE, asset.location.lat, places=6)
+        self.assertEqual(STATUS_NAMES[record["status"]], "DISPATCHED")
+        self.assertEqual(record["fatigue"], 128)
+
+    def test_meta_only_when_changed(self):
+        """Static attributes are resent only after they change"""
+        self.assertIsNotNone(self.sim.build_frame().asset_meta(self.sub))
+        self.assertIsNone(self.sim.build_frame().asset_meta(self.sub))
+        self.sim.assets["PCR-1"].telemetry = True
+        meta = json.loads(self.sim.build_frame().asset_meta(self.sub))
+        self.assertEqual([m["asset_id"] for m in meta["assets"]], ["PCR-1"])
+
+    def test_binary_is_much_smaller(self):
+        frame = self.sim.build_frame()
+        json_bytes = len(json.dumps([json.loads(a) for a in frame.assets.values()]))
+        binary_bytes = len(frame.render_positions(self.sub))
+        self.assertLess(binary_bytes * 10, json_bytes)
+
+if __name__ == '__main__':
+    unittest.main()
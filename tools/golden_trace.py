@@ -0,0 +1,58 @@
+"""Record and check golden simulation traces.
+
+Usage:
+    python -m tools.golden_trace record --seed 7 --ticks 400 --out tests/golden/reference_seed7.json
+    python -m tools.golden_trace check tests/golden/reference_seed7.json
+    python -m tools.golden_trace compare --candidate mypkg.fast:FastSimulator --seed 7 --ticks 400
+"""
+import argparse
+import importlib
+import sys
+
+from app.services import trace
+from app.services.simulator import Simulator
+
+
+def _load_engine(spec: str):
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="record digests of a seeded reference run")
+    rec.add_argument("--seed", type=int, default=7)
+    rec.add_argument("--ticks", type=int, default=400)
+    rec.add_argument("--out", required=True)
+
+    chk = sub.add_parser("check", help="replay a golden file against the reference engine")
+    chk.add_argument("golden")
+
+    cmp_ = sub.add_parser("compare", help="run a candidate engine against the reference in lockstep")
+    cmp_.add_argument("--candidate", required=True, help="module:Class taking the Simulator constructor arguments")
+    cmp_.add_argument("--seed", type=int, default=7)
+    cmp_.add_argument("--ticks", type=int, default=400)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        golden = trace.record_golden(lambda: Simulator(seed=args.seed), args.ticks, seed=args.seed)
+        trace.save(args.out, golden)
+        print(f"recorded {args.ticks} ticks to {args.out}")
+    elif args.command == "check":
+        golden = trace.load(args.golden)
+        tick = trace.check_golden(golden, lambda: Simulator(seed=golden["seed"]))
+        if tick is not None:
+            sys.exit(f"diverged from {args.golden} at tick {tick}")
+        print(f"{golden['ticks']} ticks match")
+    else:
+        engine = _load_engine(args.candidate)
+        divergence = trace.compare(Simulator(seed=args.seed), engine(seed=args.seed), args.ticks)
+        if divergence is not None:
+            sys.exit(f"diverged at {divergence}")
+        print(f"{args.ticks} ticks match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Synthetic load generator for the local V-OS server.
+
+Drives the incident ingest endpoint with a Poisson arrival process (plus
+optional bursts, or a replayed JSONL file) and per-unit GPS pings, while
+listening on /ws to measure ingest-to-broadcast latency.
+
+Usage:
+    python -m tools.loadgen --rate 200 --burst-every 5 --burst-size 300 --units 2000 --duration 30
+    python -m tools.loadgen --replay calls.jsonl --speedup 10
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional
+
+# Bangalore (Koramangala/Madiwala) approximate bounds, same as the simulator
+LAT_MIN, LAT_MAX = 12.9150, 12.9450
+LNG_MIN, LNG_MAX = 77.6050, 77.6350
+
+EVENT_TYPES = ["THEFT", "ASSAULT", "ACCIDENT", "CIVIL_UNREST", "MEDICAL"]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile; NaN for no samples."""
+    if not samples:
+        return float('nan')
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def random_incident(rng: random.Random, event_id: str) -> Dict:
+    return {
+        "event_id": event_id,
+        "type": rng.choice(EVENT_TYPES),
+        "severity": rng.randint(1, 10),
+        "location": {"lat": rng.uniform(LAT_MIN, LAT_MAX), "lng": rng.uniform(LNG_MIN, LNG_MAX)},
+        "source": "LOADGEN",
+    }
+
+
+class LoadGenerator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.run_id = f"LG{int(time.time()) % 100000}"
+        self.seq = 0
+        self.sent_at: Dict[str, float] = {}
+        self.latencies_ms: List[float] = []
+        self.incidents_sent = 0
+        self.incidents_rejected = 0
+        self.pings_sent = 0
+        self.frames = 0
+        self.running = True # The watcher stops after the drain
+        self.producing = True
+
+    # --- HTTP ---
+
+    def _post(self, path: str, payload: List[Dict]) -> Optional[Dict]:
+        req = urllib.request.Request(
+            self.args.url + path,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                return json.loads(resp.read())
+        except urllib.error.HTTPError as exc:
+            return json.loads(exc.read() or b"{}")
+        except OSError:
+            return None
+
+    async def _send_incidents(self, batch: List[Dict]):
+        now = time.perf_counter()
+        for incident in batch:
+            self.sent_at[incident["event_id"]] = now
+        result = await asyncio.to_thread(self._post, "/events:batch", batch)
+        self.incidents_sent += len(batch)
+        if result is None:
+            self.incidents_rejected += len(batch)
+        else:
+            self.incidents_rejected += len(result.get("rejected", []))
+
+    def _next_id(self) -> str:
+        self.seq += 1
+        return f"{self.run_id}-{self.seq}"
+
+    # --- Producers ---
+
+    async def synthesize_incidents(self):
+        """Poisson arrivals at --rate, flushed every --batch-ms, plus bursts."""
+        args = self.args
+        window = args.batch_ms / 1000.0
+        next_burst = self._next_burst()
+        while self.producing:
+            # Number of Poisson arrivals in one batching window
+            count = self._poisson(args.rate * window)
+            if next_burst is not None and time.monotonic() >= next_burst:
+                count += args.burst_size
+                next_burst = self._next_burst()
+            if count:
+                batch = [random_incident(self.rng, self._next_id()) for _ in range(count)]
+                asyncio.create_task(self._send_incidents(batch))
+            await asyncio.sleep(window)
+
+    async def replay_incidents(self):
+        """Replay a JSONL file; an optional `offset_s` field sets the send time."""
+        with open(self.args.replay) as fh:
+            records = [json.loads(line) for line in fh if line.strip()]
+        start = time.monotonic()
+        for index, record in enumerate(records):
+            if not self.producing:
+                break
+            offset = record.pop("offset_s", index / max(self.args.rate, 1e-9))
+            delay = start + offset / self.args.speedup - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            record["event_id"] = self._next_id()
+            asyncio.create_task(self._send_incidents([record]))
+        self.producing = False
+
+    async def gps_pings(self):
+        """Random-walk `--units` units, each pinging at --ping-hz."""
+        args = self.args
+        if not args.units:
+            return
+        units = {
+            f"SIM-{i+1}": [self.rng.uniform(LAT_MIN, LAT_MAX), self.rng.uniform(LNG_MIN, LNG_MAX)]
+            for i in range(args.units)
+        }
+        window = args.batch_ms / 1000.0
+        carry = 0.0
+        ids = list(units)
+        while self.producing:
+            # Spread pings evenly: units * hz pings per second
+            carry += len(ids) * args.ping_hz * window
+            due, carry = int(carry), carry - int(carry)
+            batch = []
+            for _ in range(due):
+                unit_id = self.rng.choice(ids)
+                pos = units[unit_id]
+                pos[0] = min(LAT_MAX, max(LAT_MIN, pos[0] + self.rng.gauss(0, 0.0001)))
+                pos[1] = min(LNG_MAX, max(LNG_MIN, pos[1] + self.rng.gauss(0, 0.0001)))
+                batch.append({"asset_id": unit_id, "lat": pos[0], "lng": pos[1], "timestamp": time.time()})
+            if batch:
+                asyncio.create_task(asyncio.to_thread(self._post, "/telemetry:batch", batch))
+                self.pings_sent += len(batch)
+            await asyncio.sleep(window)
+
+    # --- Consumer ---
+
+    async def watch_broadcast(self):
+        """Match our event IDs in /ws frames against their send time."""
+        try:
+            import websockets
+        except ImportError:
+            print("websockets is not installed; latency will not be measured")
+            return
+        ws_url = self.args.url.replace("http", "ws", 1) + "/ws"
+        async with websockets.connect(ws_url, max_size=None) as ws:
+            while self.running:
+                try:
+                    message = await asyncio.wait_for(ws.recv(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    continue
+                received = time.perf_counter()
+                if isinstance(message, bytes):
+                    continue
+                self.frames += 1
+                for event in json.loads(message).get("events", []):
+                    sent = self.sent_at.pop(event.get("event_id"), None)
+                    if sent is not None:
+                        self.latencies_ms.append((received - sent) * 1000)
+
+    # --- Helpers ---
+
+    def _poisson(self, lam: float) -> int:
+        # Knuth for small lambda, normal approximation above
+        if lam <= 0:
+            return 0
+        if lam > 30:
+            return max(0, int(round(self.rng.gauss(lam, math.sqrt(lam)))))
+        limit, k, p = math.exp(-lam), 0, 1.0
+        while True:
+            p *= self.rng.random()
+            if p <= limit:
+                return k
+            k += 1
+
+    def _next_burst(self) -> Optional[float]:
+        if not self.args.burst_every or not self.args.burst_size:
+            return None
+        return time.monotonic() + self.rng.expovariate(1.0 / self.args.burst_every)
+
+    def report(self, elapsed: float):
+        print(f"duration:            {elapsed:.1f} s")
+        print(f"incidents sent:      {self.incidents_sent} ({self.incidents_sent / elapsed:.1f}/s), rejected {self.incidents_rejected}")
+        print(f"gps pings sent:      {self.pings_sent} ({self.pings_sent / elapsed:.1f}/s)")
+        print(f"frames received:     {self.frames}")
+        print(f"incidents observed:  {len(self.latencies_ms)} (unseen {len(self.sent_at)})")
+        print(f"ingest->broadcast:   p50 {percentile(self.latencies_ms, 50):.1f} ms, "
+              f"p99 {percentile(self.latencies_ms, 99):.1f} ms, "
+              f"max {max(self.latencies_ms, default=float('nan')):.1f} ms")
+
+    async def run(self):
+        start = time.monotonic()
+        producer = self.replay_incidents() if self.args.replay else self.synthesize_incidents()
+        tasks = [asyncio.create_task(c) for c in (producer, self.gps_pings(), self.watch_broadcast())]
+        try:
+            await asyncio.sleep(self.args.duration)
+        finally:
+            self.producing = False
+            # Let in-flight frames arrive before reporting
+            await asyncio.sleep(self.args.drain)
+            self.running = False
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.report(time.monotonic() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to generate load")
+    parser.add_argument("--drain", type=float, default=2.0, help="seconds to wait for late frames")
+    parser.add_argument("--rate", type=float, default=50.0, help="mean incidents per second")
+    parser.add_argument("--burst-every", type=float, default=0.0, help="mean seconds between bursts (0 = off)")
+    parser.add_argument("--burst-size", type=int, default=0, help="incidents per burst")
+    parser.add_argument("--batch-ms", type=float, default=100.0, help="client-side batching window")
+    parser.add_argument("--replay", help="JSONL file of incidents to replay instead of synthesizing")
+    parser.add_argument("--speedup", type=float, default=1.0, help="replay time compression")
+    parser.add_argument("--units", type=int, default=0, help="simulated GPS units")
+    parser.add_argument("--ping-hz", type=float, default=1.0, help="pings per unit per second")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(LoadGenerator(args).run())
+
+
+if __name__ == "__main__":
+    main()